@@ -0,0 +1,437 @@
+"""
+Vectorized backtester for the contrarian strategies
+
+Replays recorded market states - or the bet events they are built from -
+through NumPy versions of the agent's analyzers and settles the simulated
+bets with the contract's parimutuel payout (1 share per unit staked, 2.5%
+platform fee, winners split the pool pro rata).
+
+Strategies mirror the code paths that decide bets today:
+
+    metta            MeTTaReasoner with hyperon rules (confidence 0.6-0.9)
+    metta_fallback   MeTTaReasoner._fallback_analysis (confidence capped at 0.8)
+    ai               analyze_market_with_ai, strong signal plus the moderate-bias band
+
+Every strategy applies MeTTaReasoner._apply_trend: fading a sharp move within
+the trend window cuts confidence by 15%. Markets without shares are skipped,
+as in ChimeraAgent.analyze_single_market. Pools are bucketed into the HIGH /
+MEDIUM / LOW volume risk levels, and max_risk can leave out the riskier ones
+(the agent currently bets at any risk level).
+
+Like the agent, a market is re-evaluated once per decision interval from its
+latest recorded state, and every qualifying pass places max_bet * confidence
+(optionally capped per market). Simulated bets are added to the final pools
+for payouts but do not feed back into later ratios.
+
+Input files (CSV, JSON lines or .npz with the same column names):
+
+    states    timestamp, marketId, totalOptionAShares, totalOptionBShares
+    bets      timestamp, marketId, option (0 = A, 1 = B), amount
+    outcomes  marketId, outcome (0 = A, 1 = B) [, resolvedAt]
+
+Usage (from agents/asi-agent):
+    python -m backtest --states data/states.npz --outcomes data/outcomes.csv
+    python -m backtest --bets data/bets.jsonl --outcomes data/outcomes.csv --strategy ai --threshold 0.65
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from market_history import SHARP_MOVE_THRESHOLD, TREND_WINDOW
+from performance_ledger import parimutuel_payout
+TREND_DAMPING = 0.85              # MeTTaReasoner._apply_trend confidence cut
+STRATEGIES = ('metta', 'metta_fallback', 'ai')
+RISK_LEVELS = ('low', 'medium', 'high')
+CALIBRATION_BINS = (0.0, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 1.0)
+
+STATE_COLUMNS = ('timestamp', 'marketId', 'totalOptionAShares', 'totalOptionBShares')
+BET_COLUMNS = ('timestamp', 'marketId', 'option', 'amount')
+OUTCOME_COLUMNS = ('marketId', 'outcome')
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """Knobs of one backtest run; defaults are the values the agent ships with"""
+    strategy: str = 'metta_fallback'
+    contrarian_threshold: float = 0.7    # crowd share that triggers a strong contrarian call
+    moderate_band: float = 0.15          # ai only: |ratio - 0.5| that triggers a moderate call
+    moderate_confidence: float = 0.65
+    min_confidence: float = 0.6          # ChimeraAgent.min_confidence
+    max_bet: float = 100.0               # ChimeraAgent.max_bet_amount
+    decision_interval: float = 300.0     # ChimeraAgent.analysis_interval
+    max_bets_per_market: Optional[int] = None   # None: bet on every qualifying pass, as the agent does
+    trend_window: float = TREND_WINDOW
+    sharp_move: float = SHARP_MOVE_THRESHOLD
+    high_risk_volume: float = 1000.0     # pools below this are HIGH risk
+    low_risk_volume: float = 10000.0     # pools above this are LOW risk
+    max_risk: str = 'high'               # riskiest level still bet on
+
+    def __post_init__(self):
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{self.strategy}' (choose from {', '.join(STRATEGIES)})")
+        if self.max_risk not in RISK_LEVELS:
+            raise ValueError(f"Unknown risk level '{self.max_risk}' (choose from {', '.join(RISK_LEVELS)})")
+
+class MarketTape:
+    """Market states as columns sorted by (market, time), with each market's outcome"""
+
+    # Every array the tape is made of; enough to rebuild it without re-sorting
+    COLUMNS = ('timestamp', 'market_id', 'a_shares', 'b_shares', 'markets', 'group_start',
+               'group_end', 'row_market', 'outcome', 'resolved_at')
+
+    def __init__(self, timestamp, market_id, a_shares, b_shares,
+                 outcomes: Mapping[int, int], resolved_at: Optional[Mapping[int, float]] = None):
+        timestamp = np.asarray(timestamp, dtype=np.float64)
+        market_id = np.asarray(market_id, dtype=np.int64)
+        order = np.lexsort((timestamp, market_id))
+        self.timestamp = timestamp[order]
+        self.market_id = market_id[order]
+        self.a_shares = np.asarray(a_shares, dtype=np.float64)[order]
+        self.b_shares = np.asarray(b_shares, dtype=np.float64)[order]
+
+        # Per-market arrays, indexed by position in self.markets
+        self.markets, self.group_start, self.row_market = np.unique(
+            self.market_id, return_index=True, return_inverse=True
+        )
+        self.group_end = np.append(self.group_start[1:], len(self.market_id))
+        self.outcome = np.array([outcomes.get(int(m), -1) for m in self.markets], dtype=np.int8)
+        last_seen = self.timestamp[self.group_end - 1] if len(self.markets) else np.empty(0)
+        resolved_at = resolved_at or {}
+        self.resolved_at = np.array([
+            resolved_at.get(int(m), last) for m, last in zip(self.markets, last_seen)
+        ], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, np.ndarray]) -> "MarketTape":
+        """Wrap arrays produced by columns() (e.g. views into shared memory) without copying"""
+        tape = cls.__new__(cls)
+        for name in cls.COLUMNS:
+            setattr(tape, name, columns[name])
+        return tape
+
+    @classmethod
+    def from_bets(cls, timestamp, market_id, option, amount, outcomes: Mapping[int, int],
+                  resolved_at: Optional[Mapping[int, float]] = None) -> "MarketTape":
+        """Rebuild the state after every bet event by cumulating stakes per market"""
+        timestamp = np.asarray(timestamp, dtype=np.float64)
+        market_id = np.asarray(market_id, dtype=np.int64)
+        order = np.lexsort((timestamp, market_id))
+        timestamp, market_id = timestamp[order], market_id[order]
+        option = np.asarray(option, dtype=np.int8)[order]
+        amount = np.asarray(amount, dtype=np.float64)[order]
+
+        a_shares = _cumsum_by_group(np.where(option == 0, amount, 0.0), market_id)
+        b_shares = _cumsum_by_group(np.where(option == 1, amount, 0.0), market_id)
+        return cls(timestamp, market_id, a_shares, b_shares, outcomes, resolved_at)
+
+    @property
+    def ratio(self) -> np.ndarray:
+        """Option A share of the pool per row (0.5 for an empty pool)"""
+        total = self.a_shares + self.b_shares
+        return np.divide(self.a_shares, total, out=np.full_like(total, 0.5), where=total > 0)
+
+    def momentum(self, window: float) -> np.ndarray:
+        """MarketHistory.stats ratioMomentum at every row: ratio change since the window start"""
+        if not len(self):
+            return np.empty(0)
+        # One sorted key over all markets; a market's span never reaches into the next one
+        span = self.timestamp.max() - self.timestamp.min() + 2 * window + 1
+        key = self.row_market * span + (self.timestamp - self.timestamp.min())
+        base = np.searchsorted(key, key - window, side='right') - 1
+        base = np.maximum(base, self.group_start[self.row_market])
+        ratio = self.ratio
+        return ratio - ratio[base]
+
+    def decision_rows(self, interval: float) -> np.ndarray:
+        """Latest row of each market per decision interval, before the market resolved"""
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        passes = np.floor(self.timestamp / interval).astype(np.int64) if interval > 0 else np.arange(len(self))
+        last_in_pass = np.ones(len(self), dtype=bool)
+        last_in_pass[:-1] = (passes[1:] != passes[:-1]) | (self.market_id[1:] != self.market_id[:-1])
+        open_market = self.timestamp < self.resolved_at[self.row_market]
+        return np.flatnonzero(last_in_pass & open_market)
+
+def _cumsum_by_group(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Running sum of values that restarts whenever the (sorted) group changes"""
+    totals = np.cumsum(values)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    offsets = np.repeat(totals[starts] - values[starts], np.diff(np.r_[starts, len(values)]))
+    return totals - offsets
+
+def contrarian_signals(ratio: np.ndarray, momentum: np.ndarray, params: StrategyParams):
+    """(option, confidence) per row; option is 0 = BUY_A, 1 = BUY_B, -1 = HOLD"""
+    bias = np.abs(ratio - 0.5) * 2
+    favored_a = ratio > 0.5
+    strong = np.maximum(ratio, 1 - ratio) > params.contrarian_threshold
+
+    if params.strategy == 'metta':
+        strong_confidence = np.clip(bias, 0.6, 0.9)
+    elif params.strategy == 'metta_fallback':
+        strong_confidence = np.minimum(0.8, bias)
+    else:
+        strong_confidence = np.minimum(0.9, bias)
+
+    option = np.where(strong, np.where(favored_a, 1, 0), -1).astype(np.int8)
+    confidence = np.where(strong, strong_confidence, 0.0)
+
+    if params.strategy == 'ai':
+        moderate = ~strong & (np.abs(ratio - 0.5) > params.moderate_band)
+        option = np.where(moderate, np.where(favored_a, 1, 0), option).astype(np.int8)
+        confidence = np.where(moderate, params.moderate_confidence, confidence)
+
+    # Fading a sharp move: betting against the side that just gained
+    fading = ((momentum > 0) & (option == 1)) | ((momentum < 0) & (option == 0))
+    confidence = np.where(fading & (np.abs(momentum) >= params.sharp_move), confidence * TREND_DAMPING, confidence)
+    return option, confidence
+
+@dataclass
+class Decisions:
+    """Decision rows of a tape and their inputs; depends only on the interval and trend window
+
+    Rows on empty pools are left out - the agent never bets on those.
+    """
+    rows: np.ndarray
+    market: np.ndarray
+    ratio: np.ndarray
+    favorite: np.ndarray          # pool share of the leading option
+    momentum: np.ndarray
+    volume: np.ndarray
+    settle_rank: np.ndarray       # position in settlement order (market resolution, then time)
+
+def prepare_decisions(tape: MarketTape, interval: float, trend_window: float) -> Decisions:
+    rows = tape.decision_rows(interval)
+    volume = tape.a_shares[rows] + tape.b_shares[rows]
+    rows, volume = rows[volume > 0], volume[volume > 0]
+    market = tape.row_market[rows]
+    ratio = tape.ratio[rows]
+    settle_rank = np.empty(len(rows), dtype=np.int64)
+    settle_rank[np.lexsort((tape.timestamp[rows], tape.resolved_at[market]))] = np.arange(len(rows))
+    return Decisions(
+        rows=rows,
+        market=market,
+        ratio=ratio,
+        favorite=np.maximum(ratio, 1 - ratio),
+        momentum=tape.momentum(trend_window)[rows],
+        volume=volume,
+        settle_rank=settle_rank
+    )
+
+def run_backtest(tape: MarketTape, params: StrategyParams = StrategyParams()) -> Dict:
+    """Simulate the strategy over the tape and report PnL and calibration"""
+    started = time.perf_counter()
+    report = simulate(tape, prepare_decisions(tape, params.decision_interval, params.trend_window), params)
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
+def simulate(tape: MarketTape, decisions: Decisions, params: StrategyParams, detail: bool = True) -> Dict:
+    """Place and settle the bets `params` takes on prepared decisions
+
+    With detail=False the calibration table is left out (sweeps only rank on
+    the headline numbers).
+    """
+    # Only rows past the weakest bias cutoff can signal; everything else is HOLD
+    cutoff = params.contrarian_threshold
+    if params.strategy == 'ai':
+        cutoff = min(cutoff, 0.5 + params.moderate_band)
+    candidates = np.flatnonzero(decisions.favorite > cutoff)
+    option, confidence = contrarian_signals(decisions.ratio[candidates], decisions.momentum[candidates], params)
+
+    # Volume risk buckets as in MeTTaReasoner._fallback_analysis
+    volume = decisions.volume[candidates]
+    risk = np.where(volume < params.high_risk_volume, 2, np.where(volume > params.low_risk_volume, 0, 1))
+    # int() in analyze_single_market: stakes are whole units
+    stake = np.floor(params.max_bet * confidence)
+    placed = (option >= 0) & (confidence >= params.min_confidence) & (stake > 0) & \
+             (risk <= RISK_LEVELS.index(params.max_risk))
+    if params.max_bets_per_market is not None:
+        # Rows are sorted by market, so a bet's rank is its offset from the market's first bet
+        kept = np.flatnonzero(placed)
+        market_of = decisions.market[candidates[kept]]
+        first = np.flatnonzero(np.r_[True, market_of[1:] != market_of[:-1]])
+        rank = np.arange(len(kept)) - np.repeat(first, np.diff(np.r_[first, len(kept)]))
+        placed = np.zeros_like(placed)
+        placed[kept[rank < params.max_bets_per_market]] = True
+    chosen = candidates[placed]
+    market, ratio, settle_rank = decisions.market[chosen], decisions.ratio[chosen], decisions.settle_rank[chosen]
+    option, confidence, stake = option[placed], confidence[placed], stake[placed]
+
+    # Settle against the final pools plus our own stakes
+    n_markets = len(tape.markets)
+    final_a = tape.a_shares[tape.group_end - 1] + np.bincount(market, stake * (option == 0), n_markets)
+    final_b = tape.b_shares[tape.group_end - 1] + np.bincount(market, stake * (option == 1), n_markets)
+    total_pool = final_a + final_b
+    winning_shares = np.where(tape.outcome == 0, final_a, final_b)
+
+    outcome = tape.outcome[market]
+    resolved = outcome >= 0
+    won = resolved & (option == outcome)
+    payout = np.where(won, parimutuel_payout(stake, np.maximum(winning_shares[market], 1e-12), total_pool[market]), 0.0)
+    profit = np.where(resolved, payout - stake, 0.0)
+
+    settled = np.flatnonzero(resolved)
+    returns = profit[settled] / stake[settled]
+    # Running PnL in settlement order: markets resolve one after another
+    order = settled[np.argsort(settle_rank[settled])]
+    equity = np.cumsum(profit[order])
+    drawdown = float(np.max(np.maximum.accumulate(np.r_[0.0, equity]) - np.r_[0.0, equity])) if len(equity) else 0.0
+    mean_return = float(returns.mean()) if len(returns) else 0.0
+    std_return = float(returns.std()) if len(returns) else 0.0
+
+    crowd_probability = np.where(option[settled] == 0, ratio[settled], 1 - ratio[settled])
+    cal = calibration(confidence[settled], won[settled], crowd_probability,
+                      bins=CALIBRATION_BINS if detail else ())
+    report = {
+        'params': asdict(params),
+        'states': len(tape),
+        'markets': n_markets,
+        'decisions': int(len(decisions.rows)),
+        'bets': int(len(chosen)),
+        'marketsBet': int(np.count_nonzero(np.bincount(market, minlength=n_markets))),
+        'resolvedBets': int(len(settled)),
+        'openBets': int(len(chosen) - len(settled)),
+        'totalStaked': round(float(stake.sum()), 2),
+        'totalProfit': round(float(profit.sum()), 2),
+        'roi': round(float(profit.sum() / stake[settled].sum()) * 100, 2) if len(settled) else 0.0,
+        'winRate': round(float(won[settled].mean()) * 100, 1) if len(settled) else 0.0,
+        'averageReturn': round(mean_return * 100, 2),
+        'sharpeRatio': round(mean_return / std_return, 3) if std_return > 1e-12 else 0.0,
+        'maxDrawdown': round(-drawdown, 2) or 0.0,
+        'calibration': cal
+    }
+    return report
+
+def calibration(confidence: np.ndarray, won: np.ndarray, crowd_probability: np.ndarray,
+                bins: Sequence[float] = CALIBRATION_BINS) -> Dict:
+    """Reliability table and Brier scores of confidence against the crowd's implied probability
+
+    crowd_probability is the pool share of the side we bet on - the win
+    probability a parimutuel price implies.
+    """
+    outcome = won.astype(np.float64)
+    table = []
+    index = np.clip(np.digitize(confidence, bins) - 1, 0, len(bins) - 2) if len(bins) > 1 else None
+    for i in range(len(bins) - 1):
+        in_bin = index == i
+        if not in_bin.any():
+            continue
+        table.append({
+            'bin': f'{bins[i]:.2f}-{bins[i + 1]:.2f}',
+            'bets': int(in_bin.sum()),
+            'meanConfidence': round(float(confidence[in_bin].mean()), 3),
+            'winRate': round(float(outcome[in_bin].mean()), 3),
+            'crowdProbability': round(float(crowd_probability[in_bin].mean()), 3)
+        })
+    return {
+        'brierScore': round(float(np.mean((confidence - outcome) ** 2)), 4) if len(outcome) else None,
+        'crowdBrierScore': round(float(np.mean((crowd_probability - outcome) ** 2)), 4) if len(outcome) else None,
+        'bins': table
+    }
+
+# --- loading ---
+
+def _read_columns(path: str, columns: Sequence[str], optional: Sequence[str] = ()) -> Dict[str, np.ndarray]:
+    """Named float columns from .npz, .csv or .jsonl/.json"""
+    wanted = list(columns) + list(optional)
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            found = {name: np.asarray(data[name], dtype=np.float64) for name in wanted if name in data}
+    else:
+        with open(path, newline='') as f:
+            if path.endswith(('.jsonl', '.json')):
+                records = [json.loads(line) for line in f if line.strip()]
+            else:
+                records = list(csv.DictReader(f))
+        names = [name for name in wanted if records and name in records[0]]
+        found = {name: np.array([float(r[name]) for r in records], dtype=np.float64) for name in names}
+
+    missing = [name for name in columns if name not in found]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+    return found
+
+def load_outcomes(path: str):
+    """({market id: outcome}, {market id: resolvedAt}) from an outcomes file"""
+    data = _read_columns(path, OUTCOME_COLUMNS, optional=('resolvedAt',))
+    ids = data['marketId'].astype(np.int64)
+    outcomes = dict(zip(ids.tolist(), data['outcome'].astype(np.int64).tolist()))
+    resolved_at = dict(zip(ids.tolist(), data['resolvedAt'].tolist())) if 'resolvedAt' in data else {}
+    return outcomes, resolved_at
+
+def load_tape(outcomes_path: str, states_path: Optional[str] = None, bets_path: Optional[str] = None) -> MarketTape:
+    """Build a MarketTape from a states file or a bet events file plus outcomes"""
+    if bool(states_path) == bool(bets_path):
+        raise ValueError("Pass exactly one of a states file or a bets file")
+    outcomes, resolved_at = load_outcomes(outcomes_path)
+    if states_path:
+        data = _read_columns(states_path, STATE_COLUMNS)
+        return MarketTape(data['timestamp'], data['marketId'], data['totalOptionAShares'],
+                          data['totalOptionBShares'], outcomes, resolved_at)
+    data = _read_columns(bets_path, BET_COLUMNS)
+    return MarketTape.from_bets(data['timestamp'], data['marketId'], data['option'], data['amount'],
+                                outcomes, resolved_at)
+
+def main(argv=None) -> int:
+    defaults = StrategyParams()
+    parser = argparse.ArgumentParser(description='Backtest the contrarian strategies on recorded markets')
+    parser.add_argument('--states', help='Market states file (.csv, .jsonl or .npz)')
+    parser.add_argument('--bets', help='Bet events file, used instead of --states')
+    parser.add_argument('--outcomes', required=True, help='Market outcomes file')
+    parser.add_argument('--strategy', choices=STRATEGIES, default=defaults.strategy)
+    parser.add_argument('--threshold', type=float, default=defaults.contrarian_threshold,
+                        help='Contrarian threshold (crowd share)')
+    parser.add_argument('--moderate-band', type=float, default=defaults.moderate_band)
+    parser.add_argument('--min-confidence', type=float, default=defaults.min_confidence)
+    parser.add_argument('--max-bet', type=float, default=defaults.max_bet)
+    parser.add_argument('--interval', type=float, default=defaults.decision_interval,
+                        help='Seconds between decisions per market')
+    parser.add_argument('--max-bets-per-market', type=int, help='Cap on bets per market (default: none)')
+    parser.add_argument('--max-risk', choices=RISK_LEVELS, default=defaults.max_risk,
+                        help='Riskiest volume bucket still bet on')
+    parser.add_argument('--output', help='Write the report as JSON')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        tape = load_tape(args.outcomes, states_path=args.states, bets_path=args.bets)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not load market data: {e}")
+        return 1
+    print(f"📊 Loaded {len(tape):,} states over {len(tape.markets):,} markets in {time.perf_counter() - started:.2f}s")
+
+    params = StrategyParams(
+        strategy=args.strategy, contrarian_threshold=args.threshold, moderate_band=args.moderate_band,
+        min_confidence=args.min_confidence, max_bet=args.max_bet, decision_interval=args.interval,
+        max_bets_per_market=args.max_bets_per_market, max_risk=args.max_risk
+    )
+    report = run_backtest(tape, params)
+    print(f"📈 {params.strategy}: {report['bets']:,} bets on {report['marketsBet']:,} markets, "
+          f"profit {report['totalProfit']:+,.2f} on {report['totalStaked']:,.2f} staked "
+          f"(ROI {report['roi']:+.2f}%), win rate {report['winRate']}%, max drawdown {report['maxDrawdown']:,.2f}")
+    cal = report['calibration']
+    print(f"🎯 Brier score {cal['brierScore']} (crowd {cal['crowdBrierScore']}); simulated in {report['seconds']}s")
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Offline benchmarks for the ASI agent analysis hot paths
+
+Run from agents/asi-agent:
+    python -m benchmarks.run --sizes 10,1000,100000 --output benchmarks/results/latest.json
+"""
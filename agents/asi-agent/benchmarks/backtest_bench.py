@@ -0,0 +1,58 @@
+"""
+Backtest replay benchmark
+
+Generates a year of synthetic bet events over thousands of markets, writes
+them in the backtest file formats and times loading plus one run per
+strategy.
+
+Usage (from agents/asi-agent):
+    python -m benchmarks.backtest_bench --markets 2000 --days 365
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from backtest import STRATEGIES, StrategyParams, load_tape, run_backtest
+from .synthetic import generate_bet_tape
+
+def write_files(tape, directory: str):
+    bets_path = os.path.join(directory, 'bets.npz')
+    outcomes_path = os.path.join(directory, 'outcomes.csv')
+    np.savez(bets_path, **{name: tape[name] for name in ('timestamp', 'marketId', 'option', 'amount')})
+    with open(outcomes_path, 'w') as f:
+        f.write('marketId,outcome,resolvedAt\n')
+        for row in zip(tape['outcomeMarketId'], tape['outcome'], tape['resolvedAt']):
+            f.write('%d,%d,%.0f\n' % row)
+    return bets_path, outcomes_path
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark backtest replay speed')
+    parser.add_argument('--markets', type=int, default=2000)
+    parser.add_argument('--days', type=float, default=365)
+    parser.add_argument('--bets-per-day', type=float, default=24)
+    args = parser.parse_args(argv)
+
+    tape = generate_bet_tape(args.markets, args.days, args.bets_per_day)
+    print(f"🚀 {len(tape['timestamp']):,} bet events over {args.markets:,} markets and {args.days:g} days")
+
+    with tempfile.TemporaryDirectory() as directory:
+        bets_path, outcomes_path = write_files(tape, directory)
+        started = time.perf_counter()
+        market_tape = load_tape(outcomes_path, bets_path=bets_path)
+        print(f"📊 Loaded in {time.perf_counter() - started:.2f}s")
+
+    for strategy in STRATEGIES:
+        for cap in (None, 1):
+            report = run_backtest(market_tape, StrategyParams(strategy=strategy, max_bets_per_market=cap))
+            print(f"   {strategy} (cap {cap or 'none'}): {report['bets']:,} bets, ROI {report['roi']:+.2f}%, "
+                  f"Brier {report['calibration']['brierScore']} (crowd {report['calibration']['crowdBrierScore']}), "
+                  f"{report['seconds']}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
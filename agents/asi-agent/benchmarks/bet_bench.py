@@ -0,0 +1,126 @@
+"""
+Bet execution throughput benchmark
+
+Submits a burst of bets through BetExecutor and reports throughput, bets per
+block and submit-to-receipt latency, against the naive path (send one bet,
+wait for its receipt, send the next).
+
+By default the RPC stub mines a block every --block-time seconds with a
+throwaway key. Point it at a local node instead with --rpc/--private-key/
+--contract (e.g. Anvil or `npx hardhat node` with a deployed contract).
+
+Usage (from agents/asi-agent):
+    python -m benchmarks.bet_bench --bets 200
+    python -m benchmarks.bet_bench --rpc http://127.0.0.1:8545 --private-key 0xac09... --contract 0x5FbD...
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from eth_account import Account
+
+from bet_executor import BetExecutor, BetOrder, BetResult
+from .loadtest import percentile
+from .stubs import UpstreamStubs
+
+STUB_CONTRACT = '0x7Bee0AB565e6aB33009647174Eb8cd55B56EcD7c'
+
+def summarize(results: List[BetResult], elapsed: float) -> Dict:
+    confirmed = [r for r in results if r.status == 'confirmed']
+    per_block: Dict[int, int] = {}
+    for result in confirmed:
+        per_block[result.block_number] = per_block.get(result.block_number, 0) + 1
+    latencies = sorted((r.finished_at - r.submitted_at) * 1000 for r in confirmed)
+    return {
+        'bets': len(results),
+        'confirmed': len(confirmed),
+        'failed': sum(1 for r in results if r.status in ('failed', 'reverted')),
+        'elapsed_seconds': round(elapsed, 3),
+        'bets_per_second': round(len(confirmed) / elapsed, 2) if elapsed > 0 else 0.0,
+        'blocks': len(per_block),
+        'max_bets_per_block': max(per_block.values(), default=0),
+        'latency_p50_ms': round(percentile(latencies, 50), 1),
+        'latency_p99_ms': round(percentile(latencies, 99), 1)
+    }
+
+async def run_pipelined(rpc_url: str, contract: str, key: str, bets: int, markets: int,
+                        receipt_interval: float) -> Dict:
+    executor = BetExecutor(rpc_url, contract, private_key=key, dry_run=False, receipt_interval=receipt_interval)
+    start = time.perf_counter()
+    futures = [
+        await executor.submit(BetOrder(market_id=1 + i % markets, option=i % 2, amount=0.01))
+        for i in range(bets)
+    ]
+    results = await asyncio.gather(*futures)
+    elapsed = time.perf_counter() - start
+    await executor.stop()
+    return summarize(results, elapsed)
+
+async def run_sequential(rpc_url: str, contract: str, key: str, bets: int, markets: int,
+                         receipt_interval: float) -> Dict:
+    """One bet in flight at a time: what a naive per-bet submit-and-wait loop achieves"""
+    executor = BetExecutor(rpc_url, contract, private_key=key, dry_run=False, senders=1,
+                           max_batch=1, receipt_interval=receipt_interval)
+    start = time.perf_counter()
+    results = []
+    for i in range(bets):
+        future = await executor.submit(BetOrder(market_id=1 + i % markets, option=i % 2, amount=0.01))
+        results.append(await future)
+    elapsed = time.perf_counter() - start
+    await executor.stop()
+    return summarize(results, elapsed)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark pipelined bet execution')
+    parser.add_argument('--bets', type=int, default=200, help='Bets in the burst')
+    parser.add_argument('--sequential-bets', type=int, default=5, help='Bets for the submit-and-wait baseline')
+    parser.add_argument('--markets', type=int, default=10, help='Markets the bets are spread over')
+    parser.add_argument('--block-time', type=float, default=1.0, help='Stub block interval in seconds')
+    parser.add_argument('--receipt-interval', type=float, default=0.25, help='Receipt polling interval')
+    parser.add_argument('--rpc', help='Use a local node at this URL instead of the stub')
+    parser.add_argument('--private-key', help='Funded key on --rpc')
+    parser.add_argument('--contract', help='Chimera contract address on --rpc')
+    parser.add_argument('--output', help='Write the report as JSON')
+    args = parser.parse_args(argv)
+
+    stubs: Optional[UpstreamStubs] = None
+    if args.rpc:
+        if not (args.private_key and args.contract):
+            print("❌ --rpc needs --private-key and --contract")
+            return 1
+        rpc_url, key, contract = args.rpc, args.private_key, args.contract
+    else:
+        stubs = UpstreamStubs(market_count=args.markets, block_time=args.block_time).__enter__()
+        rpc_url, key, contract = stubs.rpc.url, Account.create().key.hex(), STUB_CONTRACT
+
+    try:
+        print(f"🚀 {args.bets} bets over {args.markets} markets against {rpc_url}")
+        pipelined = asyncio.run(run_pipelined(rpc_url, contract, key, args.bets, args.markets, args.receipt_interval))
+        sequential = asyncio.run(run_sequential(rpc_url, contract, key, args.sequential_bets, args.markets,
+                                                args.receipt_interval))
+    finally:
+        if stubs:
+            stubs.__exit__(None, None, None)
+
+    report = {'pipelined': pipelined, 'sequential': sequential, 'rpc': rpc_url, 'block_time': args.block_time}
+    for name, stats in (('Pipelined', pipelined), ('Sequential', sequential)):
+        print(f"📊 {name}: {stats['confirmed']}/{stats['bets']} confirmed in {stats['elapsed_seconds']}s "
+              f"({stats['bets_per_second']} bets/s), {stats['blocks']} blocks, "
+              f"max {stats['max_bets_per_block']} bets/block, p50 {stats['latency_p50_ms']}ms")
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.output}")
+    return 0 if pipelined['failed'] == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Chat intent routing benchmark
+
+Compares the compiled IntentRouter with the legacy cascade of substring
+scans over a corpus of chat messages: routing cost per message, accuracy
+against the corpus' expected intents, and every message the two route
+differently (e.g. "bet on bitcoin", which the cascade sends to the
+recommend branch before the crypto branch is ever tested) with the
+expected intent alongside.
+
+Usage (from agents/asi-agent):
+    python -m benchmarks.intent_bench
+    python -m benchmarks.intent_bench --corpus chat_logs.jsonl --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from intent_router import IntentRouter
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chat_corpus.txt')
+
+def load_labeled_corpus(path: str) -> List[Tuple[str, Optional[str]]]:
+    """(message, expected intent or None) pairs
+
+    Text files hold one message per line, optionally followed by a tab and the
+    expected intent (# comments skipped); JSONL records carry a 'message' or
+    'text' field and an optional 'intent'.
+    """
+    messages = []
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            if path.endswith('.jsonl'):
+                record = json.loads(line)
+                messages.append((record.get('message') or record.get('text') or '', record.get('intent')))
+            else:
+                message, _, expected = line.partition('\t')
+                messages.append((message, expected.strip() or None))
+    return messages
+
+def load_corpus(path: str) -> List[str]:
+    return [message for message, _ in load_labeled_corpus(path)]
+
+def accuracy(routes: List[str], expected: List[Optional[str]]) -> Optional[float]:
+    """Share of labeled messages routed to their expected intent"""
+    labeled = [(route, label) for route, label in zip(routes, expected) if label]
+    return round(sum(route == label for route, label in labeled) / len(labeled), 3) if labeled else None
+
+def legacy_route(message: str) -> str:
+    """The original process_chat_message branch order"""
+    message_lower = message.lower().strip()
+    if message_lower in ['health', 'status', 'ping']:
+        return 'health'
+    if any(word in message_lower for word in ['analyze', 'analysis', 'market', 'markets']):
+        return 'analyze'
+    if any(word in message_lower for word in ['recommend', 'suggestion', 'bet', 'should']):
+        return 'recommend'
+    if any(word in message_lower for word in ['crypto', 'bitcoin', 'btc', 'ethereum', 'eth']):
+        return 'crypto'
+    if any(word in message_lower for word in ['performance', 'track record', 'win rate', 'profit']):
+        return 'performance'
+    if message_lower in ['help', 'what can you do', 'commands']:
+        return 'help'
+    return 'default'
+
+def time_routing(route: Callable[[str], str], messages: List[str], repeat: int) -> float:
+    """Mean nanoseconds per routed message"""
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        for message in messages:
+            route(message)
+    return (time.perf_counter_ns() - start) / (repeat * len(messages))
+
+def intent_counts(routes: List[str]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for intent in routes:
+        counts[intent] = counts.get(intent, 0) + 1
+    return dict(sorted(counts.items()))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark chat intent routing')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='Message corpus (.txt lines or .jsonl)')
+    parser.add_argument('--repeat', type=int, default=500, help='Passes over the corpus per timing')
+    parser.add_argument('--output', help='Write the report as JSON')
+    args = parser.parse_args(argv)
+
+    corpus = load_labeled_corpus(args.corpus)
+    messages = [message for message, _ in corpus]
+    expected = [label for _, label in corpus]
+    if not messages:
+        print(f"❌ No messages in {args.corpus}")
+        return 1
+
+    router = IntentRouter()
+    router.compile()
+
+    def compiled_route(message: str) -> str:
+        return router.route(message).intent
+
+    legacy_ns = time_routing(legacy_route, messages, args.repeat)
+    compiled_ns = time_routing(compiled_route, messages, args.repeat)
+
+    legacy = [legacy_route(m) for m in messages]
+    compiled = [compiled_route(m) for m in messages]
+    changed = [
+        {'message': m, 'legacy': old, 'compiled': new, 'expected': label}
+        for m, old, new, label in zip(messages, legacy, compiled, expected) if old != new
+    ]
+    legacy_accuracy = accuracy(legacy, expected)
+    compiled_accuracy = accuracy(compiled, expected)
+
+    report = {
+        'corpus': args.corpus,
+        'messages': len(messages),
+        'legacy_ns_per_message': round(legacy_ns, 1),
+        'compiled_ns_per_message': round(compiled_ns, 1),
+        'legacy_accuracy': legacy_accuracy,
+        'compiled_accuracy': compiled_accuracy,
+        'legacy_intents': intent_counts(legacy),
+        'compiled_intents': intent_counts(compiled),
+        'changed_routes': changed
+    }
+
+    print(f"📊 {len(messages)} messages x {args.repeat} passes")
+    print(f"   Legacy cascade:  {legacy_ns:,.0f} ns/message")
+    print(f"   Compiled router: {compiled_ns:,.0f} ns/message")
+    if compiled_accuracy is not None:
+        print(f"🎯 Expected intent: legacy {legacy_accuracy:.1%}, compiled {compiled_accuracy:.1%}")
+    print(f"🔀 {len(changed)} messages route differently:")
+    for item in changed:
+        verdict = f" (expected {item['expected']})" if item['expected'] else ''
+        print(f"   {item['message']!r}: {item['legacy']} -> {item['compiled']}{verdict}")
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
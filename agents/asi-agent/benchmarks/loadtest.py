@@ -0,0 +1,327 @@
+"""
+End-to-end HTTP load test against local Hashio/Hermes stand-ins
+
+Starts the stub upstreams, launches simple_http_server.py (or http_server.py)
+as a subprocess pointed at them, then drives mixed open-loop traffic at a
+target request rate and reports throughput, latency percentiles and upstream
+call amplification (upstream calls per client request).
+
+Usage (from agents/asi-agent):
+    python -m benchmarks.loadtest --rps 50 --duration 30
+    python -m benchmarks.loadtest --server http_server.py --upstream-latency 0.2 --upstream-error-rate 0.1
+    python -m benchmarks.loadtest --mix chat=1,analyze=4 --output benchmarks/results/load.json
+    python -m benchmarks.loadtest --workers 4 --shared-cache
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .stubs import UpstreamStubs
+from .synthetic import CHAT_MESSAGES, STRUCTURED_QUERIES, generate_markets
+
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Endpoint name -> (method, path)
+ENDPOINTS = {
+    'chat': ('POST', '/chat'),
+    'analyze': ('POST', '/analyze-market'),
+    'pyth': ('GET', '/pyth-prices'),
+    'query': ('POST', '/query')
+}
+
+DEFAULT_MIX = 'chat=3,analyze=3,pyth=2,query=2'
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'chat=3,analyze=1' into normalized endpoint weights"""
+    weights = {}
+    for part in mix.split(','):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (expected one of {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Traffic mix must have a positive total weight")
+    return {name: weight / total for name, weight in weights.items()}
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile over an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+class AgentServerProcess:
+    """Runs one of the agent HTTP servers as a subprocess on a chosen port"""
+
+    def __init__(self, script: str, port: int, env: Dict[str, str]):
+        self.script = script
+        self.port = port
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, timeout: float = 30.0):
+        env = dict(os.environ)
+        env.update(self.env)
+        env['ASI_AGENT_PORT'] = str(self.port)
+        env['PYTHONUNBUFFERED'] = '1'
+        self.process = subprocess.Popen(
+            [sys.executable, self.script],
+            cwd=AGENT_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.script} exited with code {self.process.returncode}")
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=1)
+                conn.request('GET', '/health')
+                if conn.getresponse().status == 200:
+                    conn.close()
+                    return
+                conn.close()
+            except OSError:
+                pass
+            time.sleep(0.2)
+
+        self.stop()
+        raise RuntimeError(f"{self.script} did not become healthy within {timeout:.0f}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+class LoadGenerator:
+    """Open-loop request generator: requests are scheduled at fixed intervals
+    and latency is measured from the scheduled start, so a slow server cannot
+    hide queueing delay (no coordinated omission)."""
+
+    def __init__(self, ports: List[int], mix: Dict[str, float], market_ids: List[int],
+                 concurrency: int = 64, timeout: float = 30.0, seed: int = 99):
+        self.ports = ports
+        self.mix = mix
+        self.market_ids = market_ids
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._rng = random.Random(seed)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.samples: List[Dict] = []
+
+    def _connection(self, port: int) -> http.client.HTTPConnection:
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(port)
+        if conn is None:
+            conn = conns[port] = http.client.HTTPConnection('127.0.0.1', port, timeout=self.timeout)
+        return conn
+
+    def _build_request(self, endpoint: str):
+        method, path = ENDPOINTS[endpoint]
+        body = None
+        if endpoint == 'chat':
+            body = {'message': self._rng.choice(CHAT_MESSAGES), 'conversationId': 'loadtest'}
+        elif endpoint == 'analyze':
+            body = {'marketId': self._rng.choice(self.market_ids)}
+        elif endpoint == 'query':
+            body = {'query': self._rng.choice(STRUCTURED_QUERIES), 'parameters': {}}
+        elif endpoint == 'pyth':
+            path = f"{path}?symbols=BTC,ETH,HBAR"
+        return method, path, (json.dumps(body).encode() if body is not None else None)
+
+    def _send(self, endpoint: str, port: int, method: str, path: str, body: Optional[bytes], scheduled: float):
+        status = 0
+        sent = time.perf_counter()
+        try:
+            conn = self._connection(port)
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # Drop the broken keep-alive connection; the next request reconnects
+            self._local.conns.pop(port, None)
+        finished = time.perf_counter()
+
+        with self._lock:
+            self.samples.append({
+                'endpoint': endpoint,
+                'status': status,
+                'latency': finished - scheduled,
+                'service_time': finished - sent
+            })
+
+    def run(self, rps: float, duration: float):
+        endpoints = list(self.mix)
+        weights = [self.mix[name] for name in endpoints]
+        total = int(rps * duration)
+        interval = 1.0 / rps
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            start = time.perf_counter()
+            for i in range(total):
+                scheduled = start + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                endpoint = self._rng.choices(endpoints, weights)[0]
+                method, path, body = self._build_request(endpoint)
+                # Spread requests over the worker processes like a round-robin load balancer
+                port = self.ports[i % len(self.ports)]
+                pool.submit(self._send, endpoint, port, method, path, body, scheduled)
+        return time.perf_counter() - start
+
+def summarize(samples: List[Dict], elapsed: float, upstream_calls: int, upstream_breakdown: Dict) -> Dict:
+    """Aggregate raw samples into throughput, latency percentiles and amplification"""
+
+    def latency_stats(group: List[Dict]) -> Dict:
+        latencies = sorted(s['latency'] * 1000 for s in group)
+        ok = [s for s in group if 200 <= s['status'] < 300]
+        return {
+            'requests': len(group),
+            'ok': len(ok),
+            'errors': len(group) - len(ok),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(latencies[-1], 2) if latencies else 0.0
+        }
+
+    by_endpoint = {}
+    for name in sorted({s['endpoint'] for s in samples}):
+        by_endpoint[name] = latency_stats([s for s in samples if s['endpoint'] == name])
+
+    status_counts: Dict[str, int] = {}
+    for sample in samples:
+        key = str(sample['status'] or 'connection_error')
+        status_counts[key] = status_counts.get(key, 0) + 1
+
+    completed = len(samples)
+    return {
+        'overall': latency_stats(samples),
+        'throughput_rps': round(completed / elapsed, 2) if elapsed > 0 else 0.0,
+        'elapsed_seconds': round(elapsed, 3),
+        'status_counts': status_counts,
+        'by_endpoint': by_endpoint,
+        'upstream_calls': upstream_calls,
+        'upstream_amplification': round(upstream_calls / completed, 3) if completed else 0.0,
+        'upstream_breakdown': upstream_breakdown
+    }
+
+def _unlink_shared_cache(name: str):
+    """Remove the segment and writer lock the workers left behind"""
+    from multiprocessing import shared_memory
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+        segment.close()
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+    lock_path = os.path.join(tempfile.gettempdir(), f'{name}.writer.lock')
+    if os.path.exists(lock_path):
+        os.remove(lock_path)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test the ASI agent HTTP servers against local upstream stubs')
+    parser.add_argument('--server', default='simple_http_server.py', help='Server script to launch')
+    parser.add_argument('--port', type=int, default=18001, help='Port for the server under test')
+    parser.add_argument('--workers', type=int, default=1, help='Server processes (on consecutive ports) sharing the traffic')
+    parser.add_argument('--shared-cache', action='store_true', help='Let the workers share one market refresher via shared memory')
+    parser.add_argument('--rps', type=float, default=20.0, help='Target requests per second')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds of traffic to generate')
+    parser.add_argument('--concurrency', type=int, default=64, help='Maximum in-flight client requests')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Weighted endpoint mix, e.g. chat=3,analyze=1')
+    parser.add_argument('--markets', type=int, default=10, help='Synthetic markets served by the RPC stub')
+    parser.add_argument('--upstream-latency', type=float, default=0.0, help='Seconds added to every upstream call')
+    parser.add_argument('--upstream-error-rate', type=float, default=0.0, help='Fraction of upstream calls failing with 503')
+    parser.add_argument('--max-amplification', type=float, help='Exit non-zero if upstream calls per request exceed this')
+    parser.add_argument('--output', default='benchmarks/results/loadtest.json', help='Where to write the report')
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    markets = generate_markets(args.markets)
+
+    print(f"🚀 Load test: {args.server} x{args.workers} at {args.rps:g} rps for {args.duration:g}s"
+          f"{' (shared cache)' if args.shared_cache else ''}")
+    print(f"   Upstream latency {args.upstream_latency * 1000:.0f}ms, error rate {args.upstream_error_rate:.0%}")
+
+    with UpstreamStubs(markets=markets, latency=args.upstream_latency,
+                       error_rate=args.upstream_error_rate) as stubs:
+        env = stubs.env()
+        shared_cache_name = f'chimera-loadtest-{os.getpid()}' if args.shared_cache else ''
+        env['CHIMERA_SHARED_CACHE'] = shared_cache_name
+        ports = [args.port + i for i in range(args.workers)]
+        servers = [AgentServerProcess(args.server, port, env) for port in ports]
+        try:
+            for server in servers:
+                server.start()
+            # Exclude startup traffic (connection checks) from amplification
+            stubs.reset_counters()
+            generator = LoadGenerator(ports, mix, [m['id'] for m in markets], args.concurrency)
+            elapsed = generator.run(args.rps, args.duration)
+            report = summarize(generator.samples, elapsed, stubs.total_calls(), stubs.calls_by_upstream())
+        finally:
+            for server in servers:
+                server.stop()
+            if shared_cache_name:
+                _unlink_shared_cache(shared_cache_name)
+
+    report['config'] = {
+        'server': args.server,
+        'workers': args.workers,
+        'shared_cache': args.shared_cache,
+        'target_rps': args.rps,
+        'duration': args.duration,
+        'mix': mix,
+        'markets': args.markets,
+        'upstream_latency': args.upstream_latency,
+        'upstream_error_rate': args.upstream_error_rate,
+        'timestamp': datetime.now().isoformat()
+    }
+
+    overall = report['overall']
+    print(f"\n📊 {overall['requests']} requests, {report['throughput_rps']} rps, {overall['errors']} errors")
+    print(f"   Latency p50 {overall['p50_ms']}ms | p95 {overall['p95_ms']}ms | p99 {overall['p99_ms']}ms")
+    for name, stats in report['by_endpoint'].items():
+        print(f"   {ENDPOINTS[name][1]}: p50 {stats['p50_ms']}ms, p99 {stats['p99_ms']}ms, {stats['errors']} errors")
+    print(f"🔁 Upstream amplification: {report['upstream_amplification']} calls/request "
+          f"({report['upstream_calls']} upstream calls)")
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved to {args.output}")
+
+    if args.max_amplification is not None and report['upstream_amplification'] > args.max_amplification:
+        print(f"❌ Amplification {report['upstream_amplification']} exceeds {args.max_amplification}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Benchmark runner for the agent analysis hot paths
+
+Measures ops/sec and peak memory for:
+- analyze_market_with_ai (simple_http_server)
+- MeTTaReasoner.analyze_market_data (market_analyzer)
+- RateLimiter.is_allowed (market_analyzer)
+- process_chat_message / process_structured_query (simple_http_server)
+
+All upstream traffic goes to local stubs, so runs are fully offline.
+
+Usage (from agents/asi-agent):
+    python -m benchmarks.run --sizes 10,1000 --output benchmarks/results/run.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .stubs import UpstreamStubs
+from .synthetic import CHAT_MESSAGES, STRUCTURED_QUERIES, generate_markets, generate_user_ids
+
+DEFAULT_SIZES = [10, 1000, 100000]
+
+class BenchmarkCase:
+    """A named operation benchmarked against one synthetic dataset"""
+
+    def __init__(self, name: str, setup: Callable[[List[Dict]], Callable[[int], object]]):
+        self.name = name
+        self.setup = setup
+
+def _import_server():
+    return importlib.import_module('simple_http_server')
+
+def _import_analyzer():
+    return importlib.import_module('market_analyzer')
+
+def _setup_analyze_market(markets):
+    server = _import_server()
+    return lambda i: server.analyze_market_with_ai(markets[i % len(markets)])
+
+def _setup_metta(markets):
+    reasoner = _import_analyzer().MeTTaReasoner()
+    inputs = [
+        {'totalPool': m['totalVolume'], 'optionARatio': m['optionARatio']}
+        for m in markets
+    ]
+    return lambda i: reasoner.analyze_market_data(inputs[i % len(inputs)])
+
+def _setup_rate_limiter(markets):
+    limiter = _import_analyzer().RateLimiter()
+    users = generate_user_ids(max(1, len(markets) // 10))
+    return lambda i: limiter.is_allowed(users[i % len(users)])
+
+def _setup_chat(markets):
+    server = _import_server()
+    return lambda i: server.process_chat_message(CHAT_MESSAGES[i % len(CHAT_MESSAGES)])
+
+def _setup_structured_query(markets):
+    server = _import_server()
+    return lambda i: server.process_structured_query(STRUCTURED_QUERIES[i % len(STRUCTURED_QUERIES)], {})
+
+CASES = [
+    BenchmarkCase('analyze_market_with_ai', _setup_analyze_market),
+    BenchmarkCase('MeTTaReasoner.analyze_market_data', _setup_metta),
+    BenchmarkCase('RateLimiter.is_allowed', _setup_rate_limiter),
+    BenchmarkCase('process_chat_message', _setup_chat),
+    BenchmarkCase('process_structured_query', _setup_structured_query)
+]
+
+def _timed_loop(op: Callable[[int], object], budget: float, max_ops: int) -> Dict:
+    ops = 0
+    start = time.perf_counter()
+    deadline = start + budget
+    while ops < max_ops:
+        op(ops)
+        ops += 1
+        if time.perf_counter() >= deadline:
+            break
+    elapsed = time.perf_counter() - start
+    return {'ops': ops, 'seconds': elapsed, 'ops_per_sec': ops / elapsed if elapsed > 0 else 0.0}
+
+def _peak_memory(op: Callable[[int], object], ops: int) -> float:
+    tracemalloc.start()
+    try:
+        for i in range(ops):
+            op(i)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+def _dataset_memory(size: int) -> Tuple[List[Dict], float]:
+    tracemalloc.start()
+    try:
+        markets = generate_markets(size)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return markets, current / 1024
+
+def run_benchmarks(sizes: List[int], case_names: Optional[List[str]] = None,
+                   budget: float = 2.0, max_ops: int = 1000000, memory_ops: int = 200,
+                   verbose: bool = False) -> Dict:
+    """Run every selected case at every size and return a JSON-serializable report"""
+    selected = [c for c in CASES if not case_names or c.name in case_names]
+    results = []
+
+    with UpstreamStubs(markets=[]) as stubs:
+        # Module-level configuration in the servers is read at import time
+        os.environ.update(stubs.env())
+
+        for size in sizes:
+            markets, dataset_kib = _dataset_memory(size)
+            stubs.replace_markets(markets)
+            print(f"📊 Dataset: {size} markets ({dataset_kib:,.0f} KiB)")
+
+            for case in selected:
+                sink = sys.stdout if verbose else io.StringIO()
+                try:
+                    with contextlib.redirect_stdout(sink):
+                        op = case.setup(markets)
+                        op(0)  # warm-up (imports, first connections)
+                        stubs.reset_counters()
+                        timing = _timed_loop(op, budget, max_ops)
+                        upstream_calls = stubs.total_calls()
+                        peak_kib = _peak_memory(op, min(timing['ops'], memory_ops))
+                except ImportError as e:
+                    print(f"   ⚠️ {case.name}: skipped ({e})")
+                    results.append({'case': case.name, 'size': size, 'skipped': str(e)})
+                    continue
+
+                result = {
+                    'case': case.name,
+                    'size': size,
+                    'ops': timing['ops'],
+                    'seconds': round(timing['seconds'], 6),
+                    'ops_per_sec': round(timing['ops_per_sec'], 3),
+                    'upstream_calls_per_op': round(upstream_calls / timing['ops'], 3) if timing['ops'] else 0.0,
+                    'peak_kib': round(peak_kib, 1),
+                    'dataset_kib': round(dataset_kib, 1)
+                }
+                results.append(result)
+                print(f"   {case.name}: {result['ops_per_sec']:,.1f} ops/s, "
+                      f"peak {result['peak_kib']:,.1f} KiB, "
+                      f"{result['upstream_calls_per_op']} upstream calls/op")
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'budget_seconds': budget,
+            'sizes': sizes
+        },
+        'results': results
+    }
+
+def compare_to_baseline(report: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """Return the cases whose throughput dropped more than `tolerance` below the baseline"""
+    baseline_index = {
+        (r['case'], r['size']): r for r in baseline.get('results', []) if 'ops_per_sec' in r
+    }
+    regressions = []
+
+    print("\n📈 Comparison against baseline:")
+    for result in report['results']:
+        base = baseline_index.get((result['case'], result['size']))
+        if not base or 'ops_per_sec' not in result or not base['ops_per_sec']:
+            continue
+
+        ratio = result['ops_per_sec'] / base['ops_per_sec']
+        marker = '✅'
+        if ratio < 1 - tolerance:
+            marker = '❌'
+            regressions.append({'case': result['case'], 'size': result['size'], 'ratio': round(ratio, 3)})
+        print(f"   {marker} {result['case']} @ {result['size']}: {ratio:.2f}x baseline "
+              f"({result['ops_per_sec']:,.1f} vs {base['ops_per_sec']:,.1f} ops/s)")
+
+    return regressions
+
+def _write_json(path: str, payload: Dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark ASI agent analysis hot paths offline')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated synthetic market counts')
+    parser.add_argument('--cases', default='', help='Comma-separated case names (default: all)')
+    parser.add_argument('--budget', type=float, default=2.0, help='Seconds per case and size')
+    parser.add_argument('--max-ops', type=int, default=1000000, help='Upper bound on ops per case')
+    parser.add_argument('--memory-ops', type=int, default=200, help='Ops traced for peak memory')
+    parser.add_argument('--output', default='benchmarks/results/latest.json', help='Where to write the report')
+    parser.add_argument('--baseline', help='Stored report to compare against')
+    parser.add_argument('--save-baseline', help='Also store this run as the baseline at the given path')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed throughput drop vs baseline')
+    parser.add_argument('--verbose', action='store_true', help='Show server output during runs')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    case_names = [c.strip() for c in args.cases.split(',') if c.strip()]
+
+    print("🚀 Running ASI agent benchmarks (offline stubs)...")
+    report = run_benchmarks(sizes, case_names, args.budget, args.max_ops, args.memory_ops, args.verbose)
+
+    _write_json(args.output, report)
+    print(f"\n💾 Results saved to {args.output}")
+
+    if args.save_baseline:
+        _write_json(args.save_baseline, report)
+        print(f"💾 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%} tolerance")
+            return 1
+        print("✅ No regressions against baseline")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
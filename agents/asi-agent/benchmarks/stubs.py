@@ -0,0 +1,684 @@
+"""
+Local stand-ins for the upstream services the agent talks to
+
+- JsonRpcStub: Hashio-style JSON-RPC serving getMarket/getMarketCount eth_calls
+  and BetPlaced logs for delta sync (eth_getLogs); accepts signed placeBet
+  transactions and mines them into blocks every `block_time` seconds
+- HermesStub: Pyth Hermes latest_price_feeds and the SSE price stream
+- GraphQLStub: betPlacedEvents history queries
+- SuiRpcHandler: Sui fullnode JSON-RPC for the prediction_market package -
+  registry and market objects (sui_getObject, sui_multiGetObjects,
+  suix_getDynamicFieldObject) and module events (suix_queryEvents)
+
+Each stub runs a ThreadingHTTPServer on an ephemeral port in a daemon thread
+and counts the calls it serves, so benchmarks never touch the network.
+Every stub accepts `latency` (seconds added per call) and `error_rate`
+(fraction of calls answered with HTTP 503) for fault injection.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import rlp
+from eth_account import Account
+from eth_utils import keccak
+
+from .synthetic import REFERENCE_TIMESTAMP, generate_markets
+
+WEI = 10 ** 18
+
+BET_PLACED_TOPIC = '0x' + keccak(text='BetPlaced(uint256,address,uint8,uint256,uint256)').hex()
+MARKET_CREATED_TOPIC = '0x' + keccak(text='MarketCreated(uint256,string,address)').hex()
+PLACE_BET_SELECTOR = '0x' + keccak(text='placeBet(uint256,uint8)')[:4].hex()
+BET_GAS_USED = 90_000
+STUB_GAS_PRICE = 10 ** 9
+
+# Base prices (USD) for the Pyth feeds the servers request
+STUB_PRICES = {
+    'e62df6c8b4a85fe1a67db44dc12de5db330f7ac66b72dc658afedf0f4a415b43': 106632.0,  # BTC/USD
+    'ff61491a931112ddf1bd8147cd1b641375f79f5825126d665480874634fd0ace': 2650.0,    # ETH/USD
+    '8ac0c70fff57e9aefdf5edf44b51d62c2d433653cbb2cf5cc06bb115af04d221': 0.12       # HBAR/USD
+}
+
+def _word(value: int) -> bytes:
+    return int(value).to_bytes(32, 'big')
+
+def _encode_string(value: str) -> bytes:
+    raw = value.encode('utf-8')
+    padded = raw + b'\x00' * (-len(raw) % 32)
+    return _word(len(raw)) + padded
+
+def encode_market_tuple(market: Dict) -> str:
+    """ABI-encode a market dict as the getMarket(uint256) return value"""
+    a_shares = int(market.get('totalOptionAShares', 0) * WEI)
+    b_shares = int(market.get('totalOptionBShares', 0) * WEI)
+    head_values = [
+        market['id'],
+        market['title'],
+        market.get('description', ''),
+        market.get('optionA', 'Option A'),
+        market.get('optionB', 'Option B'),
+        market.get('category', 0),
+        int(market.get('creator', '0x0'), 16),
+        REFERENCE_TIMESTAMP,
+        market.get('endTime', REFERENCE_TIMESTAMP),
+        WEI // 10,
+        50 * WEI,
+        2 if market.get('resolved') else 0,
+        market.get('outcome', 0),
+        1 if market.get('resolved') else 0,
+        a_shares,
+        b_shares,
+        a_shares + b_shares
+    ]
+
+    head = b''
+    tail = b''
+    head_size = 32 * len(head_values)
+    for value in head_values:
+        if isinstance(value, str):
+            head += _word(head_size + len(tail))
+            tail += _encode_string(value)
+        else:
+            head += _word(value)
+
+    # Single dynamic tuple return value: leading offset, then the tuple body
+    return '0x' + (_word(32) + head + tail).hex()
+
+class StubServer:
+    """Runs a request handler class on 127.0.0.1 with call accounting"""
+
+    def __init__(self, handler_class, latency: float = 0.0, error_rate: float = 0.0,
+                 seed: int = 1234, **state):
+        self.handler_class = handler_class
+        self.state = state
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self.calls_by_route: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.state_lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record_call(self, route: str):
+        with self._lock:
+            self.calls += 1
+            self.calls_by_route[route] = self.calls_by_route.get(route, 0) + 1
+
+    def should_fail(self) -> bool:
+        """Decide whether this call gets an injected error"""
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return failed
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+            self.calls_by_route = {}
+
+    def start(self) -> "StubServer":
+        stub = self
+
+        class Handler(self.handler_class):
+            server_stub = stub
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_stub: StubServer = None
+    protocol_version = 'HTTP/1.1'
+    # Send headers and body in one segment; avoids Nagle/delayed-ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _inject_faults(self) -> bool:
+        """Apply configured latency; answer with 503 and return True on injected errors"""
+        stub = self.server_stub
+        if stub.latency > 0:
+            time.sleep(stub.latency)
+        if stub.should_fail():
+            stub.record_call('injected_error')
+            self._send_json({'error': 'injected upstream failure'}, status=503)
+            return True
+        return False
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(body.decode('utf-8')) if body else {}
+        except ValueError:
+            return {}
+
+    def _send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class JsonRpcHandler(_StubHandler):
+    """Minimal Ethereum JSON-RPC for the calls web3.py makes against the contract"""
+
+    def do_POST(self):
+        payload = self._read_json()
+        if self._inject_faults():
+            return
+        if isinstance(payload, list):
+            self._send_json([self._dispatch(item) for item in payload])
+        else:
+            self._send_json(self._dispatch(payload))
+
+    def _dispatch(self, request: Dict) -> Dict:
+        method = request.get('method', '')
+        params = request.get('params') or []
+        self.server_stub.record_call(method)
+        markets = self.server_stub.state['markets']
+        result = None
+
+        if method == 'web3_clientVersion':
+            result = 'chimera-stub/1.0'
+        elif method == 'eth_chainId':
+            result = hex(296)
+        elif method == 'net_version':
+            result = '296'
+        elif method == 'eth_blockNumber':
+            result = hex(self.server_stub.state.get('block_number', 1))
+        elif method == 'eth_call':
+            data = (params[0] or {}).get('data') or (params[0] or {}).get('input', '0x')
+            if len(data) <= 10:
+                # getMarketCount()
+                result = '0x' + _word(len(markets)).hex()
+            else:
+                market_id = int(data[10:74], 16)
+                if 1 <= market_id <= len(markets):
+                    result = encode_market_tuple(markets[market_id - 1])
+                else:
+                    return {'jsonrpc': '2.0', 'id': request.get('id'),
+                            'error': {'code': 3, 'message': 'execution reverted: Market does not exist'}}
+        elif method == 'eth_gasPrice':
+            result = hex(STUB_GAS_PRICE)
+        elif method == 'eth_getTransactionCount':
+            with self.server_stub.state_lock:
+                mine_pending(self.server_stub)
+                nonces = self.server_stub.state['nonces']
+                pending = self.server_stub.state['pending_nonces']
+                address = params[0].lower()
+                tag = params[1] if len(params) > 1 else 'latest'
+                result = hex((pending if tag == 'pending' else nonces).get(address, 0))
+        elif method == 'eth_sendRawTransaction':
+            try:
+                result = accept_transaction(self.server_stub, params[0])
+            except ValueError as e:
+                return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {'code': -32000, 'message': str(e)}}
+        elif method == 'eth_getTransactionReceipt':
+            with self.server_stub.state_lock:
+                mine_pending(self.server_stub)
+                result = self.server_stub.state['receipts'].get(params[0].lower())
+        elif method == 'eth_getLogs':
+            query = params[0] if params else {}
+            from_block = int(query.get('fromBlock', '0x0'), 16)
+            to_block = int(query.get('toBlock', hex(self.server_stub.state.get('block_number', 1))), 16)
+            result = [log for log in self.server_stub.state.get('logs', [])
+                      if from_block <= int(log['blockNumber'], 16) <= to_block]
+        else:
+            return {'jsonrpc': '2.0', 'id': request.get('id'),
+                    'error': {'code': -32601, 'message': f'Method {method} not supported by stub'}}
+
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+
+def accept_transaction(stub: StubServer, raw: str) -> str:
+    """Validate a signed legacy transaction and put it in the mempool"""
+    data = bytes.fromhex(raw.removeprefix('0x'))
+    try:
+        fields = rlp.decode(data)
+        sender = Account.recover_transaction(raw).lower()
+    except Exception as e:
+        raise ValueError(f'invalid transaction: {e}')
+    nonce = int.from_bytes(fields[0], 'big')
+    tx_hash = '0x' + keccak(data).hex()
+
+    with stub.state_lock:
+        mine_pending(stub)
+        state = stub.state
+        # Like a real node: future nonces wait in the pool until the gap before them is filled
+        if nonce < state['nonces'].get(sender, 0):
+            raise ValueError(f"nonce too low: next nonce {state['nonces'].get(sender, 0)}, tx nonce {nonce}")
+        if any(tx['from'] == sender and tx['nonce'] == nonce for tx in state['mempool']):
+            raise ValueError('already known')
+        state['mempool'].append({
+            'hash': tx_hash, 'from': sender, 'nonce': nonce,
+            'to': '0x' + fields[3].hex(), 'value': int.from_bytes(fields[4], 'big'), 'input': '0x' + fields[5].hex()
+        })
+        queued = {tx['nonce'] for tx in state['mempool'] if tx['from'] == sender}
+        pending = state['pending_nonces'].get(sender, state['nonces'].get(sender, 0))
+        while pending in queued:
+            pending += 1
+        state['pending_nonces'][sender] = pending
+        if state['next_block_at'] is None:
+            state['next_block_at'] = time.time() + state['block_time']
+    return tx_hash
+
+def mine_pending(stub: StubServer):
+    """Mine every block that is due (caller holds state_lock); blocks only advance while txs are pending"""
+    state = stub.state
+    now = time.time()
+    while state['mempool'] and state['next_block_at'] is not None and now >= state['next_block_at']:
+        capacity = state['block_gas_limit'] // BET_GAS_USED
+        next_nonce = dict(state['nonces'])
+        included, waiting = [], []
+        for tx in sorted(state['mempool'], key=lambda tx: (tx['from'], tx['nonce'])):
+            if len(included) < capacity and tx['nonce'] == next_nonce.get(tx['from'], 0):
+                next_nonce[tx['from']] = tx['nonce'] + 1
+                included.append(tx)
+            else:
+                waiting.append(tx)
+        state['mempool'] = waiting
+        if not included:
+            state['next_block_at'] = None
+            break
+        state['block_number'] = state.get('block_number', 1) + 1
+        block = hex(state['block_number'])
+        for index, tx in enumerate(included):
+            status = 1
+            if tx['input'].startswith(PLACE_BET_SELECTOR):
+                market_id = int(tx['input'][10:74], 16)
+                option = int(tx['input'][74:138], 16)
+                if 1 <= market_id <= len(state['markets']):
+                    apply_bet(state, market_id, option, tx['value'] / WEI, tx['hash'], sender=tx['from'])
+                else:
+                    status = 0
+            state['nonces'][tx['from']] = tx['nonce'] + 1
+            state['receipts'][tx['hash']] = {
+                'transactionHash': tx['hash'], 'transactionIndex': hex(index),
+                'blockNumber': block, 'blockHash': '0x' + _word(state['block_number']).hex(),
+                'from': tx['from'], 'to': tx['to'], 'status': hex(status),
+                'gasUsed': hex(BET_GAS_USED), 'cumulativeGasUsed': hex(BET_GAS_USED * (index + 1)),
+                'effectiveGasPrice': hex(STUB_GAS_PRICE), 'logs': [], 'contractAddress': None, 'type': '0x0'
+            }
+        state['blocks'].append(len(included))
+        state['next_block_at'] = state['next_block_at'] + state['block_time'] if state['mempool'] else None
+
+def apply_bet(state: Dict, market_id: int, option: int, amount: float, tx_hash: str,
+              sender: str = '0x' + '00' * 20):
+    """Apply a bet to a stub market at the current block and emit its BetPlaced log"""
+    market = state['markets'][market_id - 1]
+    shares_key = 'totalOptionAShares' if option == 0 else 'totalOptionBShares'
+    market[shares_key] = market.get(shares_key, 0) + amount
+    market['totalVolume'] = market.get('totalVolume', 0) + amount
+
+    state.setdefault('logs', []).append({
+        'address': '0x7Bee0AB565e6aB33009647174Eb8cd55B56EcD7c',
+        'topics': [BET_PLACED_TOPIC, '0x' + _word(market_id).hex(), '0x' + sender.removeprefix('0x').rjust(64, '0')],
+        'data': '0x' + (_word(option) + _word(int(amount * WEI)) + _word(int(amount * WEI))).hex(),
+        'blockNumber': hex(state.get('block_number', 1)),
+        'blockHash': '0x' + _word(state.get('block_number', 1)).hex(),
+        'transactionHash': tx_hash,
+        'transactionIndex': '0x0',
+        'logIndex': '0x0',
+        'removed': False
+    })
+
+class HermesHandler(_StubHandler):
+    """Pyth Hermes latest_price_feeds with deterministic prices"""
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if self._inject_faults():
+            return
+        self.server_stub.record_call(parsed.path)
+
+        ids = parse_qs(parsed.query).get('ids[]', [])
+        if parsed.path == '/api/latest_price_feeds':
+            self._send_json([self._price_feed(price_id) for price_id in ids])
+        elif parsed.path == '/v2/updates/price/stream':
+            self._stream(ids)
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def _stream(self, ids: List[str]):
+        """Server-sent events: one parsed price update for all ids per interval"""
+        state = self.server_stub.state
+        interval = state.get('stream_interval', 0.4)
+        max_events = state.get('stream_events')  # None streams until the client disconnects
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        tick = 0
+        try:
+            while max_events is None or tick < max_events:
+                payload = {'parsed': [self._price_feed(price_id, tick) for price_id in ids]}
+                self.wfile.write(f"data:{json.dumps(payload)}\n\n".encode())
+                self.wfile.flush()
+                tick += 1
+                time.sleep(interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    @staticmethod
+    def _price_feed(price_id: str, tick: int = 0) -> Dict:
+        feed_id = price_id.lower().replace('0x', '')
+        # Small deterministic drift so streamed updates are distinguishable
+        price = STUB_PRICES.get(feed_id, 1.0) * (1 + 0.0001 * (tick % 10))
+        price_update = {
+            'price': str(int(price * 10 ** 8)),
+            'conf': str(int(price * 10 ** 5)),
+            'expo': -8,
+            'publish_time': REFERENCE_TIMESTAMP + tick
+        }
+        return {'id': feed_id, 'price': price_update, 'ema_price': dict(price_update)}
+
+class GraphQLHandler(_StubHandler):
+    """Answers betPlacedEvents queries (one field, or one aliased field per market) with a deterministic bet history"""
+
+    def do_POST(self):
+        payload = self._read_json()
+        if self._inject_faults():
+            return
+        self.server_stub.record_call('graphql')
+
+        query = payload.get('query', '')
+        aliased = re.findall(r'(\w+):\s*betPlacedEvents\(where:\s*\{marketId:\s*(\d+)', query)
+        if aliased:
+            self._send_json({'data': {alias: self._events(int(market_id)) for alias, market_id in aliased}})
+            return
+        match = re.search(r'marketId:\s*(\d+)', query)
+        self._send_json({'data': {'betPlacedEvents': self._events(int(match.group(1)) if match else 0)}})
+
+    def _events(self, market_id: int) -> List[Dict]:
+        return [
+            {
+                'id': f"{market_id}-{i}",
+                'user': f"0x{(market_id * 7919 + i):040x}",
+                'agent': '0x0000000000000000000000000000000000000000',
+                'option': i % 2,
+                'amount': str((i + 1) * WEI),
+                'shares': str((i + 1) * WEI),
+                'blockTimestamp': str(REFERENCE_TIMESTAMP + i * 60)
+            }
+            for i in range(self.server_stub.state.get('events_per_market', 20))
+        ]
+
+SUI_PACKAGE_ID = '0x' + '0fc3' * 16
+SUI_REGISTRY_ID = '0x' + 'e154' * 16
+SUI_TABLE_ID = '0x' + '7ab1' * 16
+MIST = 10 ** 9
+
+def sui_market_object_id(market_id: int) -> str:
+    return f"0x{(0x5 << 252) | market_id:064x}"
+
+def _sui_market_fields(market: Dict) -> Dict:
+    """Move fields of a Market object as the fullnode renders them (u64 as strings)"""
+    return {
+        'id': {'id': sui_market_object_id(market['id'])},
+        'market_id': str(market['id']),
+        'title': market['title'],
+        'description': market.get('description', ''),
+        'option_a': market.get('optionA', 'Option A'),
+        'option_b': market.get('optionB', 'Option B'),
+        'category': market.get('category', 0),
+        'creator': '0x' + '00' * 32,
+        'created_at': str(REFERENCE_TIMESTAMP * 1000),
+        'end_time': str(market.get('endTime', REFERENCE_TIMESTAMP) * 1000),
+        'min_bet': str(MIST // 10),
+        'max_bet': str(50 * MIST),
+        'status': 2 if market.get('resolved') else 0,
+        'outcome': market.get('outcome', 0),
+        'resolved': bool(market.get('resolved')),
+        'total_option_a_shares': str(int(market.get('totalOptionAShares', 0) * MIST)),
+        'total_option_b_shares': str(int(market.get('totalOptionBShares', 0) * MIST)),
+        'total_pool': str(int(market.get('totalVolume', 0) * MIST)),
+        'image_url': '',
+        'market_type': 0,
+        'target_price': '0',
+        'price_above': False
+    }
+
+class SuiRpcHandler(_StubHandler):
+    """Sui fullnode JSON-RPC over the stub markets; markets[i] has market_id i + 1"""
+
+    def do_POST(self):
+        payload = self._read_json()
+        if self._inject_faults():
+            return
+        self.server_stub.record_call('http_request')
+        if isinstance(payload, list):
+            self._send_json([self._dispatch(item) for item in payload])
+        else:
+            self._send_json(self._dispatch(payload))
+
+    def _object(self, object_id: str) -> Dict:
+        markets = self.server_stub.state['markets']
+        market_id = int(object_id, 16) ^ (0x5 << 252)
+        if not 1 <= market_id <= len(markets):
+            return {'error': {'code': 'notExists', 'object_id': object_id}}
+        return {'data': {
+            'objectId': object_id,
+            'version': str(self.server_stub.state['versions'].get(market_id, 1)),
+            'content': {
+                'dataType': 'moveObject',
+                'type': f"{SUI_PACKAGE_ID}::prediction_market::Market",
+                'fields': _sui_market_fields(markets[market_id - 1])
+            }
+        }}
+
+    def _query_events(self, query: Dict, cursor: Optional[Dict], limit: int, descending: bool) -> Dict:
+        events = self.server_stub.state['events']
+        if 'MoveEventType' in query:
+            events = [e for e in events if e['type'] == query['MoveEventType']]
+        if descending:
+            events = events[::-1]
+        start = 0
+        if cursor:
+            ids = [e['id'] for e in events]
+            start = ids.index(cursor) + 1 if cursor in ids else 0
+        page = events[start:start + (limit or 50)]
+        return {
+            'data': page,
+            'nextCursor': page[-1]['id'] if page else cursor,
+            'hasNextPage': start + len(page) < len(events)
+        }
+
+    def _dispatch(self, request: Dict) -> Dict:
+        method = request.get('method', '')
+        params = request.get('params') or []
+        self.server_stub.record_call(method)
+        markets = self.server_stub.state['markets']
+
+        with self.server_stub.state_lock:
+            if method == 'sui_getObject' and params[0] == SUI_REGISTRY_ID:
+                result = {'data': {'objectId': SUI_REGISTRY_ID, 'content': {'fields': {
+                    'market_counter': str(len(markets)),
+                    'markets': {'type': '0x2::table::Table<u64, 0x2::object::ID>',
+                                'fields': {'id': {'id': SUI_TABLE_ID}, 'size': str(len(markets))}},
+                    'platform_fee': '250'
+                }}}}
+            elif method == 'sui_getObject':
+                result = self._object(params[0])
+            elif method == 'sui_multiGetObjects':
+                if len(params[0]) > 50:
+                    return {'jsonrpc': '2.0', 'id': request.get('id'),
+                            'error': {'code': -32602, 'message': 'Too many object ids (max 50)'}}
+                result = [self._object(object_id) for object_id in params[0]]
+            elif method == 'suix_getDynamicFieldObject' and params[0] == SUI_TABLE_ID:
+                market_id = int(params[1]['value'])
+                if 1 <= market_id <= len(markets):
+                    result = {'data': {'objectId': f"0x{market_id:064x}", 'content': {'fields': {
+                        'id': {'id': f"0x{market_id:064x}"},
+                        'name': str(market_id),
+                        'value': sui_market_object_id(market_id)
+                    }}}}
+                else:
+                    result = {'error': {'code': 'dynamicFieldNotFound', 'parent_object_id': SUI_TABLE_ID}}
+            elif method == 'suix_queryEvents':
+                query, cursor = params[0], params[1] if len(params) > 1 else None
+                limit = params[2] if len(params) > 2 else 50
+                descending = params[3] if len(params) > 3 else False
+                result = self._query_events(query, cursor, limit, descending)
+            else:
+                return {'jsonrpc': '2.0', 'id': request.get('id'),
+                        'error': {'code': -32601, 'message': f'Method {method} not supported by stub'}}
+
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+
+def emit_sui_event(state: Dict, kind: str, fields: Dict):
+    events = state['events']
+    events.append({
+        'id': {'txDigest': f"stub{len(events):040d}", 'eventSeq': '0'},
+        'packageId': SUI_PACKAGE_ID,
+        'transactionModule': 'prediction_market',
+        'sender': '0x' + '00' * 32,
+        'type': f"{SUI_PACKAGE_ID}::prediction_market::{kind}",
+        'parsedJson': fields,
+        'timestampMs': str(int(time.time() * 1000))
+    })
+
+class UpstreamStubs:
+    """Starts the RPC, Hermes, GraphQL and Sui stubs together"""
+
+    def __init__(self, markets: Optional[List[Dict]] = None, market_count: int = 10,
+                 latency: float = 0.0, error_rate: float = 0.0, block_time: float = 1.0,
+                 block_gas_limit: int = 15_000_000):
+        self.markets = markets if markets is not None else generate_markets(market_count)
+        faults = {'latency': latency, 'error_rate': error_rate}
+        self.rpc = StubServer(
+            JsonRpcHandler, markets=self.markets, block_number=1, block_time=block_time,
+            block_gas_limit=block_gas_limit, mempool=[], receipts={}, nonces={}, pending_nonces={},
+            next_block_at=None, blocks=[], **faults
+        )
+        self.hermes = StubServer(HermesHandler, **faults)
+        self.graphql = StubServer(GraphQLHandler, events_per_market=20, **faults)
+        # Serves the same market list as Sui objects
+        self.sui = StubServer(SuiRpcHandler, markets=self.markets, events=[], versions={}, **faults)
+
+    @property
+    def servers(self) -> List[StubServer]:
+        return [self.rpc, self.hermes, self.graphql, self.sui]
+
+    def total_calls(self) -> int:
+        return sum(server.calls for server in self.servers)
+
+    def calls_by_upstream(self) -> Dict[str, Dict]:
+        return {
+            'rpc': dict(self.rpc.calls_by_route),
+            'hermes': dict(self.hermes.calls_by_route),
+            'graphql': dict(self.graphql.calls_by_route),
+            'sui': dict(self.sui.calls_by_route)
+        }
+
+    def reset_counters(self):
+        for server in self.servers:
+            server.reset_counters()
+
+    def place_bet(self, market_id: int, option: int = 0, amount: float = 1.0):
+        """Apply a bet to a stub market in a new block and emit its BetPlaced log"""
+        state = self.rpc.state
+        with self.rpc.state_lock:
+            state['block_number'] = state.get('block_number', 1) + 1
+            apply_bet(state, market_id, option, amount, '0x' + _word(len(state.get('logs', [])) + 1).hex())
+
+    def replace_markets(self, markets: List[Dict]):
+        """Swap in a new dataset, announced as created in a new block so delta sync loads every market"""
+        state = self.rpc.state
+        with self.rpc.state_lock:
+            state['markets'] = markets
+            state['block_number'] = state.get('block_number', 1) + 1
+            block = hex(state['block_number'])
+            logs = state.setdefault('logs', [])
+            for market_id in range(1, len(markets) + 1):
+                logs.append({
+                    'address': '0x7Bee0AB565e6aB33009647174Eb8cd55B56EcD7c',
+                    'topics': [MARKET_CREATED_TOPIC, '0x' + _word(market_id).hex()],
+                    'data': '0x',
+                    'blockNumber': block,
+                    'blockHash': '0x' + _word(state['block_number']).hex(),
+                    'transactionHash': '0x' + _word(len(logs) + 1).hex(),
+                    'transactionIndex': '0x0',
+                    'logIndex': '0x0',
+                    'removed': False
+                })
+        with self.sui.state_lock:
+            self.sui.state['markets'] = markets
+            self.sui.state['versions'] = {}
+            for market_id in range(1, len(markets) + 1):
+                emit_sui_event(self.sui.state, 'MarketCreated', {'market_id': str(market_id)})
+        self.markets = markets
+
+    def place_sui_bet(self, market_id: int, option: int = 0, amount: float = 1.0):
+        """Apply a bet to a stub market and emit its Sui BetPlaced event"""
+        state = self.sui.state
+        with self.sui.state_lock:
+            market = state['markets'][market_id - 1]
+            shares_key = 'totalOptionAShares' if option == 0 else 'totalOptionBShares'
+            market[shares_key] = market.get(shares_key, 0) + amount
+            market['totalVolume'] = market.get('totalVolume', 0) + amount
+            state['versions'][market_id] = state['versions'].get(market_id, 1) + 1
+            emit_sui_event(state, 'BetPlaced', {
+                'market_id': str(market_id), 'user': '0x' + '11' * 32, 'agent': '0x' + '00' * 32,
+                'option': option, 'amount': str(int(amount * MIST)), 'shares': str(int(amount * MIST))
+            })
+
+    def sui_env(self) -> Dict[str, str]:
+        """Variables that switch simple_http_server to the Sui market source"""
+        return {
+            'SUI_RPC_URL': self.sui.url,
+            'CHIMERA_SUI_PACKAGE_ID': SUI_PACKAGE_ID,
+            'CHIMERA_SUI_REGISTRY_ID': SUI_REGISTRY_ID
+        }
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the agent servers at the stubs"""
+        return {
+            'HEDERA_RPC_URL': self.rpc.url,
+            'PYTH_HERMES_URL': self.hermes.url,
+            'CHIMERA_GRAPHQL_URL': self.graphql.url,
+            # Keep stub markets and bets out of the on-disk snapshot and ledger
+            'CHIMERA_SNAPSHOT_PATH': '',
+            'CHIMERA_LEDGER_PATH': ''
+        }
+
+    def __enter__(self) -> "UpstreamStubs":
+        for server in self.servers:
+            server.start()
+        return self
+
+    def __exit__(self, *exc):
+        for server in self.servers:
+            server.stop()
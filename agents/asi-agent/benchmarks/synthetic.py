@@ -0,0 +1,117 @@
+"""
+Deterministic synthetic market generators for benchmarks and stub upstreams
+"""
+
+import random
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+# Fixed reference time so generated end times do not drift between runs
+REFERENCE_TIMESTAMP = 1767225600  # 2026-01-01T00:00:00Z
+
+TITLE_TEMPLATES = [
+    ("Will Bitcoin reach $150,000 by December 31, 2025?", "Yes - BTC will hit $150K", "No - BTC stays below $150K"),
+    ("Will Ethereum reach $7,000 by March 31, 2026?", "Yes - ETH will hit $7K", "No - ETH stays below $7K"),
+    ("Will Hedera HBAR reach $1 by end of {year}?", "Yes", "No"),
+    ("Will DeFi TVL exceed $200B by {year}?", "Yes", "No"),
+    ("Will a crypto ETF reach $100B AUM by {year}?", "Yes", "No"),
+    ("Will Web3 gaming have 100M+ users by {year}?", "Yes", "No"),
+    ("Will Suimera project win hackathon #{n}?", "Yes - wins", "No - doesn't win")
+]
+
+CHAT_MESSAGES = [
+    "health",
+    "analyze markets",
+    "what should I bet on?",
+    "show me contrarian opportunities",
+    "bitcoin price outlook",
+    "what's your win rate?",
+    "help",
+    "hello there"
+]
+
+STRUCTURED_QUERIES = [
+    "analyze all markets",
+    "market overview",
+    "crypto sentiment",
+    "status"
+]
+
+def generate_markets(count: int, seed: int = 42) -> List[Dict]:
+    """Generate `count` markets in the simple_http_server market dict shape"""
+    rng = random.Random(seed)
+    markets = []
+
+    for market_id in range(1, count + 1):
+        title, option_a, option_b = TITLE_TEMPLATES[rng.randrange(len(TITLE_TEMPLATES))]
+        title = title.format(year=2025 + rng.randrange(3), n=market_id)
+
+        # Roughly a third of markets have no bets yet, which takes the price-analysis branch
+        if rng.random() < 0.3:
+            a_shares = 0.0
+            b_shares = 0.0
+        else:
+            a_shares = round(rng.uniform(0, 5000), 4)
+            b_shares = round(rng.uniform(0, 5000), 4)
+
+        total_shares = a_shares + b_shares
+        option_a_ratio = a_shares / total_shares if total_shares > 0 else 0.5
+        resolved = rng.random() < 0.1
+
+        markets.append({
+            'id': market_id,
+            'title': title,
+            'description': f"Synthetic benchmark market {market_id}",
+            'optionA': option_a,
+            'optionB': option_b,
+            'question': title,
+            'optionARatio': option_a_ratio,
+            'optionBRatio': 1 - option_a_ratio if total_shares > 0 else 0.5,
+            'totalVolume': total_shares,
+            'totalOptionAShares': a_shares,
+            'totalOptionBShares': b_shares,
+            'status': 'resolved' if resolved else 'active',
+            'resolved': resolved,
+            'outcome': rng.randrange(2) if resolved else 0,
+            'endTime': REFERENCE_TIMESTAMP + rng.randrange(-86400, 86400 * 90),
+            'creator': f"0x{rng.getrandbits(160):040x}",
+            'category': rng.randrange(6),
+            'lastUpdate': datetime.fromtimestamp(REFERENCE_TIMESTAMP).isoformat(),
+            'hasActivity': total_shares > 0
+        })
+
+    return markets
+
+def generate_user_ids(count: int, seed: int = 7) -> List[str]:
+    """Generate deterministic agent-style sender addresses"""
+    rng = random.Random(seed)
+    return [f"agent1q{rng.getrandbits(128):032x}" for _ in range(count)]
+
+def generate_bet_tape(markets: int, days: float = 365, bets_per_day: float = 24, seed: int = 42) -> Dict[str, np.ndarray]:
+    """Bet events and outcomes for `markets` markets opening over `days` days
+
+    Each market has a hidden probability of option A; the crowd overreacts
+    toward the favourite, so lopsided pools are where a contrarian edge lives.
+    Returns columns in the backtest file layout (timestamp, marketId, option,
+    amount) plus per-market outcomes and resolvedAt.
+    """
+    rng = np.random.default_rng(seed)
+    opened = REFERENCE_TIMESTAMP + rng.uniform(0, days * 86400, markets)
+    lifetime = rng.uniform(3, 60, markets) * 86400
+    probability = rng.beta(2, 2, markets)
+    crowd = np.clip(0.5 + 1.6 * (probability - 0.5) + rng.normal(0, 0.08, markets), 0.02, 0.98)
+
+    counts = rng.poisson(bets_per_day * lifetime / 86400)
+    market = np.repeat(np.arange(markets), counts)
+    timestamp = opened[market] + rng.uniform(0, 1, len(market)) * lifetime[market]
+    return {
+        'timestamp': timestamp,
+        'marketId': market + 1,
+        'option': (rng.uniform(0, 1, len(market)) >= crowd[market]).astype(np.int8),
+        'amount': np.round(rng.lognormal(2.0, 1.0, len(market)), 4),
+        'outcomeMarketId': np.arange(1, markets + 1),
+        'outcome': (rng.uniform(0, 1, markets) >= probability).astype(np.int8),
+        'resolvedAt': opened + lifetime
+    }
@@ -0,0 +1,247 @@
+"""
+Asynchronous bet execution for the Chimera contract
+
+Bets are queued (bounded, so a burst of signals applies backpressure instead
+of growing without limit), given nonces by a local NonceManager, signed and
+sent in JSON-RPC batches by a few sender tasks. Nothing blocks on a single
+transaction: one poller checks receipts for every pending bet in a batched
+eth_getTransactionReceipt request per interval, so several markets signalling
+at once end up in the same block.
+
+Without a private key - or with CHIMERA_BET_DRY_RUN left at its default -
+the executor runs in dry-run mode: transactions are built (and signed when a
+key is available) but never sent.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from eth_account import Account
+from web3 import Web3
+
+from rpc_client import JsonRpcClient, RpcError
+
+PLACE_BET_ABI = [
+    {
+        "inputs": [
+            {"name": "_marketId", "type": "uint256"},
+            {"name": "_option", "type": "uint8"}
+        ],
+        "name": "placeBet",
+        "outputs": [],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+DEFAULT_GAS_LIMIT = 300_000
+GAS_PRICE_TTL = 30.0          # seconds a fetched gas price is reused
+RECEIPT_TIMEOUT = 180.0       # pending longer than this counts as dropped
+
+@dataclass
+class BetOrder:
+    market_id: int
+    option: int                   # 0 = option A, 1 = option B
+    amount: float                 # native token units (converted to wei)
+    analysis: Optional[Dict] = None
+
+@dataclass
+class BetResult:
+    order: BetOrder
+    status: str                   # dry_run | confirmed | reverted | failed
+    tx_hash: Optional[str] = None
+    nonce: Optional[int] = None
+    block_number: Optional[int] = None
+    gas_used: Optional[int] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+class NonceManager:
+    """Hands out consecutive nonces locally instead of asking the node per transaction"""
+
+    def __init__(self, rpc: JsonRpcClient, address: str):
+        self.rpc = rpc
+        self.address = address
+        self._next: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def reserve(self, count: int = 1) -> List[int]:
+        async with self._lock:
+            if self._next is None:
+                self._next = int(await self.rpc.call('eth_getTransactionCount', self.address, 'pending'), 16)
+            nonces = list(range(self._next, self._next + count))
+            self._next += count
+            return nonces
+
+    def reset(self):
+        """Re-read the pending nonce from the node on next use (after a failed or dropped send)"""
+        self._next = None
+
+class BetExecutor:
+    """Bounded queue -> batched sign/send -> batched receipt polling"""
+
+    def __init__(self, rpc_url: str, contract_address: str, private_key: Optional[str] = None,
+                 dry_run: Optional[bool] = None, queue_size: int = 64, senders: int = 2,
+                 max_batch: int = 32, receipt_interval: float = 1.0, gas_limit: int = DEFAULT_GAS_LIMIT):
+        self.rpc = JsonRpcClient(rpc_url)
+        self.contract = Web3().eth.contract(address=Web3.to_checksum_address(contract_address), abi=PLACE_BET_ABI)
+        self.account = Account.from_key(private_key) if private_key else None
+        if dry_run is None:
+            dry_run = os.getenv("CHIMERA_BET_DRY_RUN", "true").lower() in ("1", "true", "yes")
+        self.dry_run = dry_run or self.account is None
+        self.nonces = NonceManager(self.rpc, self.account.address) if self.account else None
+
+        self.queue_size = queue_size
+        self.senders = senders
+        self.max_batch = max_batch
+        self.receipt_interval = receipt_interval
+        self.gas_limit = gas_limit
+
+        self.stats = {'queued': 0, 'sent': 0, 'confirmed': 0, 'reverted': 0, 'failed': 0, 'dry_run': 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Dict[str, tuple] = {}   # tx hash -> (BetResult, future)
+        self._tasks: List[asyncio.Task] = []
+        self._chain_id: Optional[int] = None
+        self._gas_price: Optional[int] = None
+        self._gas_price_at = 0.0
+
+    async def start(self):
+        """Start sender and receipt tasks on the running loop (idempotent)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._sender()) for _ in range(self.senders)]
+        if not self.dry_run:
+            self._tasks.append(asyncio.create_task(self._receipt_poller()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.rpc.close()
+
+    async def submit(self, order: BetOrder) -> "asyncio.Future[BetResult]":
+        """Queue a bet (waits while the queue is full); the future resolves when it is mined or fails"""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((order, future))
+        self.stats['queued'] += 1
+        return future
+
+    async def drain(self):
+        """Wait until every queued bet is sent and every sent bet has a receipt"""
+        await self._queue.join()
+        while self._pending:
+            await asyncio.sleep(self.receipt_interval / 4)
+
+    # --- sending ---
+
+    async def _next_batch(self) -> List[tuple]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _sender(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._send_batch(batch)
+            except Exception as e:
+                print(f"❌ Bet batch failed: {e}")
+                if self.nonces:
+                    self.nonces.reset()
+                for order, future in batch:
+                    self._finish(BetResult(order, 'failed', error=str(e)), future)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _tx_params(self) -> Dict:
+        if self._chain_id is None:
+            self._chain_id = int(await self.rpc.call('eth_chainId'), 16)
+        if self._gas_price is None or time.monotonic() - self._gas_price_at > GAS_PRICE_TTL:
+            self._gas_price = int(await self.rpc.call('eth_gasPrice'), 16)
+            self._gas_price_at = time.monotonic()
+        return {'chainId': self._chain_id, 'gasPrice': self._gas_price, 'gas': self.gas_limit}
+
+    def _build_tx(self, order: BetOrder, params: Dict, nonce: int) -> Dict:
+        return {
+            **params,
+            'to': self.contract.address,
+            'value': Web3.to_wei(order.amount, 'ether'),
+            'data': self.contract.encode_abi('placeBet', args=[int(order.market_id), int(order.option)]),
+            'nonce': nonce
+        }
+
+    async def _send_batch(self, batch: List[tuple]):
+        if self.dry_run:
+            for order, future in batch:
+                result = BetResult(order, 'dry_run')
+                if self.account:
+                    signed = self.account.sign_transaction(self._build_tx(order, await self._tx_params(), 0))
+                    result.tx_hash = '0x' + signed.hash.hex().removeprefix('0x')
+                self._finish(result, future)
+            return
+
+        params = await self._tx_params()
+        nonces = await self.nonces.reserve(len(batch))
+        signed = [
+            self.account.sign_transaction(self._build_tx(order, params, nonce))
+            for (order, _), nonce in zip(batch, nonces)
+        ]
+        replies = await self.rpc.batch('eth_sendRawTransaction', [
+            ['0x' + tx.raw_transaction.hex().removeprefix('0x')] for tx in signed
+        ])
+
+        for (order, future), nonce, tx, reply in zip(batch, nonces, signed, replies):
+            tx_hash = '0x' + tx.hash.hex().removeprefix('0x')
+            if isinstance(reply, RpcError):
+                # A rejected send leaves a nonce gap; later nonces cannot mine until it is re-read
+                self.nonces.reset()
+                self._finish(BetResult(order, 'failed', tx_hash=tx_hash, nonce=nonce, error=str(reply)), future)
+                continue
+            self.stats['sent'] += 1
+            self._pending[tx_hash] = (BetResult(order, 'pending', tx_hash=tx_hash, nonce=nonce), future)
+
+    # --- receipts ---
+
+    async def _receipt_poller(self):
+        while True:
+            await asyncio.sleep(self.receipt_interval)
+            if not self._pending:
+                continue
+            try:
+                await self._poll_receipts()
+            except Exception as e:
+                print(f"⚠️ Receipt polling failed: {e}")
+
+    async def _poll_receipts(self):
+        hashes = list(self._pending)
+        receipts = await self.rpc.batch('eth_getTransactionReceipt', [[tx_hash] for tx_hash in hashes])
+        now = time.time()
+        for tx_hash, receipt in zip(hashes, receipts):
+            result, future = self._pending[tx_hash]
+            if isinstance(receipt, RpcError) or receipt is None:
+                if now - result.submitted_at > RECEIPT_TIMEOUT:
+                    del self._pending[tx_hash]
+                    self.nonces.reset()
+                    result.status, result.error = 'failed', 'receipt timeout'
+                    self._finish(result, future)
+                continue
+            del self._pending[tx_hash]
+            result.status = 'confirmed' if int(receipt.get('status', '0x1'), 16) == 1 else 'reverted'
+            result.block_number = int(receipt['blockNumber'], 16)
+            result.gas_used = int(receipt.get('gasUsed', '0x0'), 16)
+            self._finish(result, future)
+
+    def _finish(self, result: BetResult, future: asyncio.Future):
+        result.finished_at = time.time()
+        self.stats[result.status] = self.stats.get(result.status, 0) + 1
+        if not future.done():
+            future.set_result(result)
@@ -0,0 +1,117 @@
+"""
+Bounded, fair scheduling of chat work for the uAgents handlers
+
+uAgents runs message handlers one after another, so a handler that fetches
+markets and analyzes them inline holds up every message behind it - a
+"ping" waits for someone else's full analysis. The handlers instead hand
+heavy work to a ChatScheduler and return at once; the job sends its own
+reply when it finishes.
+
+- At most `max_concurrency` jobs run at a time, across all senders.
+- Each sender has its own FIFO queue and at most one running job, so
+  replies go out in order. Senders with queued work take turns
+  (round-robin), so one chatty sender cannot starve the others.
+- A sender with `max_per_sender` jobs already queued, or a scheduler with
+  `max_queued` jobs waiting overall, gets submit() == False and a "busy"
+  reply instead of an ever-growing backlog.
+- health/status/ping never enter the queues (is_fast_path()).
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Set, Tuple
+
+MAX_CONCURRENCY = int(os.getenv("CHIMERA_CHAT_CONCURRENCY", "4"))
+MAX_PER_SENDER = int(os.getenv("CHIMERA_CHAT_SENDER_QUEUE", "3"))
+MAX_QUEUED = int(os.getenv("CHIMERA_CHAT_MAX_QUEUED", "256"))
+FAST_PATH_COMMANDS = frozenset({'health', 'status', 'ping'})
+
+Job = Callable[[], Awaitable[None]]
+
+def is_fast_path(text: str) -> bool:
+    """Messages answered immediately, without queueing behind analysis work"""
+    return (text or '').strip().lower() in FAST_PATH_COMMANDS
+
+class ChatScheduler:
+    """Per-sender queues drained round-robin under a global concurrency limit
+
+    Call submit() from the agent's event loop; jobs run as tasks on it.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, max_per_sender: int = MAX_PER_SENDER,
+                 max_queued: int = MAX_QUEUED):
+        self.max_concurrency = max_concurrency
+        self.max_per_sender = max_per_sender
+        self.max_queued = max_queued
+        self._queues: Dict[str, Deque[Tuple[Job, float]]] = {}
+        self._ready: Deque[str] = deque()       # senders with queued work and no running job
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.queued = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_wait = 0.0
+
+    def submit(self, sender: str, job: Job) -> bool:
+        """Queue `job` for `sender`; False (nothing queued) when the sender or scheduler is full"""
+        queue = self._queues.get(sender)
+        if (queue and len(queue) >= self.max_per_sender) or self.queued >= self.max_queued:
+            self.rejected += 1
+            return False
+        if queue is None:
+            queue = self._queues[sender] = deque()
+        queue.append((job, time.monotonic()))
+        self.queued += 1
+        self.submitted += 1
+        if len(queue) == 1 and sender not in self._running:
+            self._ready.append(sender)
+        self._dispatch()
+        return True
+
+    def _dispatch(self):
+        while self._ready and len(self._running) < self.max_concurrency:
+            sender = self._ready.popleft()
+            job, enqueued_at = self._queues[sender].popleft()
+            self.queued -= 1
+            self._running.add(sender)
+            task = asyncio.ensure_future(self._run(sender, job, enqueued_at))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, sender: str, job: Job, enqueued_at: float):
+        self.max_wait = max(self.max_wait, time.monotonic() - enqueued_at)
+        try:
+            await job()
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ Chat job for {sender} failed: {e}")
+        finally:
+            self.completed += 1
+            self._running.discard(sender)
+            if self._queues.get(sender):
+                self._ready.append(sender)      # back of the line behind other waiting senders
+            else:
+                self._queues.pop(sender, None)
+            self._dispatch()
+
+    async def join(self):
+        """Wait until every queued and running job has finished"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def status(self) -> Dict:
+        return {
+            'maxConcurrency': self.max_concurrency,
+            'running': len(self._running),
+            'queued': self.queued,
+            'waitingSenders': len(self._ready),
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            'failed': self.failed,
+            'maxWaitSeconds': round(self.max_wait, 3)
+        }
@@ -0,0 +1,138 @@
+"""
+Negotiated response compression for the Flask apps
+
+ResponseCompressor hooks after_request: JSON and text responses above a size
+threshold are compressed with the best encoding the client accepts (brotli
+when the brotli package is installed, else gzip). Each such response gets a
+strong ETag, a hash of the body, and compressed bytes are cached per (body
+hash, encoding): identical bodies - e.g. the same query against the same
+snapshot - are compressed once, not once per request, and a body that
+differs in any byte can never be served another body's compressed bytes.
+Views keep such bodies identical by leaving out per-request fields (clock
+times, data age); GETs whose If-None-Match matches get a bodiless 304.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from flask import request
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+MIN_SIZE = 1024                  # bytes; smaller bodies gain little and cost a header
+CACHE_ENTRIES = 256
+CACHE_BYTES = 32 * 1024 * 1024
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """'br' or 'gzip' from an Accept-Encoding header (q-values honored), or None"""
+    offered = {}
+    for part in (accept_encoding or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            offered[name] = q
+    wildcard = offered.get('*', 0.0)
+    candidates = (['br'] if BROTLI_AVAILABLE else []) + ['gzip']
+    best = max(candidates, key=lambda name: offered.get(name, wildcard))
+    return best if offered.get(best, wildcard) > 0 else None
+
+def compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=min(level, 11))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+class ResponseCompressor:
+    """after_request compression with ETags and a bounded cache of compressed variants"""
+
+    def __init__(self, app=None, min_size: int = MIN_SIZE, level: int = 6,
+                 max_entries: int = CACHE_ENTRIES, max_bytes: int = CACHE_BYTES):
+        self.min_size = min_size
+        self.level = level
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+
+    def _compressed(self, etag: str, encoding: str, body: bytes) -> bytes:
+        key = (etag, encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+        data = compress(body, encoding, self.level)
+        with self._lock:
+            self.misses += 1
+            if key not in self._cache:
+                self._cache[key] = data
+                self._cached_bytes += len(data)
+                while self._cache and (len(self._cache) > self.max_entries or self._cached_bytes > self.max_bytes):
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+        return data
+
+    def after_request(self, response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        etag = body_etag(body)
+        encoding = negotiate(request.headers.get('Accept-Encoding', ''))
+        # Each representation gets its own validator; conditional requests may name either
+        variant_etag = etag[:-1] + f'-{encoding}"' if encoding else etag
+        if request.method == 'GET' and any(request.if_none_match.contains_raw(tag) for tag in (etag, variant_etag)):
+            self.not_modified += 1
+            response.status_code = 304
+            response.set_data(b'')
+            response.headers['ETag'] = variant_etag
+            response.headers.pop('Content-Length', None)
+            return response
+
+        response.headers['ETag'] = variant_etag
+        if encoding:
+            response.set_data(self._compressed(etag, encoding, body))
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                'encodings': (['br'] if BROTLI_AVAILABLE else []) + ['gzip'],
+                'minSize': self.min_size,
+                'cachedVariants': len(self._cache),
+                'cachedBytes': self._cached_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'notModified': self.not_modified
+            }
@@ -0,0 +1,266 @@
+"""
+Pluggable market data sources with DataLoader-style batching
+
+Every backend - the EVM contract over eth_call, the Sui package, the
+Blockscout/GraphQL indexer - implements MarketSource: list the market ids
+and load many markets (or bet histories) in one upstream call. Callers never
+use those batch methods per market; they ask a LoaderScope for one market at
+a time and the scope's DataLoaders collect every request made in the same
+event-loop tick into a single batch call, then cache the results for the
+rest of the scope (one HTTP request, one refresh, one analysis pass).
+
+A new backend only has to provide the batch methods to get batching,
+de-duplication and per-scope caching for free.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Set
+
+from eth_abi import decode
+from eth_utils import keccak
+
+from resilience import RPC_TIMEOUT
+from rpc_client import JsonRpcClient, RpcError
+
+WEI = 10 ** 18
+CONTRACT_BATCH_SIZE = 100       # eth_calls per JSON-RPC batch request
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Sequence[Any]]]
+
+class DataLoader:
+    """Coalesces load(key) calls from one event-loop tick into one batch_fn(keys) call
+
+    batch_fn returns one value per key, in key order; an Exception in a slot
+    fails only that key. Results are cached per key for the loader's lifetime
+    (failures are not), so a loader should live as long as one request scope.
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch_size: Optional[int] = None, cache: bool = True):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.cache = cache
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._queued: Dict[Hashable, asyncio.Future] = {}
+        self._batches: Set[asyncio.Task] = set()     # the loop keeps only weak references to tasks
+        self.requested = 0
+        self.cache_hits = 0
+        self.batches = 0
+
+    async def load(self, key: Hashable):
+        self.requested += 1
+        future = self._futures.get(key) if self.cache else None
+        if future is not None:
+            self.cache_hits += 1
+        else:
+            future = self._queued.get(key)
+            if future is None:
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                if not self._queue:
+                    # Runs after every task already scheduled for this tick has queued its keys
+                    loop.call_soon(self._dispatch)
+                self._queue.append(key)
+                self._queued[key] = future
+                if self.cache:
+                    self._futures[key] = future
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Sequence[Hashable], return_exceptions: bool = False) -> List:
+        return await asyncio.gather(*(self.load(key) for key in keys), return_exceptions=return_exceptions)
+
+    def prime(self, key: Hashable, value):
+        """Seed the cache with a value loaded some other way"""
+        if self.cache and key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: Optional[Hashable] = None):
+        if key is None:
+            self._futures.clear()
+        else:
+            self._futures.pop(key, None)
+
+    def _dispatch(self):
+        keys, futures = self._queue, self._queued
+        self._queue, self._queued = [], {}
+        size = self.max_batch_size or len(keys)
+        for start in range(0, len(keys), size):
+            chunk = keys[start:start + size]
+            task = asyncio.ensure_future(self._run_batch(chunk, [futures[key] for key in chunk]))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, keys: List[Hashable], futures: List[asyncio.Future]):
+        self.batches += 1
+        try:
+            values = list(await self.batch_fn(keys))
+            if len(values) != len(keys):
+                raise RuntimeError(f"batch function returned {len(values)} values for {len(keys)} keys")
+        except Exception as e:
+            values = [e] * len(keys)
+        for key, future, value in zip(keys, futures, values):
+            if isinstance(value, Exception):
+                self._futures.pop(key, None)
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+
+    def stats(self) -> Dict:
+        return {
+            'requested': self.requested,
+            'cacheHits': self.cache_hits,
+            'batches': self.batches
+        }
+
+class MarketSource:
+    """A market backend: batch loads only; use a LoaderScope for per-market access"""
+    name = 'source'
+    max_batch_size: Optional[int] = None
+
+    async def market_ids(self) -> List[int]:
+        """Every market id the backend knows about"""
+        raise NotImplementedError
+
+    async def load_markets(self, market_ids: List[int]) -> List[Optional[Dict]]:
+        """Market dicts for `market_ids`, in order; None for unknown ids"""
+        raise NotImplementedError
+
+    async def load_histories(self, market_ids: List[int]) -> List[List[Dict]]:
+        """Bet events per market, in order; backends without history return empty lists"""
+        return [[] for _ in market_ids]
+
+    async def close(self):
+        pass
+
+class LoaderScope:
+    """Per-request view of a MarketSource with batched, cached market and history loads"""
+
+    def __init__(self, source: MarketSource):
+        self.source = source
+        self.markets = DataLoader(source.load_markets, max_batch_size=source.max_batch_size)
+        self.histories = DataLoader(source.load_histories, max_batch_size=source.max_batch_size)
+
+    async def market(self, market_id: int) -> Optional[Dict]:
+        return await self.markets.load(int(market_id))
+
+    async def history(self, market_id: int) -> List[Dict]:
+        return await self.histories.load(int(market_id))
+
+    async def load_markets(self, market_ids: Optional[Sequence[int]] = None):
+        """(markets found, {market id: error}) for the given ids, or for every id the source lists"""
+        if market_ids is None:
+            market_ids = await self.source.market_ids()
+        results = await self.markets.load_many([int(i) for i in market_ids], return_exceptions=True)
+        markets, errors = [], {}
+        for market_id, result in zip(market_ids, results):
+            if isinstance(result, Exception):
+                errors[int(market_id)] = result
+            elif result is not None:
+                markets.append(result)
+        return markets, errors
+
+_scope_locks_guard = threading.Lock()
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _scope_lock(source: MarketSource) -> threading.Lock:
+    with _scope_locks_guard:
+        lock = source.__dict__.get('_scope_lock')
+        if lock is None:
+            lock = source.__dict__['_scope_lock'] = threading.Lock()
+        return lock
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Event loop running in a daemon thread for synchronous callers; HTTP sessions on it stay warm"""
+    global _background_loop
+    with _scope_locks_guard:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(target=_background_loop.run_forever, name='data-sources', daemon=True).start()
+        return _background_loop
+
+def run_in_scope(source: MarketSource, work: Callable[[LoaderScope], Awaitable]):
+    """Run `work(scope)` on the background loop and wait for it, for synchronous callers
+
+    Threads using the same source take turns, so a stateful source sees one scope at a time.
+    """
+    with _scope_lock(source):
+        return run_background(work(LoaderScope(source)))
+
+def run_background(coro):
+    """Run a coroutine on the background loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, background_loop()).result()
+
+# --- EVM contract ---
+
+DEFAULT_CONTRACT_ADDRESS = "0x7Bee0AB565e6aB33009647174Eb8cd55B56EcD7c"   # ChimeraMarket on Hedera testnet
+_GET_MARKET_SELECTOR = '0x' + keccak(text='getMarket(uint256)')[:4].hex()
+_GET_MARKET_COUNT_SELECTOR = '0x' + keccak(text='getMarketCount()')[:4].hex()
+_MARKET_TUPLE_TYPE = ('(uint256,string,string,string,string,uint8,address,uint256,uint256,'
+                      'uint256,uint256,uint8,uint8,bool,uint256,uint256,uint256)')
+
+def parse_market_tuple(values, refreshed_at: float) -> Dict:
+    """A decoded getMarket(uint256) tuple as a market dict"""
+    (market_id, title, description, option_a, option_b, category, creator,
+     _created_at, end_time, _min_bet, _max_bet, _status, outcome, resolved,
+     a_shares, b_shares, total_pool) = values
+    total_shares = a_shares + b_shares
+    option_a_ratio = float(a_shares) / float(total_shares) if total_shares > 0 else 0.5
+    option_b_ratio = float(b_shares) / float(total_shares) if total_shares > 0 else 0.5
+    return {
+        'id': int(market_id),
+        'title': title,
+        'description': description,
+        'optionA': option_a,
+        'optionB': option_b,
+        'question': title,
+        'optionARatio': option_a_ratio,
+        'optionBRatio': option_b_ratio,
+        'totalVolume': total_pool / WEI,
+        'totalOptionAShares': a_shares / WEI,
+        'totalOptionBShares': b_shares / WEI,
+        'status': 'resolved' if resolved else 'active',
+        'resolved': resolved,
+        'outcome': int(outcome),
+        'endTime': int(end_time),
+        'creator': creator,
+        'category': int(category),
+        'lastUpdate': refreshed_at,
+        'hasActivity': total_shares > 0
+    }
+
+class ContractMarketSource(MarketSource):
+    """ChimeraMarket contract: getMarket eth_calls sent as JSON-RPC batches"""
+    name = 'contract'
+    max_batch_size = CONTRACT_BATCH_SIZE
+
+    def __init__(self, rpc_url: str, contract_address: str, timeout: float = RPC_TIMEOUT):
+        self.contract_address = contract_address
+        self.rpc = JsonRpcClient(rpc_url, timeout=timeout)
+
+    def _call(self, data: str) -> List:
+        return [{'to': self.contract_address, 'data': data}, 'latest']
+
+    async def market_ids(self) -> List[int]:
+        count = int(await self.rpc.call('eth_call', *self._call(_GET_MARKET_COUNT_SELECTOR)), 16)
+        return list(range(1, count + 1))
+
+    async def load_markets(self, market_ids: List[int]) -> List:
+        replies = await self.rpc.batch('eth_call', [
+            self._call(_GET_MARKET_SELECTOR + f"{market_id:064x}") for market_id in market_ids
+        ])
+        refreshed_at = time.time()
+        markets = []
+        for reply in replies:
+            if isinstance(reply, RpcError):
+                markets.append(reply)
+            else:
+                (values,) = decode([_MARKET_TUPLE_TYPE], bytes.fromhex(reply[2:]))
+                markets.append(parse_market_tuple(values, refreshed_at))
+        return markets
+
+    async def close(self):
+        await self.rpc.close()
@@ -0,0 +1,113 @@
+"""
+Fast JSON encoding for the HTTP servers
+
+dumps() goes through orjson when it is installed (several times faster than
+the stdlib on the large market and analysis lists) and falls back to a
+compact json.dumps otherwise; both return bytes. FastJSONProvider plugs it
+into Flask, so every jsonify() call uses it.
+
+Static or rarely changing responses are encoded once:
+- StaticJSON keeps the encoded members of a fixed payload and splices in the
+  few per-request members (a timestamp, marked DYNAMIC in the template) at
+  their template position, without re-encoding the rest.
+- encoded_text() caches the JSON encoding of long strings such as the chat
+  help text; encode_members() copies Encoded values into an object verbatim.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict
+
+from flask import current_app
+from flask.json.provider import JSONProvider
+
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+MIMETYPE = 'application/json'
+ENCODER = 'orjson' if ORJSON_AVAILABLE else 'json'
+
+def _default(value):
+    """Types neither encoder handles natively"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if ORJSON_AVAILABLE:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value) -> bytes:
+        return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+else:
+    def dumps(value) -> bytes:
+        return json.dumps(value, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    loads = json.loads
+
+class Encoded(bytes):
+    """An already encoded JSON value; encode_members() copies it verbatim"""
+
+@lru_cache(maxsize=256)
+def encoded_text(text: str) -> Encoded:
+    """Encoded JSON string, cached - for long texts that repeat across requests"""
+    return Encoded(dumps(text))
+
+def _member(key: str, value: Any) -> bytes:
+    return dumps(key) + b':' + (value if isinstance(value, Encoded) else dumps(value))
+
+def encode_members(members: Dict[str, Any]) -> bytes:
+    """Encode a flat object whose values may be Encoded"""
+    return b'{' + b','.join(_member(key, value) for key, value in members.items()) + b'}'
+
+DYNAMIC = object()   # StaticJSON template value for a member supplied to render()
+
+class StaticJSON:
+    """A payload encoded once; render() fills in the DYNAMIC members, keeping the template's key order"""
+
+    def __init__(self, payload: Dict[str, Any]):
+        # Encoded fixed members, or the key of a member rendered per request
+        self._parts = [key if value is DYNAMIC else _member(key, value) for key, value in payload.items()]
+        self.dynamic = frozenset(key for key, value in payload.items() if value is DYNAMIC)
+        self.body = None if self.dynamic else b'{' + b','.join(self._parts) + b'}'
+
+    def render(self, **dynamic) -> bytes:
+        if self.body is not None:
+            return self.body
+        if dynamic.keys() != self.dynamic:
+            raise TypeError(f"render() takes exactly the DYNAMIC members {sorted(self.dynamic)}")
+        return b'{' + b','.join(
+            part if isinstance(part, bytes) else _member(part, dynamic[part]) for part in self._parts
+        ) + b'}'
+
+def json_response(body: bytes, status: int = 200):
+    """Flask response for an already encoded body"""
+    return current_app.response_class(body, status=status, mimetype=MIMETYPE)
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps()/loads(); install with app.json = FastJSONProvider(app)"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        return self._app.response_class(dumps(self._prepare_response_obj(args, kwargs)), mimetype=MIMETYPE)
@@ -10,6 +10,11 @@ import threading
 import time
 from datetime import datetime
 from market_analyzer import ChimeraAgent, MarketAnalysis, ChimeraResponse, StructuredQuery
+from intent_router import IntentRouter
+from refresh_worker import RefreshWorker, SnapshotStore
+from compression import ResponseCompressor
+from fast_json import ENCODER as JSON_ENCODER, FastJSONProvider, encode_members, encoded_text, json_response
+from push_channel import PushHub, digest_updates
 import os
 from dotenv import load_dotenv
 
@@ -17,30 +22,37 @@ from dotenv import load_dotenv
 load_dotenv()
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend integration
+CORS(app, expose_headers=['X-Data-Age'])  # Enable CORS for frontend integration
+app.json = FastJSONProvider(app)  # orjson-backed jsonify
+compressor = ResponseCompressor(app)  # gzip/brotli above 1 KB, compressed once per ETag
 
 # Global agent instance
 agent_instance = None
 agent_thread = None
+refresh_worker = None
+
+# Latest market/analysis snapshot published by the refresh worker; handlers only read it
+snapshots = SnapshotStore()
+REFRESH_INTERVAL = float(os.getenv("CHIMERA_REFRESH_INTERVAL", "60"))
+
+# Subscribers get each published snapshot's changed markets over WebSocket/SSE
+PUSH_PORT = os.getenv("CHIMERA_PUSH_PORT", "")
+push_hub = None
 
 def run_agent_in_thread():
-    """Run the ASI agent in a separate thread"""
-    global agent_instance
+    """Run the ASI agent's refresh pipeline in a separate thread"""
+    global agent_instance, refresh_worker
     try:
-        # Create new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         rpc_endpoint = os.getenv("HEDERA_RPC_URL", "https://testnet.hashio.io/api")
         agent_instance = ChimeraAgent(rpc_endpoint)
         
         print(f"✅ ASI Agent initialized successfully")
         print(f"📡 Agent address: {agent_instance.agent.address}")
         
-        # Keep the thread alive but don't run the full agent
-        # (The full agent.run() causes issues in threading)
-        while True:
-            time.sleep(1)
+        # The full agent.run() does not work off the main thread; run its
+        # fetch-and-analyze pipeline on this thread's own event loop instead
+        refresh_worker = RefreshWorker(agent_instance, snapshots, interval=REFRESH_INTERVAL)
+        refresh_worker.run()
             
     except Exception as e:
         print(f"❌ Error running agent: {e}")
@@ -54,6 +66,9 @@ def health_check():
         'status': 'healthy' if agent_instance else 'starting',
         'timestamp': datetime.now().isoformat(),
         'agent_address': getattr(agent_instance.agent, 'address', None) if agent_instance else None,
+        'snapshot': snapshot_status(),
+        'compression': compressor.status(),
+        'jsonEncoder': JSON_ENCODER,
         'version': '1.0.0'
     })
 
@@ -80,11 +95,39 @@ def get_status():
         'configuration': {
             'max_bet_amount': agent_instance.max_bet_amount,
             'min_confidence': agent_instance.min_confidence,
-            'analysis_interval': agent_instance.analysis_interval
+            'analysis_interval': agent_instance.analysis_interval,
+            'refresh_interval': REFRESH_INTERVAL
         },
+        'snapshot': snapshot_status(),
+        'marketRefresh': agent_instance.rpc_fetcher.refresh_flight.status(),
+        'chatScheduler': agent_instance.chat_scheduler.status(),
+        'responseCache': agent_instance.response_cache.status(),
+        'push': push_hub.status() if push_hub else {'enabled': False},
         'timestamp': datetime.now().isoformat()
     })
 
+def snapshot_status() -> dict:
+    """Age and outcome of the latest published refresh"""
+    snapshot = snapshots.current
+    if not snapshot:
+        return {'ready': False}
+    return {
+        'ready': True,
+        'markets': snapshot.digest.total,
+        'sequence': snapshot.sequence,
+        'refreshedAt': snapshot.refreshed_at.isoformat(),
+        'ageSeconds': round((datetime.now() - snapshot.refreshed_at).total_seconds(), 1),
+        'refreshSeconds': round(snapshot.refresh_seconds, 3),
+        'error': snapshot.error
+    }
+
+def _snapshot_unavailable():
+    return jsonify({
+        'error': 'Market data is not loaded yet',
+        'message': 'ASI Agent is starting up. Please wait a moment and try again.',
+        'status': 'starting'
+    }), 503
+
 @app.route('/chat', methods=['POST'])
 def chat_endpoint():
     """Chat endpoint for natural language interaction"""
@@ -105,11 +148,12 @@ def chat_endpoint():
         # Process the message (simulate agent response for now)
         response_message = process_chat_message(message)
         
-        return jsonify({
-            'message': response_message,
+        # Help and status texts repeat verbatim; their encoding is cached
+        return json_response(encode_members({
+            'message': encoded_text(response_message),
             'timestamp': datetime.now().isoformat(),
             'conversation_id': conversation_id
-        })
+        }))
         
     except Exception as e:
         return jsonify({
@@ -123,10 +167,14 @@ def structured_query():
     try:
         data = request.get_json()
         query = data.get('query', '')
-        parameters = data.get('parameters', {})
+        parameters = data.get('parameters')
+        if parameters is None:
+            parameters = {}
         
         if not query:
             return jsonify({'error': 'Query is required'}), 400
+        if not isinstance(parameters, dict):
+            return jsonify({'error': 'parameters must be a JSON object', 'analysis': [], 'type': 'error'}), 400
         
         if not agent_instance:
             return jsonify({
@@ -136,10 +184,15 @@ def structured_query():
             }), 503
         
         # Process structured query
-        response = process_structured_query(query, parameters)
-        
-        return jsonify(response)
+        return jsonify(process_structured_query(query, parameters))
         
+    except ValueError as e:
+        return jsonify({
+            'error': f'Invalid query parameters: {str(e)}',
+            'message': 'Sorry, I could not understand those query parameters.',
+            'analysis': [],
+            'type': 'error'
+        }), 400
     except Exception as e:
         return jsonify({
             'error': f'Error processing query: {str(e)}',
@@ -157,35 +210,50 @@ def analyze_market():
         if not agent_instance:
             return jsonify({'error': 'ASI Agent not available'}), 503
         
-        # Simulate market analysis
+        snapshot = snapshots.current
+        if not snapshot:
+            return _snapshot_unavailable()
+        
+        market_id = market_data.get('marketId')
+        try:
+            analysis = snapshot.digest.analysis_by_id.get(int(market_id))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'marketId must be an integer'}), 400
+        if not analysis:
+            return jsonify({'error': f'Market {market_id} not found'}), 404
+        market = snapshot.digest.market_by_id[analysis['marketId']]
+        
         analysis = {
-            'marketId': market_data.get('marketId'),
-            'confidence': 0.75,
-            'recommendation': 'optionA',
-            'reasoning': 'Based on MeTTa reasoning and contrarian analysis, Option A shows strong potential.',
+            'marketId': analysis['marketId'],
+            'confidence': analysis['confidence'],
+            'recommendation': analysis['recommendation'],
+            'reasoning': analysis['reasoning'],
             'factors': [
                 {
-                    'name': 'Market Sentiment',
-                    'weight': 0.3,
-                    'value': 0.8,
-                    'description': 'Positive sentiment indicators'
+                    'name': 'Crowd Bias',
+                    'weight': 0.6,
+                    'value': abs(market['optionARatio'] - 0.5) * 2,
+                    'description': f"Option A holds {market['optionARatio']:.1%} of shares"
                 },
                 {
                     'name': 'Volume Analysis',
                     'weight': 0.4,
-                    'value': 0.7,
-                    'description': 'Strong volume supporting Option A'
+                    'value': min(1.0, market['totalVolume'] / 10000),
+                    'description': f"{market['totalVolume']:,.0f} PYUSD in the pool"
                 }
             ],
             'riskAssessment': {
-                'level': 'medium',
+                'level': analysis['risk_level'].lower(),
                 'factors': ['Market volatility', 'Time remaining']
             },
-            'expectedValue': 1.25,
-            'timestamp': datetime.now().isoformat()
+            'metta': analysis.get('metta_analysis'),
+            'timestamp': snapshot.refreshed_at.isoformat()
         }
         
-        return jsonify(analysis)
+        # The body is fixed per snapshot; its age changes per request, so it goes in a header
+        response = jsonify(analysis)
+        response.headers['X-Data-Age'] = str(snapshot_status()['ageSeconds'])
+        return response
         
     except Exception as e:
         return jsonify({'error': f'Error analyzing market: {str(e)}'}), 500
@@ -201,17 +269,38 @@ def betting_recommendation():
         if not agent_instance:
             return jsonify({'error': 'ASI Agent not available'}), 503
         
-        # Simulate betting recommendation
+        snapshot = snapshots.current
+        if not snapshot:
+            return _snapshot_unavailable()
+        
+        try:
+            analysis = snapshot.digest.analysis_by_id.get(int(market_id))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'marketId must be an integer'}), 400
+        if not analysis:
+            return jsonify({'error': f'Market {market_id} not found'}), 404
+        market = snapshot.digest.market_by_id[analysis['marketId']]
+        
+        actionable = analysis['recommendation'] in ('BUY_A', 'BUY_B') and \
+            analysis['confidence'] >= agent_instance.min_confidence
+        max_amount = min(agent_instance.max_bet_amount, user_profile.get('maxBetAmount', agent_instance.max_bet_amount))
+        hours_left = (market['endTime'] - time.time()) / 3600
+        
+        risk_warnings = []
+        if analysis['risk_level'] == 'HIGH':
+            risk_warnings.append('Low liquidity - payouts move with every bet')
+        if 0 < hours_left < 24:
+            risk_warnings.append(f'Market closes in {hours_left:.0f} hours')
+        
         recommendation = {
-            'marketId': market_id,
-            'action': 'bet',
-            'option': 'optionA',
-            'suggestedAmount': 50,
-            'confidence': 0.8,
-            'reasoning': 'Strong contrarian opportunity detected with favorable risk/reward ratio.',
-            'riskWarnings': ['Market closes in 24 hours', 'High volatility expected'],
-            'expectedReturn': 1.4,
-            'timeframe': '24h'
+            'marketId': analysis['marketId'],
+            'action': 'bet' if actionable else 'hold',
+            'option': {'BUY_A': 'optionA', 'BUY_B': 'optionB'}.get(analysis['recommendation']),
+            'suggestedAmount': int(max_amount * analysis['confidence']) if actionable else 0,
+            'confidence': analysis['confidence'],
+            'reasoning': analysis['reasoning'],
+            'riskWarnings': risk_warnings,
+            'timeframe': f'{max(hours_left, 0):.0f}h'
         }
         
         return jsonify(recommendation)
@@ -224,92 +313,116 @@ def get_performance():
     """Get agent performance metrics"""
     try:
         timeframe = request.args.get('timeframe', '30d')
+        if not agent_instance:
+            return jsonify({'error': 'ASI Agent not available'}), 503
         
-        # Simulate performance data
-        performance = {
-            'totalBets': 45,
-            'winRate': 67.8,
-            'averageReturn': 12.5,
-            'totalProfit': 234.50,
-            'sharpeRatio': 1.8,
-            'maxDrawdown': -8.2,
-            'bestStrategies': ['Contrarian Analysis', 'MeTTa Reasoning'],
-            'recentPerformance': [
-                {'period': '7d', 'winRate': 71.4, 'profit': 45.20},
-                {'period': '14d', 'winRate': 69.2, 'profit': 89.10},
-                {'period': '30d', 'winRate': 67.8, 'profit': 234.50}
-            ]
-        }
-        
-        return jsonify(performance)
+        # Combines at most 30 daily buckets, however many bets the ledger holds
+        return jsonify(agent_instance.ledger.summary(timeframe))
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Error getting performance: {str(e)}'}), 500
 
-def process_chat_message(message: str) -> str:
-    """Process chat message and return response"""
-    message_lower = message.lower().strip()
-    
-    print(f"🔍 Processing message: {message}")
+# Chat messages are routed with one compiled keyword pass to the handlers below
+chat_router = IntentRouter()
+
+CRYPTO_KEYWORDS = ('crypto', 'bitcoin', 'btc', 'ethereum', 'eth', 'sui')
+
+@chat_router.handler('health')
+def _chat_health(message: str) -> str:
+    """Agent and market status"""
+    agent_status = "Online" if agent_instance else "Starting"
+    snapshot = snapshots.current
+    if not snapshot:
+        return f"🤖 Chimera ASI Agent Status: {agent_status}\n\nLoading market data, ask me again in a moment."
+    digest = snapshot.digest
+    status = f"🤖 Chimera ASI Agent Status: {agent_status}\n\n" \
+             f"📊 {digest.total} markets tracked, {digest.active_count} active\n" \
+             f"🕒 Last refresh: {snapshot.refreshed_at.strftime('%H:%M:%S')}"
+    if snapshot.error:
+        status += f"\n⚠️ Latest refresh failed: {snapshot.error}"
+    return status + "\n\nAsk me about markets, betting strategies, or say 'analyze all markets'."
+
+@chat_router.handler('analyze')
+def _chat_analyze(message: str) -> str:
+    """Market overview with top opportunities"""
+    snapshot = snapshots.current
+    if not snapshot:
+        return "🔍 Market data is still loading. Please try again in a moment."
+    digest = snapshot.digest
     
-    # Health check
-    if message_lower in ['health', 'status', 'ping']:
-        agent_status = "Online" if agent_instance else "Starting"
-        return f"🤖 Chimera ASI Agent Status: {agent_status}\n\nI'm ready to help with market analysis! Ask me about markets, betting strategies, or say 'analyze all markets'."
+    result = f"""🔍 **Market Analysis** (MeTTa contrarian reasoning)
+
+📊 {digest.total} markets, {digest.buy_opportunities} showing betting opportunities
+🧠 Average confidence: {digest.avg_confidence:.1%}
+🕒 Last refresh: {snapshot.refreshed_at.strftime('%H:%M:%S')}
+"""
+    for i, analysis in enumerate(digest.ranked[:3], 1):
+        market = digest.market_for(analysis)
+        result += f"""
+**{i}. {market['title']}**
+   • Recommendation: {analysis['recommendation']} ({analysis['confidence']:.1%} confidence)
+   • Reasoning: {analysis['reasoning']}
+   • Risk Level: {analysis['risk_level'].title()}
+"""
+    return result
+
+@chat_router.handler('recommend')
+def _chat_recommend(message: str) -> str:
+    """Actionable betting recommendations"""
+    snapshot = snapshots.current
+    if not snapshot:
+        return "🎯 Market data is still loading. Please try again in a moment."
+    digest = snapshot.digest
+    if not digest.actionable:
+        return f"""🎯 No high-confidence opportunities right now.
+
+All {digest.total} markets look fairly balanced; I'll keep watching for crowd bias above 70%."""
     
-    # Market analysis requests
-    if any(word in message_lower for word in ['analyze', 'analysis', 'market', 'markets']):
-        return """I can analyze markets using MeTTa reasoning and contrarian strategies. Here's what I can do:
-
-🔍 Market Analysis: Deep analysis using logical inference
-📊 Contrarian Opportunities: Find markets with crowd bias
-🎯 Betting Recommendations: Personalized suggestions based on your profile
-📈 Performance Tracking: Monitor success rates and returns
-
-Try asking:
-• "analyze market 1"
-• "what markets should I bet on?"
-• "show me contrarian opportunities"
-• "what's your win rate?"
-
-Currently monitoring 3 active markets with 67.8% win rate."""
+    result = "Based on my MeTTa reasoning analysis, here are my current recommendations:\n"
+    for analysis in digest.actionable[:3]:
+        market = digest.market_for(analysis)
+        option = "Option A" if analysis['recommendation'] == 'BUY_A' else "Option B"
+        result += f"""
+🎯 **Market {analysis['marketId']}**: {market['title']}
+   • Recommendation: {option}
+   • Confidence: {analysis['confidence']:.0%}
+   • Reasoning: {analysis['reasoning']}
+   • Risk Level: {analysis['risk_level'].title()}
+"""
+    result += f"\n📈 {len(digest.actionable)} opportunities, average confidence {digest.actionable_avg_confidence:.1%}"
+    return result
+
+@chat_router.handler('crypto')
+def _chat_crypto(message: str) -> str:
+    """Crypto price markets"""
+    snapshot = snapshots.current
+    if not snapshot:
+        return "🔍 Market data is still loading. Please try again in a moment."
+    digest = snapshot.digest
     
-    # Recommendations
-    if any(word in message_lower for word in ['recommend', 'suggestion', 'bet', 'should']):
-        return """Based on my MeTTa reasoning analysis, here are my current recommendations:
-
-🎯 **Market 1**: BTC Price > $150k by Dec 2024
-   • Recommendation: Option A (Yes) 
-   • Confidence: 75%
-   • Reasoning: Strong contrarian opportunity, crowd is overly pessimistic
-
-⚠️ **Risk Level**: Medium
-💰 **Suggested Amount**: $50-100 (based on your profile)
-⏰ **Time Horizon**: 30 days
-
-Would you like detailed analysis on any specific market?"""
+    crypto = [
+        market for market in digest.markets
+        if any(word in market['title'].lower() for word in CRYPTO_KEYWORDS)
+    ]
+    if not crypto:
+        return f"🔍 **Crypto Market Analysis**\n\nNone of the {digest.total} tracked markets are about crypto prices right now."
     
-    # Crypto markets
-    if any(word in message_lower for word in ['crypto', 'bitcoin', 'btc', 'ethereum', 'eth']):
-        return """🔍 **Crypto Market Analysis**
-
-Currently tracking 2 crypto prediction markets:
-
-1. **BTC > $150k by Dec 2024**
-   • Current odds: 45% Yes / 55% No
-   • My analysis: 75% confidence for Yes
-   • Contrarian opportunity detected
-
-2. **ETH > $10k by Q1 2025** 
-   • Current odds: 38% Yes / 62% No
-   • My analysis: 62% confidence for Yes
-   • Moderate opportunity
+    result = f"🔍 **Crypto Market Analysis**\n\nCurrently tracking {len(crypto)} crypto prediction markets:\n"
+    for i, market in enumerate(crypto[:5], 1):
+        analysis = digest.analysis_by_id[market['id']]
+        result += f"""
+{i}. **{market['title']}**
+   • Current odds: {market['optionARatio']:.0%} A / {1 - market['optionARatio']:.0%} B
+   • My analysis: {analysis['recommendation']} ({analysis['confidence']:.0%} confidence)
+"""
+    return result
 
-💡 **Strategy**: Both markets show contrarian potential with crowd being overly bearish on crypto prices."""
-    
-    # General help
-    if message_lower in ['help', 'what can you do', 'commands']:
-        return """🤖 **Chimera ASI Agent Capabilities**
+@chat_router.handler('help')
+def _chat_help(message: str) -> str:
+    """Help guide"""
+    return """🤖 **Chimera ASI Agent Capabilities**
 
 I'm an autonomous reasoning agent using MeTTa logic and contrarian analysis:
 
@@ -336,8 +449,10 @@ I'm an autonomous reasoning agent using MeTTa logic and contrarian analysis:
 • "health" - Check my status
 
 Ask me anything about prediction markets!"""
-    
-    # Default response
+
+@chat_router.handler('default')
+def _chat_default(message: str) -> str:
+    """Fallback reply"""
     return f"""I received your message: "{message}"
 
 I'm the Chimera ASI Agent, specialized in prediction market analysis using MeTTa reasoning. I can help you with:
@@ -349,45 +464,32 @@ I'm the Chimera ASI Agent, specialized in prediction market analysis using MeTTa
 
 Try asking me about specific markets or say "help" for more options."""
 
+def process_chat_message(message: str) -> str:
+    """Process chat message and return response"""
+    print(f"🔍 Processing message: {message}")
+    return chat_router.dispatch(message)
+
 def process_structured_query(query: str, parameters: dict) -> dict:
     """Process structured query and return analysis"""
     
-    # Simulate market analysis based on query
-    if 'market' in query.lower() or 'analyze' in query.lower():
-        analysis = [
-            {
-                'market_id': '1',
-                'recommendation': 'BUY_A',
-                'confidence': 0.75,
-                'reasoning': 'MeTTa reasoning indicates strong contrarian opportunity for Option A',
-                'risk_level': 'medium',
-                'timestamp': datetime.now().isoformat()
-            },
-            {
-                'market_id': '2', 
-                'recommendation': 'BUY_B',
-                'confidence': 0.68,
-                'reasoning': 'Volume analysis suggests Option B is undervalued by the crowd',
-                'risk_level': 'low',
-                'timestamp': datetime.now().isoformat()
-            }
-        ]
-        
+    # Answered from the latest snapshot's indexes
+    snapshot = snapshots.current
+    if not snapshot:
         return {
-            'message': f'Analyzed markets based on query: "{query}"',
-            'analysis': analysis,
-            'type': 'market_analysis'
+            'message': 'Market data is still loading. Please try again in a moment.',
+            'analysis': [],
+            'type': 'error'
         }
-    
-    return {
-        'message': f'Processed query: "{query}"',
-        'analysis': [],
-        'type': 'general_response'
-    }
+    return agent_instance.structured_query(query, parameters, engine=snapshot.query_engine,
+                                           as_of=snapshot.refreshed_at)
 
 if __name__ == '__main__':
     print("🚀 Starting ASI Agent HTTP Server...")
     
+    if PUSH_PORT:
+        push_hub = PushHub(port=int(PUSH_PORT)).start()
+        snapshots.subscribe(lambda snapshot: push_hub.publish_markets(digest_updates(snapshot.digest)))
+
     # Start the agent in a separate thread
     agent_thread = threading.Thread(target=run_agent_in_thread, daemon=True)
     agent_thread.start()
@@ -395,7 +497,8 @@ if __name__ == '__main__':
     # Give the agent a moment to initialize
     time.sleep(2)
     
-    print("🌐 HTTP Server starting on http://localhost:8001")
+    port = int(os.getenv("ASI_AGENT_PORT", "8001"))
+    print(f"🌐 HTTP Server starting on http://localhost:{port}")
     print("📡 Endpoints available:")
     print("   GET  /health - Health check")
     print("   GET  /status - Agent status")
@@ -404,6 +507,8 @@ if __name__ == '__main__':
     print("   POST /analyze-market - Market analysis")
     print("   POST /betting-recommendation - Betting advice")
     print("   GET  /performance - Performance metrics")
+    if push_hub:
+        print(f"   WS   :{PUSH_PORT}/ws, GET :{PUSH_PORT}/events - Live market updates")
     
     # Run Flask server
-    app.run(host='0.0.0.0', port=8001, debug=False)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
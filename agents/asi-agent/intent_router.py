@@ -0,0 +1,157 @@
+"""
+Compiled intent routing for chat messages
+
+compile() expands every intent keyword with its accepted inflections into one
+set of words. Routing stays in C for the common path: exact phrases ('ping')
+are a dict lookup, then the message is split into words with one
+bytes.translate and intersected with that set; the resulting combination of
+words is scored once and memoized. Two-word keywords ('win rate') are only
+looked for when their first word occurs.
+
+Every keyword hit adds its weight to its intent's score; the highest score
+wins and intent priority breaks ties. Specific keywords (bitcoin, eth)
+outweigh generic ones (bet, should), so "bet on bitcoin" routes to the crypto
+intent no matter which branch a handler chain would have tested first.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Inflections accepted after a keyword ("markets", "recommended", "recommendations")
+KEYWORD_SUFFIXES = ('', 's', 'es', 'ed', 'ing', 'able', 'ation', 'ations')
+
+# UTF-8 bytes: everything but ASCII letters, digits and non-ASCII bytes separates words
+_SEPARATORS = bytes(c if c >= 128 or chr(c).isalnum() else 0x20 for c in range(256))
+
+# Bound on memoized keyword-combination decisions
+MAX_CACHED_DECISIONS = 4096
+
+@dataclass(frozen=True)
+class Intent:
+    """A routable intent
+
+    keywords: (keyword, weight) pairs matched as whole words, optionally inflected
+    exact:    whole messages that select the intent outright (e.g. 'ping')
+    priority: tie-breaker between intents with equal scores
+    """
+    name: str
+    keywords: Tuple[Tuple[str, float], ...] = ()
+    exact: Tuple[str, ...] = ()
+    priority: int = 0
+
+@dataclass(slots=True)
+class RouteMatch:
+    intent: str
+    score: float
+    hits: Tuple[str, ...] = ()
+
+# Chat intents shared by the HTTP servers
+CHAT_INTENTS = (
+    Intent('health', exact=('health', 'status', 'ping'), priority=100),
+    Intent('help', exact=('help', 'what can you do', 'commands'), priority=90),
+    Intent('crypto', keywords=(
+        ('crypto', 1.5), ('bitcoin', 2.0), ('btc', 2.0), ('ethereum', 2.0), ('eth', 2.0)
+    ), priority=30),
+    Intent('performance', keywords=(
+        ('performance', 1.5), ('track record', 1.5), ('win rate', 1.5), ('profit', 1.0)
+    ), priority=40),
+    Intent('recommend', keywords=(
+        ('recommend', 1.0), ('suggestion', 1.0), ('bet', 0.5), ('betting', 0.5), ('should', 0.5)
+    ), priority=20),
+    Intent('analyze', keywords=(
+        ('analyze', 1.0), ('analysis', 1.0), ('market', 0.5), ('contrarian', 1.0), ('opportunity', 0.5),
+        ('opportunities', 0.5)
+    ), priority=10)
+)
+
+class IntentRouter:
+    """Routes messages to per-intent handlers with one pass over the message's words"""
+
+    def __init__(self, intents: Iterable[Intent] = CHAT_INTENTS, default: str = 'default'):
+        self.default = default
+        self._intents: Dict[str, Intent] = {}
+        self._handlers: Dict[str, Callable[[str], str]] = {}
+        self._compiled = False
+        self._exact: Dict[str, Intent] = {}
+        self._keywords: Dict[str, List[Tuple[str, float]]] = {}
+        self._forms: Dict[bytes, str] = {}               # inflected word or "first second" -> keyword
+        self._words: FrozenSet[bytes] = frozenset()
+        self._phrase_heads: FrozenSet[bytes] = frozenset()
+        self._decisions: Dict[FrozenSet[bytes], Tuple[str, float, Tuple[str, ...]]] = {}
+        for intent in intents:
+            self.add(intent)
+
+    def add(self, intent: Intent):
+        self._intents[intent.name] = intent
+        self._compiled = False  # recompiled lazily
+
+    def handler(self, intent_name: str):
+        """Decorator registering the handler for an intent (or the default)"""
+        def register(func: Callable[[str], str]):
+            self._handlers[intent_name] = func
+            return func
+        return register
+
+    def compile(self):
+        self._exact = {}
+        self._keywords = {}
+        self._decisions = {}
+        for intent in self._intents.values():
+            for phrase in intent.exact:
+                self._exact[phrase] = intent
+            for keyword, weight in intent.keywords:
+                self._keywords.setdefault(keyword, []).append((intent.name, weight))
+
+        self._forms = {}
+        # Shortest first, so a keyword's own spelling beats another keyword's inflection
+        for keyword in sorted(self._keywords, key=len):
+            for suffix in KEYWORD_SUFFIXES:
+                self._forms[(keyword + suffix).encode()] = keyword
+        self._words = frozenset(form for form in self._forms if b' ' not in form)
+        self._phrase_heads = frozenset(form.split(b' ', 1)[0] for form in self._forms if b' ' in form)
+        self._compiled = True
+
+    def route(self, message: str) -> RouteMatch:
+        """Pick the intent for a message"""
+        if not self._compiled:
+            self.compile()
+
+        text = message.lower().strip()
+        exact = self._exact.get(text)
+        if exact:
+            return RouteMatch(exact.name, float('inf'), (text,))
+
+        words = text.encode().translate(_SEPARATORS).split()
+        hits = self._words.intersection(words)
+        if not self._phrase_heads.isdisjoint(words):
+            hits = hits.union(self._phrase_hits(words))
+        if not hits:
+            return RouteMatch(self.default, 0.0)
+
+        # Each combination of matched words is scored only once
+        decision = self._decisions.get(hits)
+        if decision is None:
+            if len(self._decisions) >= MAX_CACHED_DECISIONS:
+                self._decisions.clear()
+            decision = self._decisions[hits] = self._score(hits)
+        return RouteMatch(*decision)
+
+    def _phrase_hits(self, words: List[bytes]) -> List[bytes]:
+        pairs = (first + b' ' + second for first, second in zip(words, words[1:]))
+        return [pair for pair in pairs if pair in self._forms]
+
+    def _score(self, hits: FrozenSet[bytes]) -> Tuple[str, float, Tuple[str, ...]]:
+        # Inflections of one keyword ("market", "markets") count once
+        keywords = tuple(sorted({self._forms[form] for form in hits}))
+        scores: Dict[str, float] = {}
+        for keyword in keywords:
+            for name, weight in self._keywords[keyword]:
+                scores[name] = scores.get(name, 0.0) + weight
+        best = max(scores, key=lambda name: (scores[name], self._intents[name].priority))
+        return best, scores[best], keywords
+
+    def dispatch(self, message: str) -> str:
+        """Route a message and run its handler (falling back to the default handler)"""
+        route = self.route(message)
+        handler = self._handlers.get(route.intent) or self._handlers[self.default]
+        return handler(message)
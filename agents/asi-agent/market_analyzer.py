@@ -3,16 +3,29 @@ ChimeraProtocol ASI Alliance Market Analyzer Agent
 Uses MeTTa reasoning and direct contract data to make intelligent betting decisions
 """
 
+import aiohttp
 import asyncio
 import json
 import os
-import requests
 import time
+import numpy as np
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from uuid import uuid4
 
+from resilience import CircuitBreaker, LastKnownGood, RPC_TIMEOUT
+from market_store import MarketStore
+from market_snapshot import MarketSnapshot
+from market_history import MarketHistory, SHARP_MOVE_THRESHOLD
+from query_engine import MarketQueryEngine, build_query_params
+from bet_executor import BetExecutor, BetOrder, BetResult
+from performance_ledger import PerformanceLedger
+from data_sources import DEFAULT_CONTRACT_ADDRESS, ContractMarketSource, DataLoader, MarketSource, run_in_scope
+from single_flight import AsyncSingleFlight
+from chat_scheduler import ChatScheduler, is_fast_path
+from response_cache import ResponseCache, cache_key
+
 # ASI Alliance imports (as specified in eth.md)
 from uagents import Agent, Context, Protocol, Model
 from uagents.setup import fund_agent_if_low
@@ -57,6 +70,17 @@ class StructuredQuery(Model):
     query: str
     parameters: Optional[Dict] = None
 
+class MarketQueryResponse(Model):
+    analysis: List[MarketAnalysis]
+    markets: List[Dict]
+    total: int
+    next_cursor: Optional[str] = None
+    message: str
+    type: str = "market_query"
+
+HEALTHY_MESSAGE = "Chimera Market Analyzer is healthy and ready for market analysis!"
+BUSY_MESSAGE = "Chimera is busy with other requests. Please try again in a moment."
+
 # Rate limiting
 class RateLimiter:
     def __init__(self, max_requests=30, time_window=3600):
@@ -131,13 +155,35 @@ class MeTTaReasoner:
 
         return analysis
 
+    @staticmethod
+    def _apply_trend(analysis: Dict, market_data: Dict) -> Dict:
+        """Temper contrarian calls that fade a sharp recent move (a drift is left alone)"""
+        momentum = market_data.get("ratioMomentum")
+        if momentum is None:
+            return analysis
+
+        fading = (momentum > 0 and analysis["recommendation"] == "BUY_B") or \
+                 (momentum < 0 and analysis["recommendation"] == "BUY_A")
+        if abs(momentum) >= SHARP_MOVE_THRESHOLD and fading:
+            analysis["confidence"] = analysis["confidence"] * 0.85
+            analysis["reasoning"] += f"; sharp {momentum:+.1%} move may reflect new information"
+        elif abs(momentum) >= 0.02:
+            analysis["reasoning"] += f"; crowd drifting {momentum:+.1%} in option A ratio"
+        return analysis
+
+    @staticmethod
+    def screen_batch(option_a_ratios) -> np.ndarray:
+        """Vectorized pre-screen: row indices whose ratio crosses the 0.7 contrarian threshold"""
+        ratios = np.asarray(option_a_ratios, dtype=np.float64)
+        return np.flatnonzero((ratios > 0.7) | ((1 - ratios) > 0.7))
+
     def analyze_market_data(self, market_data: Dict) -> Dict:
         """Analyze market data using MeTTa rules; fallback to heuristic if needed."""
 
         option_a_ratio = float(market_data.get("optionARatio", 0.5))
 
         if not self.metta:
-            return self._fallback_analysis(market_data)
+            return self._apply_trend(self._fallback_analysis(market_data), market_data)
 
         try:
             # Evaluate MeTTa predicates for contrarian strategy
@@ -158,11 +204,11 @@ class MeTTaReasoner:
             analysis["recommendation"] = recommendation
             analysis["confidence"] = float(confidence)
             analysis["metta_analysis"] = "Hyperon MeTTa rules applied for contrarian detection"
-            return analysis
+            return self._apply_trend(analysis, market_data)
         except Exception:
-            return self._fallback_analysis(market_data)
+            return self._apply_trend(self._fallback_analysis(market_data), market_data)
 
-@dataclass
+@dataclass(slots=True)
 class MarketData:
     """Market data structure"""
     id: int
@@ -173,81 +219,155 @@ class MarketData:
     end_time: datetime
     market_type: str
     status: str
+    outcome: Optional[int] = None     # winning option once resolved (0 = A, 1 = B)
+
+    @property
+    def option_a_ratio(self) -> float:
+        total_shares = self.option_a_shares + self.option_b_shares
+        return self.option_a_shares / total_shares if total_shares > 0 else 0.5
+
+    def analysis_input(self, trend: Optional[Dict] = None) -> Dict:
+        """Fields consumed by MeTTaReasoner.analyze_market_data"""
+        market_data = {
+            "totalPool": self.total_pool,
+            "optionARatio": self.option_a_ratio,
+            "totalShares": self.option_a_shares + self.option_b_shares,
+            "marketType": self.market_type
+        }
+        if trend and trend["samples"] >= 2:
+            market_data["ratioMomentum"] = trend["ratioMomentum"]
+            market_data["volumeFlowPerHour"] = trend["volumeFlowPerHour"]
+        return market_data
+
+    def to_market_dict(self) -> Dict:
+        """Market dict in the shape shared with the HTTP servers and MarketStore"""
+        option_a_ratio = self.option_a_ratio
+        return {
+            "id": self.id,
+            "title": self.title,
+            "question": self.title,
+            "optionARatio": option_a_ratio,
+            "optionBRatio": 1 - option_a_ratio,
+            "totalVolume": self.total_pool,
+            "totalOptionAShares": self.option_a_shares,
+            "totalOptionBShares": self.option_b_shares,
+            "status": self.status,
+            "resolved": self.status == "resolved",
+            "outcome": self.outcome,
+            "endTime": int(self.end_time.timestamp()),
+            "lastUpdate": time.time(),
+            "hasActivity": self.option_a_shares + self.option_b_shares > 0,
+            "marketType": self.market_type
+        }
+
+    @classmethod
+    def from_market_dict(cls, market: Dict) -> "MarketData":
+        """Inverse of to_market_dict, used when restoring from the snapshot"""
+        return cls(
+            id=int(market["id"]),
+            title=market.get("title", ""),
+            total_pool=market.get("totalVolume", 0),
+            option_a_shares=market.get("totalOptionAShares", 0),
+            option_b_shares=market.get("totalOptionBShares", 0),
+            end_time=datetime.fromtimestamp(market.get("endTime", 0)),
+            market_type=market.get("marketType", "binary"),
+            status=market.get("status", "active"),
+            outcome=market.get("outcome")
+        )
+
+def active_markets(markets: List[MarketData]) -> List[MarketData]:
+    """Markets still open for analysis and bets"""
+    return [market for market in markets if market.status == "active"]
 
-class DirectRPCDataFetcher:
-    """Fetches market data directly from RPC"""
+class DirectRPCDataFetcher(MarketSource):
+    """Fetches market data directly from the Chimera contract over JSON-RPC"""
+    name = 'contract'
     
-    def __init__(self, rpc_endpoint: str):
+    def __init__(self, rpc_endpoint: str, snapshot: Optional[MarketSnapshot] = None):
         self.endpoint = rpc_endpoint
-        self.contract_address = os.getenv("CHIMERA_CONTRACT_ADDRESS", "0x7a9D78D1E5fe688F80D4C2c06Ca4C0407A967644")
+        self.graphql_endpoint = os.getenv("CHIMERA_GRAPHQL_URL", rpc_endpoint)
+        self.breaker = CircuitBreaker('contract')
+        self.last_good = LastKnownGood()
+        self.contract_address = os.getenv("CHIMERA_CONTRACT_ADDRESS", DEFAULT_CONTRACT_ADDRESS)
+        self.contract = ContractMarketSource(rpc_endpoint, self.contract_address)
+        self._history_loader = DataLoader(self.load_histories, cache=False)
+        self.refresh_flight = AsyncSingleFlight('contract-markets')
+
+        # Markets loaded so far, restored from the snapshot until the first contract read
+        self.snapshot = snapshot
+        self.known_markets: Dict[int, MarketData] = {}
+        # Only rows read from this contract are restored; older snapshots held blockscout placeholders
+        if snapshot and snapshot.bind_source(f"evm:{self.contract_address.lower()}"):
+            restored = [MarketData.from_market_dict(m) for m in snapshot.load_markets()]
+            self.known_markets = {market.id: market for market in sorted(restored, key=lambda m: m.id)}
+            if self.known_markets:
+                self.last_good.set('markets', list(self.known_markets.values()))
+                print(f"💾 Restored {len(self.known_markets)} markets from snapshot")
     
-    async def get_active_markets(self) -> List[MarketData]:
-        """Fetch active markets from contract directly"""
+    async def get_markets(self) -> List[MarketData]:
+        """Fetch every market, resolved ones included; callers arriving during a fetch share its result"""
+        return await self.refresh_flight.do('markets', self._fetch_markets)
+
+    async def _fetch_markets(self) -> List[MarketData]:
+        """Fetch markets from contract directly"""
         
-        import aiohttp
-        import os
-        import time
+        # Breaker open: reuse the last good market list instead of waiting on timeouts
+        if not self.breaker.allow_request():
+            cached = self.last_good.get('markets')
+            return cached[0] if cached else []
         
         try:
-            chimera_address = os.getenv("CHIMERA_CONTRACT_ADDRESS", "0x7Bee0AB565e6aB33009647174Eb8cd55B56EcD7c")
-            
-            async with aiohttp.ClientSession() as session:
-                # Get contract transactions
-                url = f"{self.endpoint}/api/v2/addresses/{chimera_address}/transactions"
-                async with session.get(url, params={"limit": 100}) as response:
-                    data = await response.json()
-                    
-                    markets = []
-                    for tx in data.get("items", []):
-                        # Filter for market creation transactions
-                        if tx.get("method") == "createMarket" or int(tx.get("value", "0")) == 0:
-                            markets.append(MarketData(
-                                id=int(tx["hash"][-8:], 16),  # Convert hex to int
-                                title=f"Market {tx['hash'][-8:]}",
-                                total_pool=0,  # Will be calculated from bets
-                                option_a_shares=0,
-                                option_b_shares=0,
-                                end_time=datetime.fromtimestamp(time.time() + 86400),  # 24h from now
-                                market_type="binary",
-                                status="active"
-                            ))
-                    
-                    return markets[:10]  # Return first 10 markets
+            # getMarket calls go out as JSON-RPC batches on the shared background loop, whichever
+            # loop (agent or refresh worker) is asking; the scope lock serializes callers
+            markets, errors = await asyncio.to_thread(run_in_scope, self.contract, lambda scope: scope.load_markets())
+            for market_id, error in errors.items():
+                print(f"⚠️ Could not load market {market_id}: {error}")
+            if errors and not markets:
+                raise RuntimeError(f"{len(errors)} markets failed to load")
+
+            if self.snapshot:
+                self.snapshot.save_markets(markets)
+
+            # The contract lists every market; keep earlier copies only of the ones that failed to load
+            loaded = {market["id"]: MarketData.from_market_dict(market) for market in markets}
+            kept = {market_id: self.known_markets[market_id] for market_id in errors if market_id in self.known_markets}
+            self.known_markets = dict(sorted({**kept, **loaded}.items()))
+
+            markets = list(self.known_markets.values())
+            self.breaker.record_success()
+            self.last_good.set('markets', markets)
+            return markets
                     
         except Exception as e:
             print(f"Error fetching markets from RPC: {e}")
-            return []
+            self.breaker.record_failure()
+            cached = self.last_good.get('markets')
+            return cached[0] if cached else []
     
+    async def market_ids(self) -> List[int]:
+        return await self.contract.market_ids()
+
+    async def load_markets(self, market_ids: List[int]) -> List:
+        return await self.contract.load_markets(market_ids)
+
+    async def load_histories(self, market_ids: List[int]) -> List[List[Dict]]:
+        """Bet histories for many markets in one GraphQL request (one aliased field per market)"""
+        fields = "\n".join(
+            f"m{market_id}: betPlacedEvents(where: {{marketId: {market_id}}}) "
+            "{ id user agent option amount shares blockTimestamp }"
+            for market_id in market_ids
+        )
+        timeout = aiohttp.ClientTimeout(total=RPC_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(self.graphql_endpoint, json={"query": f"query GetMarketHistories {{\n{fields}\n}}"}) as response:
+                response.raise_for_status()
+                data = (await response.json(content_type=None)).get("data") or {}
+        return [data.get(f"m{market_id}") or [] for market_id in market_ids]
+
     async def get_market_history(self, market_id: int) -> List[Dict]:
-        """Get betting history for a specific market"""
-        
-        query = f"""
-        query GetMarketHistory {{
-          betPlacedEvents(where: {{marketId: {market_id}}}) {{
-            id
-            user
-            agent
-            option
-            amount
-            shares
-            blockTimestamp
-          }}
-        }}
-        """
-        
+        """Get betting history for a specific market; concurrent calls share one request"""
         try:
-            response = requests.post(
-                self.endpoint,
-                json={"query": query},
-                headers={"Content-Type": "application/json"}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("data", {}).get("betPlacedEvents", [])
-            else:
-                return []
-                
+            return await self._history_loader.load(int(market_id))
         except Exception as e:
             print(f"Error fetching market history: {e}")
             return []
@@ -259,6 +379,9 @@ class ChimeraAgent:
         # Initialize rate limiter
         self.rate_limiter = RateLimiter()
         
+        # Heavy chat work runs off the handlers: bounded, fair across senders
+        self.chat_scheduler = ChatScheduler()
+        
         # Create ASI-compatible mailbox agent
         self.agent = Agent(
             name="Chimera-Market-Analyzer",
@@ -272,8 +395,24 @@ class ChimeraAgent:
         # Fund agent if needed
         fund_agent_if_low(self.agent.wallet.address())
         
-        self.rpc_fetcher = DirectRPCDataFetcher(rpc_endpoint)
+        # Market state survives restarts; delta sync resumes from the snapshot cursor
+        self.market_snapshot = MarketSnapshot(os.getenv("CHIMERA_AGENT_SNAPSHOT_PATH", "agent-data/agent_markets.db"))
+        self.rpc_fetcher = DirectRPCDataFetcher(rpc_endpoint, snapshot=self.market_snapshot)
         self.metta_reasoner = MeTTaReasoner()
+        self.market_store = MarketStore()
+        self.market_history = MarketHistory()
+        restored = [market.to_market_dict() for market in self.rpc_fetcher.known_markets.values()]
+        self.market_store.upsert_many(restored)
+        self.market_history.append_many(restored)
+        self._query_analyses: Tuple[Optional[int], Dict[int, Dict]] = (None, {})
+        self.query_engine = MarketQueryEngine(
+            self.market_store,
+            analysis_lookup=self._analysis_by_id,
+            analyze=self._analyze_row
+        )
+        
+        # Repeated questions are answered from each sender's last reply until the markets change
+        self.response_cache = ResponseCache(lambda: self.market_store.version)
         
         # Initialize OpenAI if available
         if OPENAI_AVAILABLE:
@@ -284,6 +423,17 @@ class ChimeraAgent:
         self.min_confidence = 0.6  # Minimum confidence to place bet
         self.analysis_interval = 300  # Analyze markets every 5 minutes
         
+        # Bets are queued and sent in batches; dry run unless a key is set and CHIMERA_BET_DRY_RUN=false.
+        # They go to the same contract the markets are read from, so market ids always refer to it.
+        self.bet_executor = BetExecutor(
+            rpc_endpoint,
+            self.rpc_fetcher.contract.contract_address,
+            private_key=os.getenv("CHIMERA_AGENT_PRIVATE_KEY")
+        )
+        
+        # Confirmed bets and their outcomes, aggregated for /performance
+        self.ledger = PerformanceLedger(os.getenv("CHIMERA_LEDGER_PATH", "agent-data/ledger.db"))
+        
         # Setup protocols
         self.setup_protocols()
         
@@ -307,12 +457,20 @@ class ChimeraAgent:
             ctx.logger.info("🔍 Starting market analysis...")
             
             try:
-                # Fetch active markets
-                markets = await self.rpc_fetcher.get_active_markets()
-                ctx.logger.info(f"📊 Found {len(markets)} active markets")
+                # Record every market (resolutions settle bets), analyze only the active ones
+                markets = await self.rpc_fetcher.get_markets()
+                self._record_markets(markets)
+                active = active_markets(markets)
+                ctx.logger.info(f"📊 Found {len(active)} active markets")
                 
-                for market in markets:
-                    await self.analyze_single_market(ctx, market)
+                # Only markets past the contrarian threshold can produce a bet
+                fetched = {market.id: market for market in active}
+                view = self.market_store.view()
+                market_ids = view.column('id')
+                for row in self.metta_reasoner.screen_batch(view.column('optionARatio')):
+                    market = fetched.get(int(market_ids[row]))
+                    if market:
+                        await self.analyze_single_market(ctx, market)
                     
             except Exception as e:
                 ctx.logger.error(f"❌ Error in market analysis: {e}")
@@ -327,6 +485,10 @@ class ChimeraAgent:
             """Handle structured market analysis queries"""
             print(f"🔥 STRUCTURED QUERY: From {sender}, Query: {msg.query}")
             
+            if is_fast_path(msg.query):
+                await ctx.send(sender, ChimeraResponse(analysis=[], message=HEALTHY_MESSAGE, type="status"))
+                return
+            
             # Rate limiting
             if not self.rate_limiter.is_allowed(sender):
                 await ctx.send(sender, ChimeraResponse(
@@ -336,9 +498,32 @@ class ChimeraAgent:
                 ))
                 return
             
-            # Process the query
-            response = await self.process_market_query(msg.query, sender)
-            await ctx.send(sender, response)
+            key = cache_key(msg.query, msg.parameters)
+            cached = self.response_cache.get(sender, key)
+            if cached:
+                await ctx.send(sender, cached)
+                return
+            
+            async def answer():
+                # Filters come from the query text ("closing in next 24h") and explicit parameters alike
+                try:
+                    self._record_markets(await self.rpc_fetcher.get_markets())
+                    result = self.structured_query(msg.query, msg.parameters)
+                    response = MarketQueryResponse(
+                        analysis=[MarketAnalysis(**a) for a in result['analysis']],
+                        markets=result['markets'],
+                        total=result['total'],
+                        next_cursor=result['nextCursor'],
+                        message=result['message']
+                    )
+                except ValueError as e:
+                    response = ChimeraResponse(analysis=[], message=f"Invalid query parameters: {e}", type="error")
+                if response.analysis:
+                    self.response_cache.put(sender, key, response)
+                await ctx.send(sender, response)
+            
+            if not self.chat_scheduler.submit(sender, answer):
+                await ctx.send(sender, ChimeraResponse(analysis=[], message=BUSY_MESSAGE, type="busy"))
         
         self.agent.include(structured_protocol)
         
@@ -366,42 +551,47 @@ class ChimeraAgent:
                 )
                 await ctx.send(sender, ack)
                 
-                # Health check
-                if text_content.lower() in ["health", "status", "ping"]:
-                    response = ChatMessage(
+                def reply(text: str) -> ChatMessage:
+                    return ChatMessage(
                         timestamp=datetime.utcnow(),
                         msg_id=uuid4(),
-                        content=[TextContent(type="text", text="Chimera Market Analyzer is healthy and ready for market analysis!")]
+                        content=[TextContent(type="text", text=text)]
                     )
-                    await ctx.send(sender, response)
+                
+                # Health check
+                if is_fast_path(text_content):
+                    await ctx.send(sender, reply(HEALTHY_MESSAGE))
                     return
                 
                 # Rate limiting
                 if not self.rate_limiter.is_allowed(sender):
-                    response = ChatMessage(
-                        timestamp=datetime.utcnow(),
-                        msg_id=uuid4(),
-                        content=[TextContent(type="text", text="Rate limit exceeded. Please try again later.")]
-                    )
-                    await ctx.send(sender, response)
+                    await ctx.send(sender, reply("Rate limit exceeded. Please try again later."))
                     return
                 
-                # Process market analysis request
-                analysis_response = await self.process_market_query(text_content, sender)
+                def format_reply(analysis_response: ChimeraResponse) -> ChatMessage:
+                    formatted_message = f"{analysis_response.message}\n"
+                    if analysis_response.analysis:
+                        for i, analysis in enumerate(analysis_response.analysis[:3], 1):
+                            formatted_message += f"{i}. Market {analysis.market_id}: {analysis.recommendation} (Confidence: {analysis.confidence:.1%})\n"
+                            formatted_message += f"   Reasoning: {analysis.reasoning}\n"
+                    return reply(formatted_message)
+                
+                # Same question, same markets: answer from the sender's last reply
+                key = cache_key(text_content)
+                cached = self.response_cache.get(sender, key)
+                if cached:
+                    await ctx.send(sender, format_reply(cached))
+                    return
                 
-                # Format response for chat
-                formatted_message = f"{analysis_response.message}\n"
-                if analysis_response.analysis:
-                    for i, analysis in enumerate(analysis_response.analysis[:3], 1):
-                        formatted_message += f"{i}. Market {analysis.market_id}: {analysis.recommendation} (Confidence: {analysis.confidence:.1%})\n"
-                        formatted_message += f"   Reasoning: {analysis.reasoning}\n"
+                async def answer():
+                    # Process market analysis request
+                    analysis_response = await self.process_market_query(text_content, sender)
+                    if analysis_response.analysis:
+                        self.response_cache.put(sender, key, analysis_response)
+                    await ctx.send(sender, format_reply(analysis_response))
                 
-                response = ChatMessage(
-                    timestamp=datetime.utcnow(),
-                    msg_id=uuid4(),
-                    content=[TextContent(type="text", text=formatted_message)]
-                )
-                await ctx.send(sender, response)
+                if not self.chat_scheduler.submit(sender, answer):
+                    await ctx.send(sender, reply(BUSY_MESSAGE))
             
             @chat_proto.on_message(ChatAcknowledgement)
             async def handle_acknowledgement(ctx: Context, sender: str, msg: ChatAcknowledgement):
@@ -429,24 +619,75 @@ class ChimeraAgent:
 
         self.agent.include(chat_protocol)
     
+    def _record_markets(self, markets: List[MarketData]):
+        """Update the market table, append a history sample per market and settle resolved bets"""
+        market_dicts = [market.to_market_dict() for market in markets]
+        self.market_store.upsert_many(market_dicts)
+        self.market_history.append_many(market_dicts)
+        self.ledger.resolve_markets(market_dicts)
+
+    def _analyze_row(self, market: Dict) -> Dict:
+        """MeTTa analysis of a market table row, tagged with its id"""
+        market_data = MarketData.from_market_dict(market)
+        analysis = self.metta_reasoner.analyze_market_data(
+            market_data.analysis_input(self.market_history.stats(market_data.id))
+        )
+        analysis["marketId"] = market_data.id
+        return analysis
+
+    def _analysis_by_id(self) -> Dict[int, Dict]:
+        """Analyses of every stored market, computed once per store version"""
+        version, analyses = self._query_analyses
+        if version != self.market_store.version:
+            analyses = {market.id: self._analyze_row(market) for market in self.market_store.rows()}
+            self._query_analyses = (self.market_store.version, analyses)
+        return analyses
+
+    def structured_query(self, query: str, parameters: Optional[Dict] = None,
+                         engine: Optional[MarketQueryEngine] = None, as_of: Optional[datetime] = None) -> Dict:
+        """Run a structured query against the market table (or a snapshot's engine); raises ValueError for bad parameters
+
+        `as_of` (the snapshot time) stamps the analyses instead of the current time.
+        """
+        result = (engine or self.query_engine).execute(build_query_params(query, parameters))
+        timestamp = (as_of or datetime.now()).isoformat()
+        analysis = [
+            {
+                "market_id": str(a["marketId"]),
+                "recommendation": a["recommendation"],
+                "confidence": a["confidence"],
+                "reasoning": a["reasoning"],
+                "risk_level": a["risk_level"],
+                "timestamp": timestamp
+            }
+            for a in result["analyses"]
+        ]
+
+        message = f'Found {result["total"]} markets matching "{query}"'
+        if result["nextCursor"]:
+            message += f' (showing {len(result["markets"])}; pass nextCursor for more)'
+
+        return {
+            "message": message,
+            "analysis": analysis,
+            "markets": result["markets"],
+            "total": result["total"],
+            "nextCursor": result["nextCursor"],
+            "type": "market_query"
+        }
+
     async def analyze_single_market(self, ctx: Context, market: MarketData):
         """Analyze a single market and potentially place bet"""
         
         ctx.logger.info(f"🎯 Analyzing market: {market.title}")
         
         # Calculate market ratios
-        total_shares = market.option_a_shares + market.option_b_shares
-        if total_shares == 0:
+        market_data = market.analysis_input(self.market_history.stats(market.id))
+        if market_data["totalShares"] == 0:
+            return
+        # placeBet reverts once a market has closed, even before it is resolved
+        if market.status != "active" or market.end_time <= datetime.now():
             return
-        
-        option_a_ratio = market.option_a_shares / total_shares
-        
-        market_data = {
-            "totalPool": market.total_pool,
-            "optionARatio": option_a_ratio,
-            "totalShares": total_shares,
-            "marketType": market.market_type
-        }
         
         # Get MeTTa analysis
         analysis = self.metta_reasoner.analyze_market_data(market_data)
@@ -463,15 +704,17 @@ class ChimeraAgent:
             bet_amount = int(self.max_bet_amount * analysis["confidence"])
             option = 0 if analysis["recommendation"] == "BUY_A" else 1
             
-            await self.place_bet_via_lit(ctx, market.id, option, bet_amount, analysis)
+            await self.place_bet_direct(ctx, market.id, option, bet_amount, analysis)
     
     async def process_market_query(self, query: str, sender: str) -> ChimeraResponse:
         """Process natural language market analysis queries"""
         try:
             print(f"🔍 Processing query: {query}")
             
-            # Get active markets
-            markets = await self.rpc_fetcher.get_active_markets()
+            # Record every market, answer about the active ones
+            markets = await self.rpc_fetcher.get_markets()
+            self._record_markets(markets)
+            markets = active_markets(markets)
             
             if not markets:
                 return ChimeraResponse(
@@ -489,7 +732,9 @@ class ChimeraAgent:
             # Analyze filtered markets
             analysis_results = []
             for market in filtered_markets:
-                analysis = self.metta_reasoner.analyze_market(market.__dict__)
+                analysis = self.metta_reasoner.analyze_market_data(
+                    market.analysis_input(self.market_history.stats(market.id))
+                )
                 
                 analysis_results.append(MarketAnalysis(
                     market_id=str(market.id),
@@ -565,16 +810,37 @@ class ChimeraAgent:
 
     async def place_bet_direct(self, ctx: Context, market_id: int, option: int, 
                                amount: int, analysis: Dict):
-        """Place bet directly through RPC"""
+        """Queue a bet with the executor; the outcome is logged when its receipt arrives"""
         
         ctx.logger.info(f"🎲 Placing bet: Market {market_id}, "
                        f"Option {option}, Amount {amount}")
         
-        # Direct contract execution (placeholder)
-        try:
-            ctx.logger.info("✅ Bet placed successfully via direct RPC")
-        except Exception as e:
-            ctx.logger.error(f"❌ Error placing bet via RPC: {e}")
+        # Returns once queued, so markets signalling in the same pass share blocks
+        order = BetOrder(market_id, option, amount, analysis)
+        future = await self.bet_executor.submit(order)
+        future.add_done_callback(lambda done: self._on_bet_done(ctx, order, done))
+    
+    def _on_bet_done(self, ctx: Context, order: BetOrder, done: asyncio.Future):
+        """Log the bet's outcome; a cancelled or failed future (e.g. executor shutdown) is logged too"""
+        if done.cancelled():
+            ctx.logger.error(f"❌ Bet on market {order.market_id} cancelled before it finished")
+        elif done.exception() is not None:
+            ctx.logger.error(f"❌ Bet on market {order.market_id} failed: {done.exception()}")
+        else:
+            self._log_bet_result(ctx, done.result())
+    
+    def _log_bet_result(self, ctx: Context, result: BetResult):
+        order = result.order
+        if result.status == 'confirmed':
+            ctx.logger.info(f"✅ Bet on market {order.market_id} confirmed in block {result.block_number} "
+                           f"({result.tx_hash})")
+            self.ledger.record_bet(order.market_id, order.option, order.amount,
+                                   placed_at=result.finished_at, tx_hash=result.tx_hash)
+        elif result.status == 'dry_run':
+            ctx.logger.info(f"🧪 Dry run: would bet {order.amount} on market {order.market_id} "
+                           f"option {order.option}")
+        else:
+            ctx.logger.error(f"❌ Bet on market {order.market_id} {result.status}: {result.error or result.tx_hash}")
     
     def run(self):
         """Start the agent"""
@@ -587,6 +853,7 @@ class ChimeraAgent:
             print(f"📡 RPC endpoint: {self.rpc_fetcher.endpoint}")
             print(f"💰 Max bet amount: {self.max_bet_amount}")
             print(f"🎯 Min confidence: {self.min_confidence}")
+            print(f"🎲 Bets: {'dry run' if self.bet_executor.dry_run else 'live'} on {self.bet_executor.contract.address}")
             
             # Test environment
             print(f"🔧 Environment check:")
@@ -596,7 +863,7 @@ class ChimeraAgent:
             
             # Test RPC connection
             try:
-                markets = await self.rpc_fetcher.get_active_markets()
+                markets = await self.rpc_fetcher.get_markets()
                 print(f"✅ RPC connection successful - Found {len(markets)} markets")
             except Exception as e:
                 print(f"❌ RPC connection failed: {e}")
@@ -0,0 +1,92 @@
+"""
+Precomputed market digest shared by the chat intents
+
+Analyzing every market and ranking the results is done once per market
+snapshot (store version) instead of once per chat message. The digest holds
+the analyses in confidence order, the actionable subset, summary counts and
+id -> market / id -> analysis maps, so rendering a reply is pure templating.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Hashable, List, Mapping, Optional, Sequence
+
+# Recommendations that call for a bet, and the confidence needed to suggest one
+BUY_RECOMMENDATIONS = ('BUY_A', 'BUY_B')
+ACTIONABLE_CONFIDENCE = 0.6
+
+@dataclass
+class MarketDigest:
+    """Analyses and summary figures for one market snapshot"""
+    markets: Sequence[Mapping]
+    ranked: List[Dict]               # analyses, highest confidence first
+    actionable: List[Dict]           # BUY_A/BUY_B above ACTIONABLE_CONFIDENCE, ranked
+    market_by_id: Dict[int, Mapping]
+    analysis_by_id: Dict[int, Dict]
+    total: int
+    active_count: int
+    buy_opportunities: int
+    avg_confidence: float
+    actionable_avg_confidence: float
+    built_at: datetime = field(default_factory=datetime.now)
+
+    def market_for(self, analysis: Dict) -> Optional[Mapping]:
+        return self.market_by_id.get(analysis['marketId'])
+
+def build_market_digest(markets: Sequence[Mapping], analyze: Callable[[Mapping], Dict]) -> MarketDigest:
+    """Analyze every market once and index the results"""
+    market_by_id = {market['id']: market for market in markets}
+    analyses = [analyze(market) for market in markets]
+    ranked = sorted(analyses, key=lambda a: a['confidence'], reverse=True)
+    actionable = [a for a in ranked if a['recommendation'] in BUY_RECOMMENDATIONS and a['confidence'] > ACTIONABLE_CONFIDENCE]
+
+    return MarketDigest(
+        markets=markets,
+        ranked=ranked,
+        actionable=actionable,
+        market_by_id=market_by_id,
+        analysis_by_id={a['marketId']: a for a in analyses},
+        total=len(markets),
+        active_count=sum(1 for market in markets if market.get('status') == 'active'),
+        buy_opportunities=sum(1 for a in analyses if a['recommendation'] in BUY_RECOMMENDATIONS),
+        avg_confidence=sum(a['confidence'] for a in analyses) / len(analyses) if analyses else 0,
+        actionable_avg_confidence=sum(a['confidence'] for a in actionable) / len(actionable) if actionable else 0
+    )
+
+class DigestCache:
+    """Holds the digest for the latest snapshot key
+
+    The digest is rebuilt when the key (e.g. the market store version) changes
+    or after `max_age` seconds, since analyses also depend on prices and trend.
+    Concurrent callers wait for a single rebuild instead of each running one.
+    """
+
+    def __init__(self, analyze: Callable[[Mapping], Dict], max_age: float = 30.0):
+        self.analyze = analyze
+        self.max_age = max_age
+        self.builds = 0
+        self._key: Optional[Hashable] = None
+        self._digest: Optional[MarketDigest] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def _fresh(self, key: Hashable) -> Optional[MarketDigest]:
+        if self._digest is not None and self._key == key and time.monotonic() - self._built_at < self.max_age:
+            return self._digest
+        return None
+
+    def get(self, key: Hashable, load_markets: Callable[[], Sequence[Mapping]]) -> MarketDigest:
+        digest = self._fresh(key)
+        if digest:
+            return digest
+
+        with self._lock:
+            digest = self._fresh(key)
+            if digest:
+                return digest
+            digest = build_market_digest(load_markets(), self.analyze)
+            self._digest, self._key, self._built_at = digest, key, time.monotonic()
+            self.builds += 1
+            return digest
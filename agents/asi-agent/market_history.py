@@ -0,0 +1,146 @@
+"""
+Fixed-memory time series of pool ratios, volumes and shares per market
+
+Every refresh appends one sample per changed market to a NumPy ring buffer
+(O(1), no reallocation once a market has a slot). Windowed statistics -
+ratio momentum, exponentially weighted ratio, volume flow rate - are computed
+vectorized over the buffer, so analysis can tell a slow drift toward 70% from
+a sudden jump without going back to RPC.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+
+# Sampled fields, in buffer order
+FIELDS = ('timestamp', 'optionARatio', 'totalVolume', 'totalOptionAShares', 'totalOptionBShares')
+_TS, _RATIO, _VOLUME, _A_SHARES, _B_SHARES = range(len(FIELDS))
+
+# Samples kept per market, and defaults for trend windows (seconds)
+HISTORY_CAPACITY = 256
+TREND_WINDOW = 3600.0
+EWMA_HALFLIFE = 900.0
+
+# Ratio change within the window treated as a sharp move rather than a drift
+SHARP_MOVE_THRESHOLD = 0.15
+
+class MarketHistory:
+    """Per-market ring buffers with vectorized windowed statistics"""
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY, min_interval: float = 60.0, slots: int = 64):
+        self.capacity = capacity
+        # Unchanged markets are re-sampled at most once per min_interval
+        self.min_interval = min_interval
+        self._data = np.zeros((slots, len(FIELDS), capacity), dtype=np.float64)
+        self._head = np.zeros(slots, dtype=np.int64)
+        self._count = np.zeros(slots, dtype=np.int64)
+        self._slots: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, market_id) -> bool:
+        return int(market_id) in self._slots
+
+    def _slot(self, market_id: int) -> int:
+        slot = self._slots.get(market_id)
+        if slot is None:
+            slot = len(self._slots)
+            if slot == len(self._head):
+                grown = len(self._head) * 2
+                self._data = np.concatenate([self._data, np.zeros_like(self._data)])
+                self._head = np.resize(self._head, grown)
+                self._count = np.resize(self._count, grown)
+                self._head[slot:] = 0
+                self._count[slot:] = 0
+            self._slots[market_id] = slot
+        return slot
+
+    def append(self, market_id: int, timestamp: float, ratio: float, volume: float,
+               a_shares: float = 0.0, b_shares: float = 0.0):
+        """Append one sample (O(1))"""
+        self.append_many([{
+            'id': market_id, 'optionARatio': ratio, 'totalVolume': volume,
+            'totalOptionAShares': a_shares, 'totalOptionBShares': b_shares
+        }], timestamp=timestamp)
+
+    def append_many(self, markets: Iterable[Mapping], timestamp: Optional[float] = None) -> int:
+        """Append a sample for each market that changed or is due for re-sampling
+
+        Returns the number of samples written.
+        """
+        markets = list(markets)
+        if not markets:
+            return 0
+        now = time.time() if timestamp is None else timestamp
+
+        with self._lock:
+            slots = np.asarray([self._slot(int(m['id'])) for m in markets], dtype=np.int64)
+            values = np.empty((len(markets), len(FIELDS)), dtype=np.float64)
+            values[:, _TS] = now
+            for column, name in enumerate(FIELDS[1:], start=1):
+                values[:, column] = [float(m.get(name, 0) or 0) for m in markets]
+
+            # Compare against each market's latest sample
+            counts = self._count[slots]
+            last = self._data[slots, :, (self._head[slots] - 1) % self.capacity]
+            changed = np.any(last[:, 1:] != values[:, 1:], axis=1)
+            due = (counts == 0) | changed | (now - last[:, _TS] >= self.min_interval)
+            slots, values = slots[due], values[due]
+            if not len(slots):
+                return 0
+
+            heads = self._head[slots]
+            self._data[slots, :, heads] = values
+            self._head[slots] = (heads + 1) % self.capacity
+            self._count[slots] = np.minimum(self._count[slots] + 1, self.capacity)
+            return len(slots)
+
+    def series(self, market_id, field: str = 'optionARatio') -> np.ndarray:
+        """Chronological samples of one field (a copy)"""
+        slot = self._slots.get(int(market_id))
+        if slot is None:
+            return np.empty(0, dtype=np.float64)
+        count = int(self._count[slot])
+        start = (int(self._head[slot]) - count) % self.capacity
+        order = (start + np.arange(count)) % self.capacity
+        return self._data[slot, FIELDS.index(field), order]
+
+    def stats(self, market_id, window: float = TREND_WINDOW, halflife: float = EWMA_HALFLIFE,
+              now: Optional[float] = None) -> Dict:
+        """Trend features over the trailing window
+
+        ratioMomentum     change in option A ratio since the window start
+        ratioEwma         exponentially weighted option A ratio (half-life in seconds)
+        ratioVolatility   standard deviation of sample-to-sample ratio changes
+        volumeFlowPerHour pool growth per hour across the window
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            timestamps = self.series(market_id, 'timestamp')
+            ratios = self.series(market_id, 'optionARatio')
+            volumes = self.series(market_id, 'totalVolume')
+
+        if not len(timestamps):
+            return {'samples': 0, 'ratioMomentum': 0.0, 'ratioEwma': None,
+                    'ratioVolatility': 0.0, 'volumeFlowPerHour': 0.0, 'windowSeconds': window}
+
+        # Baseline: latest sample at or before the window start (else the oldest sample)
+        start = now - window
+        base = max(0, int(np.searchsorted(timestamps, start, side='right')) - 1)
+        in_window = timestamps >= timestamps[base]
+
+        weights = np.exp(-(now - timestamps[in_window]) * np.log(2) / halflife)
+        elapsed_hours = max(now - timestamps[base], 1.0) / 3600
+
+        return {
+            'samples': int(in_window.sum()),
+            'ratioMomentum': float(ratios[-1] - ratios[base]),
+            'ratioEwma': float(np.dot(weights, ratios[in_window]) / weights.sum()) if weights.sum() > 0 else float(ratios[-1]),
+            'ratioVolatility': float(np.std(np.diff(ratios[in_window]))) if in_window.sum() > 2 else 0.0,
+            'volumeFlowPerHour': float((volumes[-1] - volumes[base]) / elapsed_hours),
+            'windowSeconds': window
+        }
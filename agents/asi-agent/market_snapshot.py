@@ -0,0 +1,136 @@
+"""
+On-disk market snapshot for warm restarts
+
+Persists market rows and sync checkpoints (last processed block, cursors) to
+a local SQLite database in WAL mode. Writes are incremental: only markets
+whose serialized state changed since the last save are rewritten. At startup
+the snapshot is loaded back into a MarketStore so the servers can answer
+immediately and resume delta sync from the checkpoint instead of rebuilding
+everything from RPC. A snapshot is bound to the source that wrote it (EVM
+contract or Sui package); opening it for another source starts it empty.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping
+
+# Keys that describe how a value was served, not market state
+TRANSIENT_KEYS = ('stale', 'staleSeconds', 'error')
+
+class MarketSnapshot:
+    """SQLite-backed market rows plus named checkpoints"""
+
+    def __init__(self, path: str):
+        self.path = path or ':memory:'
+        if self.path != ':memory:':
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS markets ("
+            " id INTEGER PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " name TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL)"
+        )
+        # Serialized state last written per market id, to skip unchanged rows
+        self._written: Dict[int, str] = {}
+
+    @staticmethod
+    def _serialize(market: Mapping) -> str:
+        record = {key: market[key] for key in market.keys() if key not in TRANSIENT_KEYS and key != 'lastUpdate'}
+        return json.dumps(record, sort_keys=True, separators=(',', ':'))
+
+    def load_markets(self) -> List[Dict]:
+        """Return every stored market dict (ordered by id)
+
+        lastUpdate is restored from the time the row was last written.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT id, data, updated_at FROM markets ORDER BY id").fetchall()
+        markets = []
+        for market_id, data, updated_at in rows:
+            self._written[market_id] = data
+            market = json.loads(data)
+            market['lastUpdate'] = updated_at
+            markets.append(market)
+        return markets
+
+    def save_markets(self, markets: Iterable[Mapping]) -> int:
+        """Upsert markets whose state changed; return the number of rows written"""
+        pending = []
+        now = time.time()
+        for market in markets:
+            data = self._serialize(market)
+            market_id = int(market['id'])
+            if self._written.get(market_id) != data:
+                pending.append((market_id, data, now))
+
+        if not pending:
+            return 0
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO markets (id, data, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                    pending
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._written.update((market_id, data) for market_id, data, _ in pending)
+        return len(pending)
+
+    def bind_source(self, source: str) -> bool:
+        """Tie the snapshot to one market source; rows and checkpoints written by another are discarded
+
+        Returns True when the stored state belongs to `source` (or there is none).
+        Snapshots from before sources were recorded count as foreign.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM checkpoints WHERE name = 'source'").fetchone()
+            if row and json.loads(row[0]) == source:
+                return True
+            has_rows = self._conn.execute("SELECT 1 FROM markets LIMIT 1").fetchone() is not None
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM markets")
+                self._conn.execute("DELETE FROM checkpoints")
+                self._conn.execute("INSERT INTO checkpoints (name, value) VALUES ('source', ?)", (json.dumps(source),))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._written.clear()
+        return not has_rows and row is None
+
+    def get_checkpoint(self, name: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM checkpoints WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_checkpoint(self, name: str, value: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO checkpoints (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                (name, json.dumps(value))
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
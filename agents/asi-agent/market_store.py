@@ -0,0 +1,355 @@
+"""
+Columnar market storage for the agent and HTTP servers
+
+Markets are kept as typed NumPy columns for the numeric fields and interned
+Python strings for text fields, instead of one ~20-key dict per market.
+MarketRow is a __slots__ view onto a single row that behaves like the legacy
+market dict (market['optionARatio'], market.get('hasActivity')), so existing
+analysis code keeps working. Column accessors return zero-copy views for
+batch analysis and serialization.
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+import numpy as np
+
+# Numeric fields stored as typed columns
+NUMERIC_COLUMNS = {
+    'id': np.int64,
+    'optionARatio': np.float64,
+    'optionBRatio': np.float64,
+    'totalVolume': np.float64,
+    'totalOptionAShares': np.float64,
+    'totalOptionBShares': np.float64,
+    'outcome': np.int8,
+    'endTime': np.int64,
+    'category': np.int16,
+    'resolved': np.bool_,
+    'hasActivity': np.bool_,
+    'lastUpdate': np.float64  # epoch seconds, rendered as ISO text for dict consumers
+}
+
+# Text fields stored as interned strings
+STRING_COLUMNS = ('title', 'description', 'optionA', 'optionB', 'creator')
+
+# Fields excluded from change detection (they move on every refresh)
+VOLATILE_FIELDS = ('lastUpdate',)
+
+DEFAULTS = {
+    'optionARatio': 0.5,
+    'optionBRatio': 0.5,
+    'outcome': 0,
+    'endTime': 0,
+    'category': 0,
+    'resolved': False,
+    'title': '',
+    'description': '',
+    'optionA': 'Option A',
+    'optionB': 'Option B',
+    'creator': '0x0000000000000000000000000000000000000000'
+}
+
+def _intern(value) -> str:
+    return sys.intern(str(value)) if value is not None else ''
+
+def _epoch(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+class MarketRow:
+    """Read-only, dict-compatible view of one row in a MarketStore"""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: "MarketStore", row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key: str):
+        return self._store._value(self._row, key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self._store._value(self._row, key)
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return key in self._store._keys(self._row)
+
+    def keys(self) -> List[str]:
+        return self._store._keys(self._row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> Dict:
+        return {key: self[key] for key in self.keys()}
+
+    @property
+    def id(self) -> int:
+        return int(self._store._numeric['id'][self._row])
+
+    def __repr__(self) -> str:
+        return f"MarketRow(id={self.id}, title={self['title']!r})"
+
+class MarketSlice:
+    """Zero-copy window over a contiguous range of store rows"""
+
+    def __init__(self, store: "MarketStore", start: int, stop: int):
+        self.store = store
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def column(self, name: str):
+        """NumPy view for numeric columns, list slice for string columns"""
+        if name in NUMERIC_COLUMNS:
+            return self.store._numeric[name][self.start:self.stop]
+        if name == 'status':
+            return self.store._status[self.start:self.stop]
+        return self.store._strings[name][self.start:self.stop]
+
+    def to_dicts(self) -> List[Dict]:
+        """Serialize the slice column-wise (one tolist() per column, not per cell)"""
+        if not len(self):
+            return []
+        columns = {name: self.column(name).tolist() for name in NUMERIC_COLUMNS}
+        strings = {name: self.column(name) for name in STRING_COLUMNS}
+        status_names = self.store._status_names
+        statuses = [status_names[code] for code in self.column('status').tolist()]
+        iso = {}
+
+        records = []
+        for i in range(len(self)):
+            record = {name: values[i] for name, values in columns.items()}
+            for name, values in strings.items():
+                record[name] = values[i]
+            record['question'] = record['title']
+            record['status'] = statuses[i]
+            updated = record['lastUpdate']
+            if updated not in iso:
+                iso[updated] = datetime.fromtimestamp(updated).isoformat()
+            record['lastUpdate'] = iso[updated]
+            extras = self.store._extras.get(self.start + i)
+            if extras:
+                record.update(extras)
+            records.append(record)
+        return records
+
+class MarketStore:
+    """Growable columnar table of markets keyed by market id"""
+
+    def __init__(self, capacity: int = 64):
+        self._capacity = max(1, capacity)
+        self._size = 0
+        self._numeric = {name: np.zeros(self._capacity, dtype=dtype) for name, dtype in NUMERIC_COLUMNS.items()}
+        self._status = np.zeros(self._capacity, dtype=np.uint8)
+        self._status_names: List[str] = []
+        self._status_codes: Dict[str, int] = {}
+        self._strings: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+        # Rare per-market keys (error, stale markers, ...) kept out of the columns
+        self._extras: Dict[int, Dict] = {}
+        self._index: Dict[int, int] = {}
+        self._rows: List[MarketRow] = []
+        self._lock = threading.Lock()
+        self.version = 0
+        self.updated_at = 0.0             # time of the last version bump
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[MarketRow]:
+        return iter(self.rows())
+
+    def __contains__(self, market_id) -> bool:
+        return int(market_id) in self._index
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, column in self._numeric.items():
+            grown = np.zeros(self._capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._numeric[name] = grown
+        grown_status = np.zeros(self._capacity, dtype=np.uint8)
+        grown_status[:self._size] = self._status[:self._size]
+        self._status = grown_status
+
+    def _status_code(self, status: str) -> int:
+        code = self._status_codes.get(status)
+        if code is None:
+            code = len(self._status_names)
+            self._status_names.append(_intern(status))
+            self._status_codes[status] = code
+        return code
+
+    def _append_row(self, market_id: int) -> int:
+        if self._size == self._capacity:
+            self._grow()
+        row = self._size
+        for name in STRING_COLUMNS:
+            self._strings[name].append('')
+        self._numeric['id'][row] = market_id
+        self._index[market_id] = row
+        self._rows.append(MarketRow(self, row))
+        self._size += 1
+        return row
+
+    @staticmethod
+    def _numeric_value(market: Mapping, name: str):
+        if name == 'lastUpdate':
+            return _epoch(market.get('lastUpdate'))
+        if name == 'hasActivity':
+            if 'hasActivity' in market:
+                return market['hasActivity']
+            shares = float(market.get('totalOptionAShares', 0) or 0) + float(market.get('totalOptionBShares', 0) or 0)
+            return shares > 0 or float(market.get('totalVolume', 0) or 0) > 0
+        value = market.get(name, DEFAULTS.get(name, 0))
+        return value if value is not None else 0
+
+    def upsert(self, market: Mapping) -> MarketRow:
+        """Insert or update one market in place and return its row view"""
+        return self.upsert_many([market])[0]
+
+    def upsert_many(self, markets: Iterable[Mapping]) -> List[MarketRow]:
+        """Insert or update markets in place; bumps `version` once if anything changed
+
+        Numeric columns are written with one vectorized assignment per column.
+        """
+        markets = list(markets)
+        if not markets:
+            return []
+
+        with self._lock:
+            changed = False
+            row_indices = []
+            for market in markets:
+                market_id = int(market['id'])
+                row = self._index.get(market_id)
+                if row is None:
+                    row = self._append_row(market_id)
+                    changed = True
+                row_indices.append(row)
+            rows = np.asarray(row_indices, dtype=np.int64)
+
+            for name, column in self._numeric.items():
+                if name == 'id':
+                    continue
+                values = np.asarray([self._numeric_value(m, name) for m in markets], dtype=column.dtype)
+                if not changed and name not in VOLATILE_FIELDS and np.any(column[rows] != values):
+                    changed = True
+                column[rows] = values
+
+            status_codes = np.asarray([
+                self._status_code(m.get('status') or ('resolved' if m.get('resolved') else 'active'))
+                for m in markets
+            ], dtype=np.uint8)
+            if not changed and np.any(self._status[rows] != status_codes):
+                changed = True
+            self._status[rows] = status_codes
+
+            for name in STRING_COLUMNS:
+                column = self._strings[name]
+                default = DEFAULTS.get(name, '')
+                for row, market in zip(row_indices, markets):
+                    value = market.get(name, default)
+                    if column[row] != value:
+                        column[row] = _intern(value)
+                        changed = True
+
+            for row, market in zip(row_indices, markets):
+                extras = {key: market[key] for key in market.keys() if key not in KNOWN_KEYS}
+                if extras or row in self._extras:
+                    if self._extras.get(row, {}) != extras:
+                        changed = True
+                        if extras:
+                            self._extras[row] = extras
+                        else:
+                            self._extras.pop(row, None)
+
+            if changed:
+                self.version += 1
+                self.updated_at = time.time()
+            return [self._rows[row] for row in row_indices]
+
+    def get(self, market_id) -> Optional[MarketRow]:
+        try:
+            row = self._index.get(int(market_id))
+        except (TypeError, ValueError):
+            return None
+        return self._rows[row] if row is not None else None
+
+    def rows(self) -> List[MarketRow]:
+        return self._rows[:self._size]
+
+    def row_index(self, market_id) -> Optional[int]:
+        return self._index.get(int(market_id))
+
+    def column(self, name: str):
+        """Zero-copy view of a whole column (numeric columns as NumPy arrays)"""
+        return self.view().column(name)
+
+    def view(self, start: int = 0, stop: Optional[int] = None) -> MarketSlice:
+        stop = self._size if stop is None else min(stop, self._size)
+        return MarketSlice(self, max(0, start), stop)
+
+    def to_dicts(self) -> List[Dict]:
+        return self.view().to_dicts()
+
+    @property
+    def status_names(self) -> List[str]:
+        """Status strings indexed by the codes in the 'status' column"""
+        return list(self._status_names)
+
+    def status_name(self, row: int) -> str:
+        return self._status_names[self._status[row]]
+
+    def _keys(self, row: int) -> List[str]:
+        keys = list(FIELD_ORDER)
+        extras = self._extras.get(row)
+        if extras:
+            keys.extend(extras)
+        return keys
+
+    def _value(self, row: int, key: str):
+        column = self._numeric.get(key)
+        if column is not None:
+            if key == 'lastUpdate':
+                return datetime.fromtimestamp(float(column[row])).isoformat()
+            return column[row].item()
+        if key in self._strings:
+            return self._strings[key][row]
+        if key == 'question':
+            return self._strings['title'][row]
+        if key == 'status':
+            return self.status_name(row)
+        extras = self._extras.get(row)
+        if extras and key in extras:
+            return extras[key]
+        raise KeyError(key)
+
+# Dict key order matches the market dicts built by simple_http_server
+FIELD_ORDER = (
+    'id', 'title', 'description', 'optionA', 'optionB', 'question',
+    'optionARatio', 'optionBRatio', 'totalVolume', 'totalOptionAShares', 'totalOptionBShares',
+    'status', 'resolved', 'outcome', 'endTime', 'creator', 'category', 'lastUpdate', 'hasActivity'
+)
+KNOWN_KEYS = frozenset(FIELD_ORDER)
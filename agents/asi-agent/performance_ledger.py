@@ -0,0 +1,265 @@
+"""
+Bet and outcome ledger with incrementally maintained performance aggregates
+
+Every bet and every resolution is stored in a local SQLite database (WAL
+mode). Alongside the rows, one aggregate bucket per UTC day - and one
+all-time bucket - is updated in the same transaction, so recording a bet or
+a resolution costs O(1) and a 7d/14d/30d summary combines at most 30 bucket
+rows no matter how many bets the ledger holds.
+
+A bucket keeps counts, stake, profit, the sum and sum of squares of per-bet
+returns (for the average and Sharpe ratio), plus the running-profit path
+summary - total, highest and lowest prefix, and largest drawdown - that lets
+buckets be concatenated to get the max drawdown of a whole window.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, fields
+from typing import Dict, Optional
+
+ALL_TIME = -1                 # bucket key of the all-time aggregate
+DAY_SECONDS = 86400
+DEFAULT_WINDOWS = (7, 14, 30)
+
+@dataclass
+class Bucket:
+    """Aggregates for one day (or all time); combinable in time order"""
+    bets: int = 0
+    staked: float = 0.0
+    resolved: int = 0
+    wins: int = 0
+    profit: float = 0.0
+    return_sum: float = 0.0
+    return_sq_sum: float = 0.0
+    peak: float = 0.0             # highest running profit, relative to the bucket start
+    trough: float = 0.0           # lowest running profit, relative to the bucket start
+    drawdown: float = 0.0         # largest peak-to-trough fall of running profit
+
+    def add_resolution(self, profit: float, stake: float):
+        """Append one resolved bet to the end of the bucket's profit path"""
+        level = self.profit + profit
+        self.drawdown = max(self.drawdown, self.peak - level)
+        self.peak = max(self.peak, level)
+        self.trough = min(self.trough, level)
+        self.profit = level
+        self.resolved += 1
+        self.wins += profit > 0
+        ret = profit / stake if stake else 0.0
+        self.return_sum += ret
+        self.return_sq_sum += ret * ret
+
+    def then(self, later: "Bucket") -> "Bucket":
+        """This bucket followed by `later`"""
+        return Bucket(
+            bets=self.bets + later.bets,
+            staked=self.staked + later.staked,
+            resolved=self.resolved + later.resolved,
+            wins=self.wins + later.wins,
+            profit=self.profit + later.profit,
+            return_sum=self.return_sum + later.return_sum,
+            return_sq_sum=self.return_sq_sum + later.return_sq_sum,
+            peak=max(self.peak, self.profit + later.peak),
+            trough=min(self.trough, self.profit + later.trough),
+            drawdown=max(self.drawdown, later.drawdown, self.peak - (self.profit + later.trough))
+        )
+
+    @classmethod
+    def from_row(cls, row) -> "Bucket":
+        bucket = cls(*row)
+        bucket.bets, bucket.resolved, bucket.wins = int(bucket.bets), int(bucket.resolved), int(bucket.wins)
+        return bucket
+
+    def summary(self) -> Dict:
+        mean = self.return_sum / self.resolved if self.resolved else 0.0
+        variance = self.return_sq_sum / self.resolved - mean * mean if self.resolved else 0.0
+        std = variance ** 0.5 if variance > 1e-12 else 0.0
+        return {
+            'totalBets': self.bets,
+            'resolvedBets': self.resolved,
+            'winRate': round(self.wins / self.resolved * 100, 1) if self.resolved else 0.0,
+            'averageReturn': round(mean * 100, 2),
+            'totalProfit': round(self.profit, 2),
+            'totalStaked': round(self.staked, 2),
+            'sharpeRatio': round(mean / std, 2) if std else 0.0,
+            'maxDrawdown': round(-self.drawdown, 2) or 0.0
+        }
+
+BUCKET_COLUMNS = tuple(f.name for f in fields(Bucket))
+
+PLATFORM_FEE = 0.025              # prediction_market.move: platform_fee = 250 bps
+
+def parimutuel_payout(stake, winning_shares, total_pool, fee: float = PLATFORM_FEE):
+    """Contract payout of a winning stake: 1 share per unit staked, winners split the pool net of the fee
+
+    Works on floats and NumPy arrays alike; winning_shares must be positive.
+    """
+    return stake * total_pool * (1 - fee) / winning_shares
+
+def parse_timeframe(timeframe: Optional[str]) -> Optional[int]:
+    """'7d' / '24h' / '4w' -> days; 'all' or empty -> None; raises ValueError otherwise"""
+    if not timeframe or timeframe == 'all':
+        return None
+    units = {'h': 1 / 24, 'd': 1, 'w': 7}
+    try:
+        value, unit = float(timeframe[:-1]), units[timeframe[-1]]
+        return max(1, round(value * unit))
+    except (KeyError, ValueError, OverflowError):
+        # OverflowError: 'infd' parses as float('inf') and cannot be rounded
+        raise ValueError(f"Unknown timeframe '{timeframe}' (use e.g. 7d, 24h, 4w or all)")
+
+class PerformanceLedger:
+    """SQLite ledger of agent bets with per-day performance buckets"""
+
+    def __init__(self, path: str):
+        self.path = path or ':memory:'
+        if self.path != ':memory:':
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bets ("
+            " id INTEGER PRIMARY KEY,"
+            " market_id INTEGER NOT NULL,"
+            " option INTEGER NOT NULL,"
+            " amount REAL NOT NULL,"
+            " placed_at REAL NOT NULL,"
+            " tx_hash TEXT,"
+            " status TEXT NOT NULL DEFAULT 'open',"
+            " payout REAL,"
+            " resolved_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bets_open ON bets (market_id) WHERE status = 'open'")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " day INTEGER PRIMARY KEY,"
+            + ", ".join(f"{name} REAL NOT NULL DEFAULT 0" for name in BUCKET_COLUMNS) + ")"
+        )
+
+    @staticmethod
+    def _day(timestamp: float) -> int:
+        return int(timestamp // DAY_SECONDS)
+
+    def _load_bucket(self, day: int) -> Bucket:
+        row = self._conn.execute(
+            f"SELECT {', '.join(BUCKET_COLUMNS)} FROM buckets WHERE day = ?", (day,)
+        ).fetchone()
+        return Bucket.from_row(row) if row else Bucket()
+
+    def _save_bucket(self, day: int, bucket: Bucket):
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO buckets (day, {', '.join(BUCKET_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' for _ in BUCKET_COLUMNS)})",
+            (day, *(getattr(bucket, name) for name in BUCKET_COLUMNS))
+        )
+
+    def record_bet(self, market_id: int, option: int, amount: float, placed_at: Optional[float] = None,
+                   tx_hash: Optional[str] = None) -> int:
+        """Store a placed bet and return its ledger id"""
+        placed_at = time.time() if placed_at is None else placed_at
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO bets (market_id, option, amount, placed_at, tx_hash) VALUES (?, ?, ?, ?, ?)",
+                    (int(market_id), int(option), float(amount), placed_at, tx_hash)
+                )
+                for day in (self._day(placed_at), ALL_TIME):
+                    bucket = self._load_bucket(day)
+                    bucket.bets += 1
+                    bucket.staked += float(amount)
+                    self._save_bucket(day, bucket)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cursor.lastrowid
+
+    def resolve_market(self, market_id: int, outcome: int, total_pool: float, winning_shares: float,
+                       resolved_at: Optional[float] = None) -> int:
+        """Settle the open bets on a resolved market with parimutuel payouts; returns bets settled
+
+        A winning bet pays amount / winning_shares of the pool after the platform fee,
+        as parimutuel_payout() computes for the backtester.
+        """
+        resolved_at = time.time() if resolved_at is None else resolved_at
+        with self._lock:
+            # Other processes may share the file; the write lock covers the read of open bets too
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                open_bets = self._conn.execute(
+                    "SELECT id, option, amount FROM bets WHERE market_id = ? AND status = 'open' ORDER BY id",
+                    (int(market_id),)
+                ).fetchall()
+                if not open_bets:
+                    self._conn.execute("COMMIT")
+                    return 0
+                days = (self._day(resolved_at), ALL_TIME)
+                buckets = {day: self._load_bucket(day) for day in days}
+                for bet_id, option, amount in open_bets:
+                    won = option == outcome
+                    payout = parimutuel_payout(amount, winning_shares, total_pool) if won and winning_shares > 0 else 0.0
+                    self._conn.execute(
+                        "UPDATE bets SET status = ?, payout = ?, resolved_at = ? WHERE id = ?",
+                        ('won' if won else 'lost', payout, resolved_at, bet_id)
+                    )
+                    for bucket in buckets.values():
+                        bucket.add_resolution(payout - amount, amount)
+                for day, bucket in buckets.items():
+                    self._save_bucket(day, bucket)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return len(open_bets)
+
+    def resolve_markets(self, markets) -> int:
+        """Settle bets on every resolved market dict that carries an outcome (0 = A, 1 = B)"""
+        settled = 0
+        for market in markets:
+            if market.get('status') != 'resolved' or market.get('outcome') is None:
+                continue
+            outcome = int(market['outcome'])
+            winning_shares = market.get('totalOptionAShares' if outcome == 0 else 'totalOptionBShares', 0)
+            settled += self.resolve_market(market['id'], outcome, market.get('totalVolume', 0), winning_shares)
+        return settled
+
+    def window(self, days: Optional[int], now: Optional[float] = None) -> Bucket:
+        """Aggregate of the last `days` days (None: all time) from at most `days` bucket rows"""
+        with self._lock:
+            if days is None:
+                return self._load_bucket(ALL_TIME)
+            today = self._day(time.time() if now is None else now)
+            rows = self._conn.execute(
+                f"SELECT {', '.join(BUCKET_COLUMNS)} FROM buckets WHERE day BETWEEN ? AND ? ORDER BY day",
+                (today - days + 1, today)
+            ).fetchall()
+        combined = Bucket()
+        for row in rows:
+            combined = combined.then(Bucket.from_row(row))
+        return combined
+
+    def summary(self, timeframe: Optional[str] = '30d', windows=DEFAULT_WINDOWS, now: Optional[float] = None) -> Dict:
+        """Performance for `timeframe` plus win rate/profit for each rolling window"""
+        report = self.window(parse_timeframe(timeframe), now).summary()
+        report['timeframe'] = timeframe or 'all'
+        report['recentPerformance'] = []
+        for days in windows:
+            stats = self.window(days, now).summary()
+            report['recentPerformance'].append({
+                'period': f'{days}d',
+                'winRate': stats['winRate'],
+                'profit': stats['totalProfit'],
+                'bets': stats['totalBets']
+            })
+        return report
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,323 @@
+"""
+Live analysis and price updates pushed over WebSocket or SSE
+
+Instead of polling the HTTP endpoints, clients open one connection to the
+PushHub, which runs an aiohttp server on its own event loop thread:
+
+    GET /ws                          WebSocket; send {"subscribe": [1, 2]},
+                                     {"subscribe": "all"}, {"subscribe": "prices"}
+                                     or {"unsubscribe": [...]}
+    GET /events?markets=1,2&prices=1 Server-sent events (markets=all for every market)
+
+The servers call publish_markets() when a refresh produces a new snapshot;
+only markets whose analysis or ratios changed are fanned out, and only to
+the connections subscribed to them. publish_prices() does the same for
+Pyth prices.
+
+Each connection keeps a dict of pending updates keyed by market id (or
+price symbol) and a single writer task. Updates that arrive while a send is
+in progress - or within the coalescing interval - replace older pending
+values for the same key, so a slow client costs at most one entry per
+subscribed key and always receives the latest state. A send that stalls
+beyond send_timeout closes the connection. An idle subscriber is one parked
+task and a small dict, so thousands of them fit on the loop.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from aiohttp import WSMsgType, web
+
+import fast_json
+
+COALESCE_INTERVAL = 0.25      # seconds to gather updates before a flush
+SEND_TIMEOUT = 5.0            # slow-consumer cutoff per flush
+SSE_HEARTBEAT = 15.0          # comment line keeping idle SSE connections open
+ALL = 'all'
+PRICES = 'prices'
+
+def market_update(market: Dict, analysis: Optional[Dict]) -> Dict:
+    """Compact per-market payload pushed to subscribers"""
+    update = {
+        'marketId': market['id'],
+        'optionARatio': round(market.get('optionARatio', 0.5), 6),
+        'totalVolume': market.get('totalVolume', 0),
+        'status': market.get('status'),
+    }
+    if analysis:
+        update['recommendation'] = analysis.get('recommendation')
+        update['confidence'] = round(analysis.get('confidence', 0), 4)
+        update['riskLevel'] = str(analysis.get('riskLevel') or analysis.get('risk_level') or '').lower()
+    return update
+
+def digest_updates(digest) -> List[Dict]:
+    """market_update() for every market in a MarketDigest"""
+    return [market_update(market, digest.analysis_by_id.get(market['id'])) for market in digest.markets]
+
+def price_update(entry: Dict) -> Dict:
+    """Pyth price entry without the receive time, so unchanged prices are not re-sent"""
+    return {key: entry[key] for key in ('symbol', 'price', 'confidence', 'timestamp')}
+
+class Subscriber:
+    """One client connection: its topics, pending updates and wake-up event"""
+
+    def __init__(self, hub: "PushHub", send):
+        self.hub = hub
+        self.send = send                      # coroutine taking encoded bytes
+        self.markets: Set[int] = set()
+        self.pending_markets: Dict[int, Dict] = {}
+        self.pending_prices: Dict[str, Dict] = {}
+        self.wake = asyncio.Event()
+        self.closed = False
+
+    def offer(self, markets: Dict[int, Dict], prices: Dict[str, Dict]):
+        """Queue updates, replacing any still-pending value for the same key"""
+        if not markets and not prices:
+            return
+        pending = len(self.pending_markets) + len(self.pending_prices)
+        self.pending_markets.update(markets)
+        self.pending_prices.update(prices)
+        self.hub.coalesced += pending + len(markets) + len(prices) - len(self.pending_markets) - len(self.pending_prices)
+        self.wake.set()
+
+    async def write_loop(self):
+        while not self.closed:
+            await self.wake.wait()
+            await asyncio.sleep(self.hub.coalesce_interval)
+            self.wake.clear()
+            markets, self.pending_markets = self.pending_markets, {}
+            prices, self.pending_prices = self.pending_prices, {}
+            if not markets and not prices:
+                continue
+            message = {'type': 'update', 'timestamp': time.time()}
+            if markets:
+                message['markets'] = list(markets.values())
+            if prices:
+                message['prices'] = prices
+            try:
+                await asyncio.wait_for(self.send(fast_json.dumps(message)), self.hub.send_timeout)
+                self.hub.messages_sent += 1
+            except asyncio.TimeoutError:
+                self.hub.slow_disconnects += 1
+                self.closed = True
+            except (ConnectionError, RuntimeError):
+                self.closed = True
+
+class PushHub:
+    """Subscription registry and aiohttp push server on a background event loop"""
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 8002, coalesce_interval: float = COALESCE_INTERVAL,
+                 send_timeout: float = SEND_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.coalesce_interval = coalesce_interval
+        self.send_timeout = send_timeout
+        self.subscribers: Set[Subscriber] = set()
+        # Topic indexes, so a publish touches only the interested connections
+        self._all_markets: Set[Subscriber] = set()
+        self._by_market: Dict[int, Set[Subscriber]] = {}
+        self._prices: Set[Subscriber] = set()
+        self._latest_markets: Dict[int, Dict] = {}
+        self._latest_prices: Dict[str, Dict] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._started = threading.Event()
+        self.published = 0
+        self.coalesced = 0
+        self.messages_sent = 0
+        self.slow_disconnects = 0
+
+    # --- publishing (any thread) ---
+
+    def publish_markets(self, updates: Iterable[Dict]):
+        """Fan out the per-market payloads that differ from the last ones published"""
+        self._call(self._fanout_markets, list(updates))
+
+    def publish_prices(self, prices: Dict[str, Dict]):
+        self._call(self._fanout_prices, dict(prices))
+
+    def _call(self, fn, *args):
+        if self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(fn, *args)
+
+    def _fanout_markets(self, updates):
+        changed = {}
+        for update in updates:
+            market_id = update['marketId']
+            if self._latest_markets.get(market_id) != update:
+                self._latest_markets[market_id] = update
+                changed[market_id] = update
+        if not changed:
+            return
+        self.published += len(changed)
+        for subscriber in self._all_markets:
+            subscriber.offer(changed, {})
+        targets: Dict[Subscriber, Dict[int, Dict]] = {}
+        for market_id, update in changed.items():
+            for subscriber in self._by_market.get(market_id, ()):
+                targets.setdefault(subscriber, {})[market_id] = update
+        for subscriber, subscribed in targets.items():
+            if subscriber not in self._all_markets:
+                subscriber.offer(subscribed, {})
+
+    def _fanout_prices(self, prices):
+        changed = {symbol: price for symbol, price in prices.items() if self._latest_prices.get(symbol) != price}
+        if changed:
+            self._latest_prices.update(changed)
+            self.published += len(changed)
+            for subscriber in self._prices:
+                subscriber.offer({}, changed)
+
+    # --- subscriptions ---
+
+    def _subscribe(self, subscriber: Subscriber, topics, subscribe: bool = True):
+        """Add or remove topics; new subscriptions start from the current state"""
+        topics = topics if isinstance(topics, list) else [topics]
+        for topic in topics:
+            if topic == ALL:
+                if subscribe:
+                    self._all_markets.add(subscriber)
+                    subscriber.offer(self._latest_markets, {})
+                else:
+                    self._all_markets.discard(subscriber)
+            elif topic == PRICES:
+                if subscribe:
+                    self._prices.add(subscriber)
+                    subscriber.offer({}, self._latest_prices)
+                else:
+                    self._prices.discard(subscriber)
+            else:
+                market_id = int(topic)
+                if subscribe:
+                    subscriber.markets.add(market_id)
+                    self._by_market.setdefault(market_id, set()).add(subscriber)
+                    if market_id in self._latest_markets:
+                        subscriber.offer({market_id: self._latest_markets[market_id]}, {})
+                else:
+                    self._unsubscribe_market(subscriber, market_id)
+
+    def _unsubscribe_market(self, subscriber: Subscriber, market_id: int):
+        subscriber.markets.discard(market_id)
+        subscribers = self._by_market.get(market_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._by_market[market_id]
+
+    async def _serve(self, subscriber: Subscriber, receive):
+        """Run until the client goes away or the writer gives up on a slow client"""
+        self.subscribers.add(subscriber)
+        tasks = [asyncio.ensure_future(receive()), asyncio.ensure_future(subscriber.write_loop())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            subscriber.closed = True
+            self.subscribers.discard(subscriber)
+            self._all_markets.discard(subscriber)
+            self._prices.discard(subscriber)
+            for market_id in list(subscriber.markets):
+                self._unsubscribe_market(subscriber, market_id)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _websocket(self, request: web.Request):
+        ws = web.WebSocketResponse(heartbeat=30.0)
+        await ws.prepare(request)
+
+        async def send(body: bytes):
+            # Text frames, so browsers get strings they can JSON.parse
+            await ws.send_str(body.decode('utf-8'))
+
+        subscriber = Subscriber(self, send)
+
+        async def receive():
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    command = fast_json.loads(msg.data)
+                    if 'subscribe' in command:
+                        self._subscribe(subscriber, command['subscribe'])
+                    if 'unsubscribe' in command:
+                        self._subscribe(subscriber, command['unsubscribe'], subscribe=False)
+                except (ValueError, TypeError, AttributeError):
+                    await send(fast_json.dumps({'type': 'error', 'error': 'Expected {"subscribe": [...]}'}))
+
+        await send(fast_json.dumps({'type': 'hello', 'topics': [ALL, PRICES, '<marketId>']}))
+        await self._serve(subscriber, receive)
+        await ws.close()
+        return ws
+
+    async def _events(self, request: web.Request):
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'Access-Control-Allow-Origin': '*'
+        })
+        await response.prepare(request)
+
+        async def send(body: bytes):
+            await response.write(b'data: ' + body + b'\n\n')
+
+        subscriber = Subscriber(self, send)
+        try:
+            markets = request.query.get('markets', '')
+            topics = [ALL] if markets == ALL else [int(m) for m in markets.split(',') if m]
+            if request.query.get('prices') in ('1', 'true'):
+                topics.append(PRICES)
+        except ValueError:
+            await response.write(b'event: error\ndata: {"error":"markets must be ids or all"}\n\n')
+            return response
+        self._subscribe(subscriber, topics)
+
+        async def receive():
+            # SSE is one-way: hold the connection, pinging so proxies keep it open
+            while not subscriber.closed:
+                await asyncio.sleep(SSE_HEARTBEAT)
+                await asyncio.wait_for(response.write(b': ping\n\n'), self.send_timeout)
+
+        try:
+            await self._serve(subscriber, receive)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        return response
+
+    # --- server ---
+
+    def start(self) -> "PushHub":
+        threading.Thread(target=self._thread_main, name='push-hub', daemon=True).start()
+        self._started.wait(10)
+        return self
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get('/ws', self._websocket)
+        app.router.add_get('/events', self._events)
+        runner = web.AppRunner(app, access_log=None)
+        try:
+            self._loop.run_until_complete(runner.setup())
+            self._loop.run_until_complete(web.TCPSite(runner, self.host, self.port).start())
+            print(f"📡 Push channel on ws://{self.host}:{self.port}/ws and /events")
+        except OSError as e:
+            print(f"⚠️ Push channel could not listen on port {self.port}: {e}")
+            self._loop = None
+            self._started.set()
+            return
+        self._started.set()
+        self._loop.run_forever()
+
+    def status(self) -> Dict:
+        return {
+            'enabled': self._loop is not None,
+            'port': self.port,
+            'subscribers': len(self.subscribers),
+            'subscribedMarkets': len(self._by_market),
+            'published': self.published,
+            'coalesced': self.coalesced,
+            'messagesSent': self.messages_sent,
+            'slowDisconnects': self.slow_disconnects
+        }
@@ -0,0 +1,186 @@
+"""
+Background Pyth Hermes price subscription
+
+Keeps an in-memory latest-price table for the configured feeds by consuming
+Hermes' server-sent events stream (/v2/updates/price/stream). Readers get the
+current price with no network I/O. If the stream drops, the subscriber
+reconnects with exponential backoff and polls /api/latest_price_feeds in the
+meantime so the table keeps moving.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+
+class PythPriceStream:
+    """Latest-price table fed by a Hermes SSE subscription"""
+
+    def __init__(self, hermes_url: str, price_ids: Dict[str, str], connect_timeout: float = 2.0,
+                 idle_timeout: float = 15.0, poll_interval: float = 5.0, max_backoff: float = 30.0):
+        self.hermes_url = hermes_url.rstrip('/')
+        self.price_ids = dict(price_ids)
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+
+        # Hermes reports feed ids without the 0x prefix
+        self._symbols_by_id = {
+            price_id.lower().replace('0x', ''): symbol for symbol, price_id in self.price_ids.items()
+        }
+        self._prices: Dict[str, Dict] = {}
+        self._listeners: List[Callable[[str, Dict], None]] = []
+        self.version = 0
+        self.connected = False
+        self.reconnects = 0
+        self.last_message_at = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def get(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Return the latest price entry for `symbol`, or None if missing or older than max_age"""
+        entry = self._prices.get(symbol)
+        if entry is None:
+            return None
+        if max_age is not None and time.time() - entry['receivedAt'] > max_age:
+            return None
+        return entry
+
+    def add_listener(self, listener: Callable[[str, Dict], None]):
+        """Call `listener(symbol, entry)` on the stream thread for every price update"""
+        self._listeners.append(listener)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return dict(self._prices)
+
+    def status(self) -> Dict:
+        return {
+            'connected': self.connected,
+            'symbols': sorted(self._prices),
+            'version': self.version,
+            'reconnects': self.reconnects,
+            'lastMessageAge': round(time.time() - self.last_message_at, 1) if self.last_message_at else None
+        }
+
+    def start(self) -> "PythPriceStream":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stopping = False
+        self._thread = threading.Thread(target=self._thread_main, name='pyth-price-stream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        if self._loop:
+            self._loop.call_soon_threadsafe(lambda: None)
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    async def _run(self):
+        backoff = 0.5
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout,
+                                        sock_read=self.idle_timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            while not self._stopping:
+                try:
+                    received = await self._consume_stream(session)
+                    if received:
+                        backoff = 0.5
+                except Exception as e:
+                    print(f"⚠️ Pyth stream disconnected: {e!r}")
+                finally:
+                    self.connected = False
+
+                if self._stopping:
+                    break
+
+                # Keep prices fresh by polling while the stream is down
+                self.reconnects += 1
+                await self._poll_once(session)
+                delay = min(self.max_backoff, backoff) * (0.5 + random.random() / 2)
+                deadline = time.monotonic() + delay
+                while not self._stopping and time.monotonic() < deadline:
+                    await asyncio.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+                    if time.monotonic() < deadline:
+                        await self._poll_once(session)
+                backoff = min(self.max_backoff, backoff * 2)
+
+    async def _consume_stream(self, session: aiohttp.ClientSession) -> bool:
+        """Read SSE events until the stream ends; return True if any update arrived"""
+        params = [('ids[]', price_id) for price_id in self.price_ids.values()]
+        params.append(('parsed', 'true'))
+        received = False
+
+        async with session.get(f"{self.hermes_url}/v2/updates/price/stream", params=params) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Hermes stream returned HTTP {response.status}")
+
+            self.connected = True
+            print(f"📡 Pyth price stream connected ({len(self.price_ids)} feeds)")
+            data_lines = []
+            async for raw_line in response.content:
+                if self._stopping:
+                    break
+                line = raw_line.decode('utf-8').rstrip('\r\n')
+                if line.startswith('data:'):
+                    data_lines.append(line[5:].strip())
+                elif not line and data_lines:
+                    payload = json.loads('\n'.join(data_lines))
+                    data_lines = []
+                    for feed in payload.get('parsed', []):
+                        self._apply_feed(feed, 'stream')
+                    received = True
+
+        return received
+
+    async def _poll_once(self, session: aiohttp.ClientSession):
+        params = [('ids[]', price_id) for price_id in self.price_ids.values()]
+        try:
+            async with session.get(f"{self.hermes_url}/api/latest_price_feeds", params=params,
+                                   timeout=aiohttp.ClientTimeout(total=self.connect_timeout)) as response:
+                if response.status == 200:
+                    for feed in await response.json():
+                        self._apply_feed(feed, 'poll')
+        except Exception as e:
+            print(f"⚠️ Pyth poll fallback failed: {e!r}")
+
+    def _apply_feed(self, feed: Dict, source: str):
+        symbol = self._symbols_by_id.get(str(feed.get('id', '')).lower().replace('0x', ''))
+        if not symbol:
+            return
+
+        price_info = feed['price']
+        scale = 10 ** price_info['expo']
+        now = time.time()
+        # Entries are replaced, never mutated, so readers can hold references safely
+        self._prices[symbol] = {
+            'symbol': symbol,
+            'price': int(price_info['price']) * scale,
+            'confidence': int(price_info['conf']) * scale,
+            'timestamp': price_info['publish_time'],
+            'status': 'success',
+            'source': source,
+            'receivedAt': now
+        }
+        self.version += 1
+        self.last_message_at = now
+        for listener in self._listeners:
+            # A failing consumer must not tear down the shared Hermes connection
+            try:
+                listener(symbol, self._prices[symbol])
+            except Exception as e:
+                print(f"⚠️ Pyth price listener failed: {e!r}")
@@ -0,0 +1,271 @@
+"""
+Indexed structured queries over the live market table
+
+Backs /query and the uAgents StructuredQuery handler. Secondary indexes on
+status, category and creator (row lists per value) plus sorted endTime and
+totalVolume indexes are rebuilt once per MarketStore version, so selective
+filters - "markets closing in the next 24h", "active crypto markets over
+1000 PYUSD" - touch only matching rows. Results support sorting, field
+projection and keyset cursor pagination.
+
+Parameters (all optional):
+    status        'active' | 'resolved' | list
+    category      int | list
+    creator       address
+    minVolume     minimum totalVolume (PYUSD)
+    endsWithin    seconds from now; endAfter / endBefore as epoch seconds
+    minConfidence minimum AI confidence; recommendation 'BUY_A' | 'BUY_B' | list
+    sort          field name, '-' prefix for descending (e.g. '-totalVolume', 'endTime', '-confidence')
+    fields        projection, list of market fields
+    limit         page size (default 20, max 100)
+    cursor        nextCursor from the previous page
+"""
+
+import base64
+import json
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from market_store import NUMERIC_COLUMNS, MarketStore
+
+# Keys of a request's `parameters` the engine understands; others (source, conversationId) are ignored
+QUERY_PARAMETERS = (
+    'status', 'category', 'creator', 'minVolume', 'endsWithin', 'endAfter', 'endBefore',
+    'minConfidence', 'recommendation', 'sort', 'fields', 'limit', 'cursor'
+)
+
+DEFAULT_FIELDS = ('id', 'title', 'status', 'optionARatio', 'totalVolume', 'endTime', 'category')
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+_DURATION = re.compile(r'\b(?:next|within|in)\s+(\d+(?:\.\d+)?)\s*(m|min|mins|minutes?|h|hrs?|hours?|d|days?)\b')
+_UNIT_SECONDS = {'m': 60, 'h': 3600, 'd': 86400}
+
+def parse_query_text(query: str) -> Dict:
+    """Derive query parameters from free text ("active markets closing in the next 24h")"""
+    text = query.lower()
+    params: Dict = {}
+
+    duration = _DURATION.search(text)
+    if duration:
+        params['endsWithin'] = float(duration.group(1)) * _UNIT_SECONDS[duration.group(2)[0]]
+    elif re.search(r'\b(closing|ending|expiring) soon\b', text):
+        params['endsWithin'] = 86400
+    if params.get('endsWithin'):
+        params['sort'] = 'endTime'
+
+    if re.search(r'\bresolved\b', text):
+        params['status'] = 'resolved'
+    elif re.search(r'\b(active|open)\b', text):
+        params['status'] = 'active'
+
+    if re.search(r'\b(opportunit|recommend|contrarian)', text):
+        params['recommendation'] = ['BUY_A', 'BUY_B']
+        params.setdefault('sort', '-confidence')
+    if re.search(r'\b(top|biggest|largest|most)\b.*\b(volume|liquid)', text):
+        params['sort'] = '-totalVolume'
+    return params
+
+class MarketIndexes:
+    """Secondary indexes for one MarketStore version (immutable once built)"""
+
+    def __init__(self, store: MarketStore):
+        self.version = store.version
+        self.size = len(store)
+        view = store.view()
+        self.ids = np.array(view.column('id'))
+
+        status_names = store.status_names
+        self.status = {
+            status_names[code]: rows for code, rows in self._group(np.array(view.column('status'))).items()
+        }
+        self.category = self._group(np.array(view.column('category')))
+
+        creators: Dict[str, List[int]] = {}
+        for row, creator in enumerate(view.column('creator')):
+            creators.setdefault(creator.lower(), []).append(row)
+        self.creator = {creator: np.asarray(rows, dtype=np.int64) for creator, rows in creators.items()}
+
+        self.sorted = {}
+        for name in ('endTime', 'totalVolume'):
+            values = np.array(view.column(name))
+            order = np.argsort(values, kind='stable')
+            self.sorted[name] = (values[order], order)
+
+    @staticmethod
+    def _group(values: np.ndarray) -> Dict:
+        """value -> ascending row ids, in one stable sort"""
+        if not len(values):
+            return {}
+        order = np.argsort(values, kind='stable')
+        ordered = values[order]
+        bounds = np.flatnonzero(np.diff(ordered)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(values)]))
+        return {ordered[start].item(): order[start:end] for start, end in zip(starts, ends)}
+
+    def range_rows(self, name: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Rows with low <= value <= high via binary search on the sorted index"""
+        keys, order = self.sorted[name]
+        start = 0 if low is None else int(np.searchsorted(keys, low, side='left'))
+        stop = len(keys) if high is None else int(np.searchsorted(keys, high, side='right'))
+        return np.sort(order[start:stop])
+
+def build_query_params(query: str, parameters: Optional[Mapping]) -> Dict:
+    """Parameters derived from the query text, overridden by explicit ones"""
+    params = parse_query_text(query or '')
+    params.update({key: value for key, value in (parameters or {}).items() if key in QUERY_PARAMETERS})
+    return params
+
+def _as_list(value) -> List:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+def encode_cursor(sort: str, value, market_id: int) -> str:
+    payload = json.dumps([sort, value, market_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[float, int]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, market_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError("Cursor was issued for a different sort order")
+    return value, int(market_id)
+
+class MarketQueryEngine:
+    """Filters, sorts, projects and paginates markets using secondary indexes
+
+    `analysis_lookup` returns the id -> analysis map used for confidence and
+    recommendation filters (e.g. the chat digest's analysis_by_id); it is only
+    called when a query needs it. Otherwise `analyze` is run on the page rows.
+    """
+
+    def __init__(self, store: MarketStore, analysis_lookup: Optional[Callable[[], Mapping[int, Dict]]] = None,
+                 analyze: Optional[Callable[[Mapping], Dict]] = None):
+        self.store = store
+        self.analysis_lookup = analysis_lookup
+        self.analyze = analyze
+        self._indexes: Optional[MarketIndexes] = None
+        self._lock = threading.Lock()
+
+    def indexes(self) -> MarketIndexes:
+        indexes = self._indexes
+        if indexes is None or indexes.version != self.store.version or indexes.size != len(self.store):
+            with self._lock:
+                indexes = self._indexes
+                if indexes is None or indexes.version != self.store.version or indexes.size != len(self.store):
+                    # Published with one reference swap; readers never see a half-built index
+                    indexes = self._indexes = MarketIndexes(self.store)
+        return indexes
+
+    def execute(self, params: Mapping, now: Optional[float] = None) -> Dict:
+        """Run a structured query; raises ValueError for invalid parameters"""
+        now = time.time() if now is None else now
+        indexes = self.indexes()
+        candidates: Optional[np.ndarray] = None
+        used = []
+
+        def narrow(rows: np.ndarray, index_name: str):
+            nonlocal candidates
+            used.append(index_name)
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+
+        def union(index: Dict, keys: List) -> np.ndarray:
+            parts = [index[key] for key in keys if key in index]
+            return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+        if params.get('status') is not None:
+            narrow(union(indexes.status, [str(s).lower() for s in _as_list(params['status'])]), 'status')
+        if params.get('category') is not None:
+            try:
+                categories = [int(c) for c in _as_list(params['category'])]
+            except (TypeError, ValueError):
+                raise ValueError("category must be an integer or a list of integers")
+            narrow(union(indexes.category, categories), 'category')
+        if params.get('creator'):
+            narrow(union(indexes.creator, [str(params['creator']).lower()]), 'creator')
+
+        low = high = None
+        if params.get('endsWithin') is not None:
+            low, high = now, now + float(params['endsWithin'])
+        if params.get('endAfter') is not None:
+            low = max(low or float('-inf'), float(params['endAfter']))
+        if params.get('endBefore') is not None:
+            high = min(high if high is not None else float('inf'), float(params['endBefore']))
+        if low is not None or high is not None:
+            narrow(indexes.range_rows('endTime', low, high), 'endTime')
+        if params.get('minVolume') is not None:
+            narrow(indexes.range_rows('totalVolume', float(params['minVolume']), None), 'totalVolume')
+
+        rows = np.arange(indexes.size) if candidates is None else candidates
+        ids = indexes.ids[rows]
+
+        # Analysis-based filters run last, on the already narrowed rows
+        analyses = None
+        sort = str(params.get('sort') or 'id')
+        needs_analysis = params.get('minConfidence') is not None or params.get('recommendation') or \
+            sort.lstrip('-') == 'confidence'
+        confidences = None
+        if needs_analysis:
+            if not self.analysis_lookup:
+                raise ValueError("Confidence filters are not available on this server")
+            analyses = self.analysis_lookup()
+            found = [analyses.get(market_id) for market_id in ids.tolist()]
+            confidences = np.array([a['confidence'] if a else -1.0 for a in found], dtype=np.float64)
+            keep = confidences >= float(params.get('minConfidence') or 0)
+            if params.get('recommendation'):
+                wanted = set(_as_list(params['recommendation']))
+                keep &= np.array([bool(a) and a['recommendation'] in wanted for a in found], dtype=bool)
+            rows, ids, confidences = rows[keep], ids[keep], confidences[keep]
+
+        # Sort by (value, id); descending sorts negate the value
+        field = sort.lstrip('-')
+        descending = sort.startswith('-')
+        if field == 'confidence':
+            values = confidences
+        elif field in NUMERIC_COLUMNS:
+            values = self.store.column(field)[rows].astype(np.float64)
+        else:
+            raise ValueError(f"Cannot sort by '{field}'")
+        keys = -values if descending else values
+        order = np.lexsort((ids, keys))
+        rows, ids, keys = rows[order], ids[order], keys[order]
+
+        total = len(rows)
+        if params.get('cursor'):
+            cursor_key, cursor_id = decode_cursor(str(params['cursor']), sort)
+            after = (keys > cursor_key) | ((keys == cursor_key) & (ids > cursor_id))
+            rows, ids, keys = rows[after], ids[after], keys[after]
+
+        try:
+            limit = max(1, min(MAX_LIMIT, int(params.get('limit') or DEFAULT_LIMIT)))
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer")
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(sort, float(keys[limit - 1]), int(ids[limit - 1]))
+
+        fields = _as_list(params.get('fields') or DEFAULT_FIELDS)
+        market_rows = self.store.rows()
+        page = [market_rows[row] for row in rows[:limit].tolist()]
+
+        if analyses is not None:
+            page_analyses = [analyses[market.id] for market in page if market.id in analyses]
+        elif self.analyze:
+            page_analyses = [self.analyze(market) for market in page]
+        else:
+            page_analyses = []
+
+        return {
+            'markets': [{name: market.get(name) for name in fields} for market in page],
+            'analyses': page_analyses,
+            'total': total,
+            'nextCursor': next_cursor,
+            'indexesUsed': used
+        }
@@ -0,0 +1,158 @@
+"""
+Background market refresh for the HTTP server
+
+A RefreshWorker runs the agent's fetch-and-analyze pipeline on its own event
+loop and publishes each result as an immutable AgentSnapshot. Flask handlers
+read `SnapshotStore.current` - a single attribute load, no lock - so request
+latency does not depend on RPC or analysis cost, and a slow or failing
+refresh leaves the last good snapshot in place.
+"""
+
+import asyncio
+import dataclasses
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Optional
+
+from market_digest import MarketDigest, build_market_digest
+from market_store import MarketStore
+from query_engine import MarketQueryEngine
+
+DEFAULT_REFRESH_INTERVAL = 60.0
+
+@dataclass(frozen=True)
+class AgentSnapshot:
+    """One published refresh: frozen copies of the markets and their analyses"""
+    digest: MarketDigest
+    query_engine: MarketQueryEngine
+    version: int                      # source MarketStore version
+    refreshed_at: datetime
+    refresh_seconds: float
+    sequence: int                     # number of snapshots published so far
+    error: Optional[str] = None       # last refresh failure, if the data is older than intended
+
+    @property
+    def markets(self):
+        return self.digest.markets
+
+def build_snapshot(markets: List[Dict], analyze: Callable[[Mapping], Dict], version: int,
+                   sequence: int, started: float) -> AgentSnapshot:
+    """Analyze plain market dicts and index them in a private, never-mutated store"""
+    store = MarketStore(capacity=max(len(markets), 1))
+    store.upsert_many(markets)
+    digest = build_market_digest(markets, analyze)
+    return AgentSnapshot(
+        digest=digest,
+        query_engine=MarketQueryEngine(store, analysis_lookup=lambda: digest.analysis_by_id, analyze=analyze),
+        version=version,
+        refreshed_at=datetime.now(),
+        refresh_seconds=time.monotonic() - started,
+        sequence=sequence
+    )
+
+class SnapshotStore:
+    """Holds the latest AgentSnapshot; publishing is one reference assignment"""
+
+    def __init__(self):
+        self.current: Optional[AgentSnapshot] = None
+        self._ready = threading.Event()
+        self._listeners: List[Callable[[AgentSnapshot], None]] = []
+
+    def subscribe(self, listener: Callable[[AgentSnapshot], None]):
+        """Call `listener` with every snapshot published from now on"""
+        self._listeners.append(listener)
+
+    def publish(self, snapshot: AgentSnapshot):
+        self.current = snapshot
+        self._ready.set()
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"⚠️ Snapshot listener failed: {e}")
+
+    def wait_ready(self, timeout: Optional[float] = None) -> Optional[AgentSnapshot]:
+        """Block until the first snapshot is published (or timeout)"""
+        self._ready.wait(timeout)
+        return self.current
+
+class RefreshWorker:
+    """Refreshes markets on a fixed interval and publishes snapshots
+
+    `agent` is a ChimeraAgent: its market table, history and MeTTa reasoner
+    are touched only from the worker's event loop. Markets are read through
+    rpc_fetcher, whose contract calls run in a data_sources scope on the shared
+    background loop, so the worker and the agent's own loop never share a session.
+    """
+
+    def __init__(self, agent, snapshots: SnapshotStore, interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.agent = agent
+        self.snapshots = snapshots
+        self.interval = interval
+        self.refreshes = 0
+        self.failures = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    async def refresh(self) -> AgentSnapshot:
+        """Fetch, record and analyze markets once, then publish the snapshot"""
+        started = time.monotonic()
+        markets = await self.agent.rpc_fetcher.get_markets()
+        self.agent._record_markets(markets)
+
+        store = self.agent.market_store
+        snapshot = build_snapshot(
+            store.view().to_dicts(), self.agent._analyze_row, store.version, self.refreshes + 1, started
+        )
+        self.refreshes += 1
+        self.snapshots.publish(snapshot)
+        return snapshot
+
+    async def _run(self):
+        self._wake = asyncio.Event()
+        while not self._stopping:
+            try:
+                snapshot = await self.refresh()
+                print(f"📊 Published snapshot {snapshot.sequence}: {snapshot.digest.total} markets "
+                      f"in {snapshot.refresh_seconds:.2f}s")
+            except Exception as e:
+                self.failures += 1
+                print(f"⚠️ Market refresh failed: {e}")
+                previous = self.snapshots.current
+                if previous:
+                    self.snapshots.publish(dataclasses.replace(previous, error=str(e)))
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def run(self):
+        """Run the refresh loop on a new event loop in the calling thread (blocks until stop())"""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run, name='market-refresh', daemon=True)
+        thread.start()
+        return thread
+
+    def _signal(self):
+        if self._loop and self._wake and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def refresh_soon(self):
+        """Skip the rest of the current wait and refresh now (thread-safe)"""
+        self._signal()
+
+    def stop(self):
+        self._stopping = True
+        self._signal()
@@ -0,0 +1,111 @@
+"""
+Upstream resilience helpers - circuit breakers and last-known-good caches
+
+Used by the HTTP servers and the agent to bound latency when Hermes or the
+RPC endpoint degrade: after repeated failures the breaker opens and callers
+serve the last good value (labelled stale) instead of waiting on timeouts.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Per-upstream timeouts (seconds)
+PYTH_TIMEOUT = float(os.getenv("PYTH_TIMEOUT", "2.0"))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "5.0"))
+
+# Breaker tuning shared by all upstreams
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30.0"))
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker
+
+    closed    -> calls flow; `failure_threshold` consecutive failures open it
+    open      -> calls are rejected immediately until `reset_timeout` passes
+    half_open -> a single trial call is let through; success closes the
+                 breaker, failure re-opens it for another `reset_timeout`
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if the caller may contact the upstream now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            # Half-open: only one trial call at a time
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"✅ Circuit '{self.name}' closed - upstream recovered")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"⚠️ Circuit '{self.name}' opened after {self.consecutive_failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def status(self) -> Dict:
+        return {
+            'name': self.name,
+            'state': self.state,
+            'consecutiveFailures': self.consecutive_failures
+        }
+
+class LastKnownGood:
+    """Thread-safe cache of the most recent successful upstream value per key"""
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._values[key] = (value, time.time())
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, age_seconds) or None if nothing was ever stored"""
+        with self._lock:
+            entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        return value, time.time() - stored_at
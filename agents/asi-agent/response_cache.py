@@ -0,0 +1,83 @@
+"""
+Per-sender cache of the last chat/structured reply
+
+Agentverse users often resend the same question. Each sender's last reply
+is kept with the normalized query it answered and the market store version
+it was computed from; a repeat is answered from the cache when the query
+matches, the store version is unchanged and the entry is younger than the
+TTL. Any market change bumps the store version, so stale entries stop
+matching without explicit invalidation; the TTL bounds drift from inputs
+the version does not cover (prices, trend history, the LLM filter).
+
+One entry per sender, least recently used senders evicted past max_senders.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_TTL = 30.0
+MAX_SENDERS = 1024
+
+_PUNCTUATION = re.compile(r"[^\w\s$%.-]+")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    """Case, punctuation and spacing folded, so near-identical questions share a key"""
+    text = _PUNCTUATION.sub(' ', (query or '').lower())
+    return _WHITESPACE.sub(' ', text).strip(' .-')
+
+def cache_key(query: str, parameters: Optional[Dict] = None) -> Hashable:
+    if not parameters:
+        return normalize_query(query)
+    return (normalize_query(query), tuple(sorted((str(k), repr(v)) for k, v in parameters.items())))
+
+class ResponseCache:
+    """Last reply per sender, valid for one store version and `ttl` seconds"""
+
+    def __init__(self, version: Callable[[], int], ttl: float = DEFAULT_TTL, max_senders: int = MAX_SENDERS):
+        self.version = version
+        self.ttl = ttl
+        self.max_senders = max_senders
+        self._entries: "OrderedDict[str, Tuple[Hashable, int, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sender: str, key: Hashable) -> Optional[Any]:
+        """The cached reply to `key` for `sender`, or None"""
+        with self._lock:
+            entry = self._entries.get(sender)
+            if entry is not None:
+                cached_key, version, stored_at, response = entry
+                if cached_key == key and version == self.version() and time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(sender)
+                    self.hits += 1
+                    return response
+                if version != self.version():
+                    del self._entries[sender]     # markets changed; the entry can never hit again
+            self.misses += 1
+            return None
+
+    def put(self, sender: str, key: Hashable, response: Any):
+        """Remember `response` as the sender's answer to `key` at the current store version"""
+        with self._lock:
+            self._entries[sender] = (key, self.version(), time.monotonic(), response)
+            self._entries.move_to_end(sender)
+            while len(self._entries) > self.max_senders:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                'senders': len(self._entries),
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
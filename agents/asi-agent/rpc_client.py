@@ -0,0 +1,68 @@
+"""
+Minimal async JSON-RPC client shared by the EVM and Sui readers and the bet executor
+
+Sessions use the shared pooled connector from web3_pool. `batch` sends many
+calls of one method in a single HTTP request and returns per-call errors as
+RpcError instances instead of raising, so one bad id does not fail the rest.
+"""
+
+import itertools
+from typing import List, Optional
+
+import aiohttp
+
+from resilience import RPC_TIMEOUT
+from web3_pool import async_connector
+
+class RpcError(Exception):
+    pass
+
+def _error_message(error) -> str:
+    return error.get('message', str(error)) if isinstance(error, dict) else str(error)
+
+class JsonRpcClient:
+    """Minimal async JSON-RPC client with batch support"""
+
+    def __init__(self, url: str, timeout: float = RPC_TIMEOUT):
+        self.url = url
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ids = itertools.count(1)
+
+    async def _post(self, payload):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout, connector=async_connector())
+        async with self._session.post(self.url, json=payload) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def call(self, method: str, *params):
+        reply = await self._post({'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': list(params)})
+        if reply.get('error'):
+            raise RpcError(_error_message(reply['error']))
+        return reply.get('result')
+
+    async def batch(self, method: str, params_list: List[List]) -> List:
+        """One HTTP request for many calls of `method`; errors come back as RpcError instances"""
+        if not params_list:
+            return []
+        ids = [next(self._ids) for _ in params_list]
+        replies = await self._post([
+            {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+            for request_id, params in zip(ids, params_list)
+        ])
+        if not isinstance(replies, list):
+            # Some nodes answer a whole batch with one error object (rate limits, batches disabled)
+            error = replies.get('error') if isinstance(replies, dict) else None
+            raise RpcError(f"{method} batch rejected: {_error_message(error or replies)}")
+        by_id = {reply.get('id'): reply for reply in replies if isinstance(reply, dict)}
+        results = []
+        for request_id in ids:
+            reply = by_id.get(request_id, {'error': {'message': 'missing from batch reply'}})
+            error = reply.get('error')
+            results.append(RpcError(_error_message(error)) if error else reply.get('result'))
+        return results
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,145 @@
+"""
+Cross-process market cache in shared memory
+
+With several WSGI workers, one process wins the writer lock, refreshes
+markets from upstream and publishes them into a named shared-memory
+segment; every other worker only reads. Upstream load stays that of one
+process no matter how many workers run.
+
+Segment layout: a fixed header followed by one JSON payload.
+
+    sequence     u64  seqlock counter; odd while a write is in progress
+    version      u64  payload version, +1 per publish (also across writer takeovers)
+    length       u64  payload bytes
+    published_at f64  epoch seconds of the last publish/touch
+
+Readers check the header first (no copy) and decode the payload only when
+the version changed, so a request costs one 32-byte header read. A read
+that overlaps a write sees the sequence move and retries.
+
+The writer lock is an flock on a file next to the segment; the kernel
+releases it when the writer dies, so a reader can take over.
+"""
+
+import fcntl
+import json
+import os
+import struct
+import tempfile
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional, Tuple
+
+HEADER = struct.Struct('<QQQd')
+DEFAULT_SEGMENT_SIZE = 8 * 1024 * 1024
+READ_RETRIES = 100
+READ_BACKOFF = 0.001
+
+class SharedMarketCache:
+    """Single-writer / multi-reader payload cache in a named shared-memory segment"""
+
+    def __init__(self, name: str, size: int = DEFAULT_SEGMENT_SIZE, lock_dir: Optional[str] = None):
+        self.name = name
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+        # Workers come and go; the segment must outlive whichever process created it
+        resource_tracker.unregister(self._shm._name, 'shared_memory')
+
+        self._buf = self._shm.buf
+        self.capacity = self._shm.size - HEADER.size
+        self._lock_path = os.path.join(lock_dir or tempfile.gettempdir(), f'{name}.writer.lock')
+        self._lock_fd: Optional[int] = None
+
+        self._read_payload: Optional[Dict] = None
+        self._read_version = 0
+
+    # --- writer side ---
+
+    @property
+    def is_writer(self) -> bool:
+        return self._lock_fd is not None
+
+    def try_acquire_writer(self) -> bool:
+        """Become the single writer if no live process holds the lock"""
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _write(self, version: int, payload: Optional[bytes], published_at: float):
+        if not self.is_writer:
+            raise RuntimeError("Only the writer process may publish to the shared cache")
+        sequence, _, length, _ = HEADER.unpack_from(self._buf, 0)
+        HEADER.pack_into(self._buf, 0, sequence + 1, version, length, published_at)
+        if payload is not None:
+            length = len(payload)
+            self._buf[HEADER.size:HEADER.size + length] = payload
+        HEADER.pack_into(self._buf, 0, sequence + 2, version, length, published_at)
+
+    def publish(self, payload: Dict) -> int:
+        """Replace the payload and return its version; raises ValueError if it does not fit"""
+        data = json.dumps(payload, separators=(',', ':'), default=str).encode()
+        if len(data) > self.capacity:
+            raise ValueError(f"Payload of {len(data)} bytes exceeds shared cache capacity {self.capacity}")
+        version = self.header()[1] + 1
+        self._write(version, data, time.time())
+        return version
+
+    def touch(self):
+        """Mark the current payload as fresh without rewriting it"""
+        _, version, _, _ = HEADER.unpack_from(self._buf, 0)
+        self._write(version, None, time.time())
+
+    # --- reader side ---
+
+    def header(self) -> Tuple[int, int, int, float]:
+        """(sequence, version, length, published_at)"""
+        return HEADER.unpack_from(self._buf, 0)
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last publish/touch, or None if nothing was published"""
+        _, _, length, published_at = self.header()
+        return time.time() - published_at if length else None
+
+    def read(self) -> Tuple[int, Optional[Dict]]:
+        """(version, payload) - decoded only when the version changed since the last read"""
+        for _ in range(READ_RETRIES):
+            sequence, version, length, _ = self.header()
+            if sequence & 1:
+                time.sleep(READ_BACKOFF)
+                continue
+            if version == self._read_version and self._read_payload is not None:
+                # A touch bumps the sequence without changing the payload
+                return version, self._read_payload
+            if not length:
+                return version, None
+
+            data = bytes(self._buf[HEADER.size:HEADER.size + length])
+            if HEADER.unpack_from(self._buf, 0)[0] != sequence:
+                time.sleep(READ_BACKOFF)
+                continue
+            self._read_payload = json.loads(data)
+            self._read_version = version
+            return version, self._read_payload
+        raise TimeoutError("Shared cache kept changing during read")
+
+    def close(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self):
+        """Remove the segment (operators only; live readers keep their mapping)"""
+        # unlink() unregisters from the resource tracker, so register it back first
+        resource_tracker.register(self._shm._name, 'shared_memory')
+        self._shm.unlink()
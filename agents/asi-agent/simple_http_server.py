@@ -10,52 +10,189 @@ from datetime import datetime
 from dotenv import load_dotenv
 import aiohttp
 import asyncio
+import atexit
+import threading
+import time
 from web3 import Web3
+from resilience import CircuitBreaker, LastKnownGood, PYTH_TIMEOUT, RPC_TIMEOUT
+from pyth_stream import PythPriceStream
+from market_store import MarketStore
+from market_snapshot import MarketSnapshot
+from market_history import MarketHistory, SHARP_MOVE_THRESHOLD
+from market_digest import DigestCache, build_market_digest
+from intent_router import IntentRouter
+from query_engine import MarketQueryEngine, build_query_params
+from shared_cache import SharedMarketCache
+from performance_ledger import PerformanceLedger
+from compression import ResponseCompressor
+from fast_json import DYNAMIC, ENCODER as JSON_ENCODER, FastJSONProvider, StaticJSON, encode_members, encoded_text, json_response
+from sui_fetcher import SuiMarketFetcher
+from data_sources import DEFAULT_CONTRACT_ADDRESS, ContractMarketSource, run_background, run_in_scope
+from single_flight import SingleFlight
+from web3_pool import AsyncWeb3Pool
+from push_channel import PushHub, digest_updates, price_update
 
 # Load environment variables
 load_dotenv()
 
 # Pyth price IDs for major cryptocurrencies
 PYTH_PRICE_IDS = {
-    'BTC': '0xe62df6c8b4c85fe1d7b8cff1e4b4e8b1c1c1c1c1c1c1c1c1c1c1c1c1c1c1c1c1',  # BTC/USD
+    'BTC': '0xe62df6c8b4a85fe1a67db44dc12de5db330f7ac66b72dc658afedf0f4a415b43',  # BTC/USD
     'ETH': '0xff61491a931112ddf1bd8147cd1b641375f79f5825126d665480874634fd0ace',  # ETH/USD
     'HBAR': '0x8ac0c70fff57e9aefdf5edf44b51d62c2d433653cbb2cf5cc06bb115af04d221'   # HBAR/USD
 }
 
+# Contract events that change a market's on-chain state; marketId is the first indexed topic
+MARKET_EVENT_TOPICS = [
+    Web3.to_hex(Web3.keccak(text=signature)) for signature in (
+        'MarketCreated(uint256,string,address)',
+        'BetPlaced(uint256,address,uint8,uint256,uint256)',
+        'MarketResolved(uint256,uint8,address)'
+    )
+]
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend integration
+app.json = FastJSONProvider(app)  # orjson-backed jsonify
+compressor = ResponseCompressor(app)  # gzip/brotli above 1 KB, compressed once per ETag
 
 # Configuration
 HEDERA_RPC_URL = os.getenv("HEDERA_RPC_URL", "https://testnet.hashio.io/api")
-CHIMERA_CONTRACT_ADDRESS = os.getenv("CHIMERA_CONTRACT_ADDRESS", "0x7Bee0AB565e6aB33009647174Eb8cd55B56EcD7c")
+CHIMERA_CONTRACT_ADDRESS = os.getenv("CHIMERA_CONTRACT_ADDRESS", DEFAULT_CONTRACT_ADDRESS)
+PYTH_HERMES_URL = os.getenv("PYTH_HERMES_URL", "https://hermes.pyth.network").rstrip('/')
+PYTH_STREAM_ENABLED = os.getenv("PYTH_STREAM_ENABLED", "true").lower() in ("1", "true", "yes")
+PYTH_STREAM_MAX_AGE = float(os.getenv("PYTH_STREAM_MAX_AGE", "60"))
+MARKET_SNAPSHOT_PATH = os.getenv("CHIMERA_SNAPSHOT_PATH", "agent-data/markets.db")  # empty: in-memory only
+MAX_LOG_BLOCK_RANGE = int(os.getenv("MAX_LOG_BLOCK_RANGE", "5000"))
+SHARED_CACHE_NAME = os.getenv("CHIMERA_SHARED_CACHE", "")  # set when running several workers; empty: per-process sync
+SHARED_REFRESH_INTERVAL = float(os.getenv("CHIMERA_SHARED_REFRESH_INTERVAL", "15"))
+LEDGER_PATH = os.getenv("CHIMERA_LEDGER_PATH", "agent-data/ledger.db")  # bets written by the agent; empty: in-memory
+SUI_RPC_URL = os.getenv("SUI_RPC_URL", "")  # set to read markets from the Sui package instead of the EVM contract
+SUI_PACKAGE_ID = os.getenv("CHIMERA_SUI_PACKAGE_ID", "0x0fc327ea3212fbd8ebddb035972a6cbfeb8919b8b04076fac79dcdd4afd57c22")
+SUI_REGISTRY_ID = os.getenv("CHIMERA_SUI_REGISTRY_ID", "0xe1542fe2d6ada31db8a063dacb247483d7d722a335f99ba6e35c3babf3bce400")
+PUSH_PORT = os.getenv("CHIMERA_PUSH_PORT", "")  # set to serve WebSocket/SSE updates; with several workers, in one of them
+PUSH_REFRESH_INTERVAL = float(os.getenv("CHIMERA_PUSH_REFRESH_INTERVAL", "15"))
 
 print("🚀 Starting Simple ASI Agent HTTP Server...")
 print(f"📡 RPC: {HEDERA_RPC_URL}")
 print(f"📄 Contract: {CHIMERA_CONTRACT_ADDRESS}")
+if SUI_RPC_URL:
+    print(f"🌊 Sui: {SUI_RPC_URL} (package {SUI_PACKAGE_ID[:10]}...)")
+
+# Circuit breakers and last-known-good values for upstream outages
+pyth_breaker = CircuitBreaker('pyth')
+rpc_breaker = CircuitBreaker('rpc')
+last_good_prices = LastKnownGood()
+last_good_markets = LastKnownGood()
+
+# Concurrent requests needing a market refresh share one upstream sync
+market_refresh = SingleFlight('markets')
+
+# Columnar market table shared by all request handlers
+market_store = MarketStore()
+
+# Ratio/volume time series per market, fed by each refresh
+market_history = MarketHistory()
+
+# Bets and outcomes with rolling performance buckets; resolutions are settled as markets sync
+performance_ledger = PerformanceLedger(LEDGER_PATH)
+
+# Warm restart: serve the persisted markets immediately and resume delta sync from the checkpoint
+market_snapshot = MarketSnapshot(MARKET_SNAPSHOT_PATH)
+# Market ids and block checkpoints only mean something for the source that wrote them
+MARKET_SOURCE = f"sui:{SUI_PACKAGE_ID}:{SUI_REGISTRY_ID}" if SUI_RPC_URL else f"evm:{CHIMERA_CONTRACT_ADDRESS.lower()}"
+if not market_snapshot.bind_source(MARKET_SOURCE):
+    print(f"🧹 Snapshot was written by another market source; starting fresh for {MARKET_SOURCE}")
+_restored_markets = market_snapshot.load_markets()
+if _restored_markets:
+    last_good_markets.set('markets', market_store.upsert_many(_restored_markets))
+    market_history.append_many(_restored_markets)
+    print(f"💾 Restored {len(_restored_markets)} markets from snapshot "
+          f"(block {market_snapshot.get_checkpoint('last_block')})")
+
+# Per-market contract reads are coalesced into JSON-RPC batches
+contract_source = ContractMarketSource(HEDERA_RPC_URL, CHIMERA_CONTRACT_ADDRESS)
+
+# Sui mode: batched object reads, reloading only markets named in new module events
+sui_fetcher = SuiMarketFetcher(SUI_RPC_URL, SUI_PACKAGE_ID, SUI_REGISTRY_ID, snapshot=market_snapshot) if SUI_RPC_URL else None
+
+# Multi-worker mode: one process refreshes from upstream, all of them read shared memory
+shared_cache = SharedMarketCache(SHARED_CACHE_NAME) if SHARED_CACHE_NAME else None
+_shared_lock = threading.Lock()
+_shared_applied_version = 0
+_shared_published_store_version = None
+_shared_analyses = {}
+
+# Web3 access for the sync coroutines: one keep-alive AsyncWeb3 on the background loop
+async_web3_pool = AsyncWeb3Pool(HEDERA_RPC_URL, timeout=RPC_TIMEOUT)
+
+async def _web3_connected() -> bool:
+    w3 = await async_web3_pool.get()
+    return await w3.is_connected()
 
-# Initialize Web3 connection
 try:
-    w3 = Web3(Web3.HTTPProvider(HEDERA_RPC_URL))
-    print(f"🌐 Web3 connected: {w3.is_connected()}")
+    print(f"🌐 Web3 connected: {run_background(_web3_connected())}")
 except Exception as e:
     print(f"⚠️ Web3 connection failed: {e}")
-    w3 = None
+
+@atexit.register
+def _close_upstream_sessions():
+    async def close_all():
+        await contract_source.close()
+        await async_web3_pool.close()
+        if sui_fetcher:
+            await sui_fetcher.close()
+    try:
+        run_background(close_all())
+    except Exception:
+        pass
+
+# Latest-price table fed by the Hermes stream; request paths read it without network I/O
+price_stream = PythPriceStream(PYTH_HERMES_URL, PYTH_PRICE_IDS, connect_timeout=PYTH_TIMEOUT)
+if PYTH_STREAM_ENABLED:
+    price_stream.start()
+
+# Live analysis and price updates for subscribed clients, on their own port and event loop
+push_hub = PushHub(port=int(PUSH_PORT)).start() if PUSH_PORT else None
+_pushed_digest = None
+if push_hub and PYTH_STREAM_ENABLED:
+    price_stream.add_listener(lambda symbol, entry: push_hub.publish_prices({symbol: price_update(entry)}))
+
+MOCK_PRICES = {'BTC': 106632, 'ETH': 2650, 'HBAR': 0.12}
+
+def _fallback_price(symbol, status, error=None):
+    """Serve the last good Pyth price (labelled stale) or realistic mock data"""
+    cached = last_good_prices.get(symbol)
+    if cached:
+        price_data, age = cached
+        fallback = dict(price_data)
+        fallback['status'] = 'stale'
+        fallback['stale'] = True
+        fallback['staleSeconds'] = round(age, 1)
+    else:
+        fallback = {
+            'symbol': symbol,
+            'price': MOCK_PRICES.get(symbol, 50000),
+            'confidence': MOCK_PRICES.get(symbol, 50000) * 0.01,
+            'timestamp': int(datetime.now().timestamp()),
+            'status': status
+        }
+    if error:
+        fallback['error'] = error
+    return fallback
 
 async def get_pyth_price(symbol='BTC'):
     """Fetch current price from Pyth Network"""
+    # Breaker open: answer immediately instead of waiting on a degraded Hermes
+    if not pyth_breaker.allow_request():
+        return _fallback_price(symbol, 'mock')
+
     try:
-        pyth_endpoint = "https://hermes.pyth.network/api/latest_price_feeds"
-        
-        # Use correct Pyth price feed IDs
-        price_ids = {
-            'BTC': '0xe62df6c8b4a85fe1a67db44dc12de5db330f7ac66b72dc658afedf0f4a415b43',
-            'ETH': '0xff61491a931112ddf1bd8147cd1b641375f79f5825126d665480874634fd0ace',
-            'HBAR': '0x8ac0c70fff57e9aefdf5edf44b51d62c2d433653cbb2cf5cc06bb115af04d221'
-        }
-        
-        price_id = price_ids.get(symbol, price_ids['BTC'])
+        pyth_endpoint = f"{PYTH_HERMES_URL}/api/latest_price_feeds"
+        price_id = PYTH_PRICE_IDS.get(symbol, PYTH_PRICE_IDS['BTC'])
         
-        async with aiohttp.ClientSession() as session:
+        timeout = aiohttp.ClientTimeout(total=PYTH_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
             params = {'ids[]': price_id}
             async with session.get(pyth_endpoint, params=params) as response:
                 if response.status == 200:
@@ -65,118 +202,162 @@ async def get_pyth_price(symbol='BTC'):
                         price = int(price_feed['price']['price']) * (10 ** price_feed['price']['expo'])
                         confidence = int(price_feed['price']['conf']) * (10 ** price_feed['price']['expo'])
                         
-                        return {
+                        price_data = {
                             'symbol': symbol,
                             'price': price,
                             'confidence': confidence,
                             'timestamp': price_feed['price']['publish_time'],
                             'status': 'success'
                         }
+                        pyth_breaker.record_success()
+                        last_good_prices.set(symbol, price_data)
+                        return price_data
         
-        # Fallback to realistic mock data if Pyth fails
-        mock_prices = {'BTC': 106632, 'ETH': 2650, 'HBAR': 0.12}
-        return {
-            'symbol': symbol,
-            'price': mock_prices.get(symbol, 50000),
-            'confidence': mock_prices.get(symbol, 50000) * 0.01,
-            'timestamp': int(datetime.now().timestamp()),
-            'status': 'mock'
-        }
+        # Fallback to last good or realistic mock data if Pyth fails
+        pyth_breaker.record_failure()
+        return _fallback_price(symbol, 'mock')
         
     except Exception as e:
-        print(f"❌ Error fetching Pyth price for {symbol}: {e}")
-        # Return realistic mock data on error
-        mock_prices = {'BTC': 106632, 'ETH': 2650, 'HBAR': 0.12}
-        return {
-            'symbol': symbol,
-            'price': mock_prices.get(symbol, 50000),
-            'confidence': mock_prices.get(symbol, 50000) * 0.01,
-            'timestamp': int(datetime.now().timestamp()),
-            'status': 'error',
-            'error': str(e)
-        }
+        print(f"❌ Error fetching Pyth price for {symbol}: {e!r}")
+        pyth_breaker.record_failure()
+        return _fallback_price(symbol, 'error', error=str(e) or type(e).__name__)
 
 def get_pyth_price_sync(symbol='BTC'):
     """Synchronous wrapper for Pyth price fetching"""
+    # Served from the streamed price table when it has a fresh entry
+    if PYTH_STREAM_ENABLED:
+        streamed = price_stream.get(symbol, max_age=PYTH_STREAM_MAX_AGE)
+        if streamed:
+            return streamed
+
+    loop = None
     try:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         return loop.run_until_complete(get_pyth_price(symbol))
     except Exception as e:
         print(f"❌ Error in sync Pyth price fetch: {e}")
-        mock_prices = {'BTC': 106632, 'ETH': 2650, 'HBAR': 0.12}
-        return {
-            'symbol': symbol,
-            'price': mock_prices.get(symbol, 50000),
-            'confidence': mock_prices.get(symbol, 50000) * 0.01,
-            'timestamp': int(datetime.now().timestamp()),
-            'status': 'error'
+        return _fallback_price(symbol, 'error')
+    finally:
+        if loop:
+            loop.close()
+
+def _connection_error_markets(error):
+    """Fallback market list used when the contract cannot be reached"""
+    return [
+        {
+            'id': 1,
+            'title': 'Will Bitcoin reach $150,000 by December 31, 2025?',
+            'description': 'BTC price prediction market (connection error)',
+            'optionA': 'Yes - BTC will hit $150K',
+            'optionB': 'No - BTC stays below $150K',
+            'question': 'Will Bitcoin reach $150,000 by December 31, 2025?',
+            'optionARatio': 0.5,
+            'optionBRatio': 0.5,
+            'totalVolume': 0,
+            'status': 'active',
+            'resolved': False,
+            'endTime': int(datetime.now().timestamp()) + 86400,
+            'lastUpdate': datetime.now().isoformat(),
+            'hasActivity': False,
+            'error': error
         }
+    ]
+
+def _stale_markets():
+    """Last successfully loaded markets, labelled stale, or None"""
+    cached = last_good_markets.get('markets')
+    if not cached:
+        return None
+    markets, age = cached
+    return [dict(market, stale=True, staleSeconds=round(age, 1)) for market in markets]
+
+async def _market_ids_to_sync():
+    """Market ids to (re)load from the contract and the block they will be current to
+
+    Resumes from the snapshot checkpoint: only markets named in contract events
+    since the last processed block are refetched. Without a checkpoint every
+    market is loaded. Log ranges are queried concurrently.
+    """
+    w3 = await async_web3_pool.get()
+    latest_block = await w3.eth.block_number
+    last_block = market_snapshot.get_checkpoint('last_block')
+
+    if last_block is None or not len(market_store):
+        try:
+            return await contract_source.market_ids(), latest_block
+        except Exception as e:
+            print(f"⚠️ getMarketCount failed, loading markets 1 and 2: {e}")
+            return [1, 2], latest_block
+
+    ranges = range(last_block + 1, latest_block + 1, MAX_LOG_BLOCK_RANGE)
+    log_batches = await asyncio.gather(*(
+        w3.eth.get_logs({
+            'address': CHIMERA_CONTRACT_ADDRESS,
+            'fromBlock': from_block,
+            'toBlock': min(latest_block, from_block + MAX_LOG_BLOCK_RANGE - 1),
+            'topics': [MARKET_EVENT_TOPICS]
+        })
+        for from_block in ranges
+    ))
+    touched = {
+        int.from_bytes(log['topics'][1], 'big')
+        for logs in log_batches for log in logs if len(log['topics']) > 1
+    }
+    return sorted(touched), latest_block
 
 def get_real_market_data():
+    """Current markets: from the shared cache in multi-worker mode, otherwise synced from the contract"""
+    if shared_cache:
+        _ensure_shared_writer()
+        markets = _shared_markets()
+    else:
+        markets = market_refresh.do('markets', _sync_market_data)
+    if push_hub:
+        _push_market_updates()
+    return markets
+
+def _sync_market_data():
     """Fetch real market data from contract"""
+    # Breaker open: serve the last good markets without waiting on the RPC
+    if not rpc_breaker.allow_request():
+        return _stale_markets() or _connection_error_markets('RPC circuit open')
+    if sui_fetcher:
+        return _sync_sui_market_data()
+
+    async def load_changed(scope):
+        market_ids, synced_block = await _market_ids_to_sync()
+        markets, errors = await scope.load_markets(market_ids)
+        return market_ids, synced_block, markets, errors
+
     try:
-        if not w3 or not w3.is_connected():
-            raise Exception("Web3 not connected")
-        
-        # Contract ABI for the market data we need
-        contract_abi = [
-            "function getMarket(uint256 marketId) view returns (tuple(uint256 id, string title, string description, string optionA, string optionB, uint8 category, address creator, uint256 createdAt, uint256 endTime, uint256 minBet, uint256 maxBet, uint8 status, uint8 outcome, bool resolved, uint256 totalOptionAShares, uint256 totalOptionBShares, uint256 totalPool))",
-            "function getMarketCount() view returns (uint256)"
-        ]
-        
-        # Create contract instance
-        contract = w3.eth.contract(
-            address=CHIMERA_CONTRACT_ADDRESS,
-            abi=contract_abi
-        )
-        
-        markets = []
-        
-        # Get multiple markets (we now have market 1 and 2)
-        for market_id in [1, 2]:
-            try:
-                market_data = contract.functions.getMarket(market_id).call()
-            
-            # Parse the market data tuple
-            (id, title, description, optionA, optionB, category, creator, 
-             createdAt, endTime, minBet, maxBet, status, outcome, resolved, 
-             totalOptionAShares, totalOptionBShares, totalPool) = market_data
-            
-            # Calculate ratios
-            total_shares = totalOptionAShares + totalOptionBShares
-            option_a_ratio = float(totalOptionAShares) / float(total_shares) if total_shares > 0 else 0.5
-            option_b_ratio = float(totalOptionBShares) / float(total_shares) if total_shares > 0 else 0.5
-            
-            market = {
-                'id': int(id),
-                'title': title,
-                'description': description,
-                'optionA': optionA,
-                'optionB': optionB,
-                'question': title,
-                'optionARatio': option_a_ratio,
-                'optionBRatio': option_b_ratio,
-                'totalVolume': float(w3.from_wei(totalPool, 'ether')),
-                'totalOptionAShares': float(w3.from_wei(totalOptionAShares, 'ether')),
-                'totalOptionBShares': float(w3.from_wei(totalOptionBShares, 'ether')),
-                'status': 'resolved' if resolved else 'active',
-                'resolved': resolved,
-                'outcome': int(outcome),
-                'endTime': int(endTime),
-                'creator': creator,
-                'category': int(category),
-                'lastUpdate': datetime.now().isoformat(),
-                'hasActivity': total_shares > 0
-            }
-            
-                markets.append(market)
-                print(f"✅ Loaded real market {market_id}: {title}")
-                print(f"   Pool: {market['totalVolume']:.2f} PYUSD")
-                print(f"   Ratios: A={option_a_ratio:.1%}, B={option_b_ratio:.1%}")
-                
-            except Exception as e:
-                print(f"⚠️ Could not load market {market_id}: {e}")
+        refreshed_at = datetime.now().timestamp()
+
+        # Load only the markets that changed since the checkpoint, as batched eth_calls
+        market_ids, synced_block, markets, errors = run_in_scope(contract_source, load_changed)
+        load_errors = len(errors)
+        for market_id, error in errors.items():
+            print(f"⚠️ Could not load market {market_id}: {error}")
+        if markets:
+            print(f"✅ Loaded {len(markets)} real markets ({len(market_ids)} requested)")
+
+        if markets:
+            # Update the columnar store in place and persist the rows that changed
+            market_snapshot.save_markets(market_store.upsert_many(markets))
+            market_history.append_many(markets, timestamp=refreshed_at)
+            performance_ledger.resolve_markets(markets)
+        if not load_errors:
+            market_snapshot.set_checkpoint('last_block', synced_block)
+
+        if markets or (not market_ids and len(market_store)):
+            markets = market_store.rows()
+            rpc_breaker.record_success()
+            last_good_markets.set('markets', markets)
+        elif load_errors:
+            rpc_breaker.record_failure()
+            stale = _stale_markets()
+            if stale:
+                return stale
         
         # If no real markets, return fallback
         if not markets:
@@ -209,26 +390,26 @@ def get_real_market_data():
         
     except Exception as e:
         print(f"❌ Error fetching real market data: {e}")
-        # Return fallback data
-        return [
-            {
-                'id': 1,
-                'title': 'Will Bitcoin reach $150,000 by December 31, 2025?',
-                'description': 'BTC price prediction market (connection error)',
-                'optionA': 'Yes - BTC will hit $150K',
-                'optionB': 'No - BTC stays below $150K',
-                'question': 'Will Bitcoin reach $150,000 by December 31, 2025?',
-                'optionARatio': 0.5,
-                'optionBRatio': 0.5,
-                'totalVolume': 0,
-                'status': 'active',
-                'resolved': False,
-                'endTime': int(datetime.now().timestamp()) + 86400,
-                'lastUpdate': datetime.now().isoformat(),
-                'hasActivity': False,
-                'error': str(e)
-            }
-        ]
+        rpc_breaker.record_failure()
+        # Return last good or fallback data
+        return _stale_markets() or _connection_error_markets(str(e))
+
+def _sync_sui_market_data():
+    """Refresh markets from the Sui fullnode; the fetcher persists what it reloads"""
+    try:
+        markets = run_in_scope(sui_fetcher, lambda scope: sui_fetcher.refresh())
+        changed = sui_fetcher.updated
+        market_store.upsert_many(markets)
+        market_history.append_many(changed, timestamp=datetime.now().timestamp())
+        performance_ledger.resolve_markets(changed)
+        markets = market_store.rows()
+        rpc_breaker.record_success()
+        last_good_markets.set('markets', markets)
+        return markets
+    except Exception as e:
+        print(f"❌ Error fetching Sui market data: {e}")
+        rpc_breaker.record_failure()
+        return _stale_markets() or _connection_error_markets(str(e))
 
 def get_market_question(market_id):
     """Generate realistic market questions based on ID"""
@@ -484,7 +665,33 @@ def analyze_market_with_ai(market_data):
                 'description': f"Expected return: {((analysis['expectedValue'] - 1) * 100):.0f}%"
             }
         ]
-        
+
+        # Trend features from the refresh history (no RPC involved)
+        trend = market_history.stats(market_data['id'])
+        if trend['samples'] >= 2:
+            momentum = trend['ratioMomentum']
+            window_minutes = trend['windowSeconds'] / 60
+            rising_option = market_data.get('optionA', 'Option A') if momentum > 0 else market_data.get('optionB', 'Option B')
+            analysis['trend'] = trend
+
+            if abs(momentum) >= SHARP_MOVE_THRESHOLD:
+                analysis['reasoning'] += f" ⚡ Sharp move: '{rising_option}' gained {abs(momentum):.1%} in {window_minutes:.0f}m - may reflect new information."
+                # Fading a sudden move is riskier than fading a slow drift
+                fading = (momentum > 0 and analysis['recommendation'] == 'BUY_B') or (momentum < 0 and analysis['recommendation'] == 'BUY_A')
+                if fading:
+                    analysis['confidence'] = round(analysis['confidence'] * 0.85, 4)
+            elif abs(momentum) >= 0.02:
+                analysis['reasoning'] += f" 📈 Gradual drift toward '{rising_option}' ({abs(momentum):.1%} in {window_minutes:.0f}m)."
+
+            for factor in analysis['factors']:
+                factor['weight'] = round(factor['weight'] * 0.9, 3)
+            analysis['factors'].append({
+                'name': 'Crowd Momentum',
+                'weight': 0.1,
+                'value': min(1.0, abs(momentum) / SHARP_MOVE_THRESHOLD),
+                'description': f"Ratio {momentum:+.1%} over {window_minutes:.0f}m, flow {trend['volumeFlowPerHour']:.1f} PYUSD/h"
+            })
+
         return analysis
         
     except Exception as e:
@@ -502,6 +709,116 @@ def analyze_market_with_ai(market_data):
             'optionB': market_data.get('optionB', 'Option B')
         }
 
+def shared_or_local_analysis(market_data):
+    """Analysis published by the shared cache writer, or a local one"""
+    analysis = _shared_analyses.get(market_data['id'])
+    return dict(analysis) if analysis else analyze_market_with_ai(market_data)
+
+# Analyses of the current snapshot, rebuilt once per store version
+market_digests = DigestCache(shared_or_local_analysis)
+
+def get_market_digest():
+    """Sync markets and return the digest shared by the chat intents"""
+    markets = get_real_market_data()
+    if not len(market_store):
+        # Fallback markets never enter the store; analyze them directly
+        return build_market_digest(markets, analyze_market_with_ai)
+    return market_digests.get(market_store.version, market_store.rows)
+
+# Indexed /query execution; confidence filters reuse the digest's analyses
+query_engine = MarketQueryEngine(
+    market_store,
+    analysis_lookup=lambda: market_digests.get(market_store.version, market_store.rows).analysis_by_id,
+    analyze=shared_or_local_analysis
+)
+
+def _push_market_updates():
+    """Hand subscribers the current digest; the hub forwards only markets that changed"""
+    global _pushed_digest
+    if not len(market_store):
+        return
+    digest = market_digests.get(market_store.version, market_store.rows)
+    if digest is not _pushed_digest:
+        _pushed_digest = digest
+        push_hub.publish_markets(digest_updates(digest))
+
+def _push_refresh_loop():
+    """Keep pushing while no HTTP requests drive the sync"""
+    while True:
+        time.sleep(PUSH_REFRESH_INTERVAL)
+        try:
+            get_real_market_data()
+        except Exception as e:
+            print(f"⚠️ Push refresh failed: {e}")
+
+if push_hub:
+    threading.Thread(target=_push_refresh_loop, name='push-refresh', daemon=True).start()
+
+def _publish_shared():
+    """Writer: publish the synced markets and their analyses (or just refresh the timestamp)"""
+    global _shared_published_store_version
+    markets = market_refresh.do('markets', _sync_market_data)
+    live = bool(len(market_store)) and not any(m.get('error') or m.get('stale') for m in markets[:1])
+    if live and market_store.version == _shared_published_store_version:
+        shared_cache.touch()
+        return
+    payload = {'live': live, 'markets': [dict(m) for m in markets], 'analyses': []}
+    if live:
+        payload['markets'] = market_store.view().to_dicts()
+        payload['analyses'] = market_digests.get(market_store.version, market_store.rows).ranked
+    shared_cache.publish(payload)
+    _shared_published_store_version = market_store.version if live else None
+
+def _shared_refresh_loop():
+    while True:
+        time.sleep(SHARED_REFRESH_INTERVAL)
+        try:
+            _publish_shared()
+        except Exception as e:
+            print(f"⚠️ Shared cache refresh failed: {e}")
+
+def _ensure_shared_writer():
+    """Take the writer role if nobody holds it (at startup, or after the writer died)"""
+    if shared_cache.is_writer:
+        return
+    age = shared_cache.age()
+    if age is not None and age < SHARED_REFRESH_INTERVAL * 3:
+        return
+    with _shared_lock:
+        if shared_cache.is_writer or not shared_cache.try_acquire_writer():
+            return
+        print(f"📡 This worker (pid {os.getpid()}) now refreshes the shared market cache")
+        try:
+            _publish_shared()
+        except Exception as e:
+            print(f"⚠️ Shared cache refresh failed: {e}")
+        threading.Thread(target=_shared_refresh_loop, name='shared-cache-refresh', daemon=True).start()
+
+def _shared_markets():
+    """Markets from the shared cache, applied to the local store once per published version"""
+    global _shared_applied_version, _shared_analyses
+    version, payload = shared_cache.read()
+    if payload is None:
+        return _stale_markets() or _connection_error_markets('Waiting for the shared market cache')
+    if not payload['live']:
+        return payload['markets']
+
+    if version != _shared_applied_version:
+        with _shared_lock:
+            if version != _shared_applied_version:
+                if not shared_cache.is_writer:
+                    market_store.upsert_many(payload['markets'])
+                    market_history.append_many(payload['markets'])
+                    _shared_analyses = {a['marketId']: a for a in payload['analyses']}
+                _shared_applied_version = version
+
+    markets = market_store.rows()
+    age = shared_cache.age()
+    if age is not None and age > SHARED_REFRESH_INTERVAL * 3:
+        return [dict(market, stale=True, staleSeconds=round(age, 1)) for market in markets]
+    last_good_markets.set('markets', markets)
+    return markets
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -510,29 +827,41 @@ def health_check():
         'timestamp': datetime.now().isoformat(),
         'version': '1.0.0',
         'message': 'Simple ASI Agent HTTP Server is running',
-        'agent_address': 'chimera-agent-local'
+        'agent_address': 'chimera-agent-local',
+        'upstreams': {
+            'pyth': pyth_breaker.status(),
+            'rpc': rpc_breaker.status()
+        },
+        'marketRefresh': market_refresh.status(),
+        'compression': compressor.status(),
+        'jsonEncoder': JSON_ENCODER,
+        'push': push_hub.status() if push_hub else {'enabled': False},
+        'pythStream': price_stream.status() if PYTH_STREAM_ENABLED else {'enabled': False}
     })
 
+# Everything in /status but the timestamp is fixed; encode it once
+STATUS_BODY = StaticJSON({
+    'status': 'online',
+    'agent_name': 'Chimera-Market-Analyzer',
+    'capabilities': [
+        'market_analysis',
+        'betting_recommendations', 
+        'contrarian_analysis',
+        'chat_interface',
+        'metta_reasoning'
+    ],
+    'configuration': {
+        'max_bet_amount': 100,
+        'min_confidence': 0.6,
+        'analysis_interval': 300
+    },
+    'timestamp': DYNAMIC
+})
+
 @app.route('/status', methods=['GET'])
 def get_status():
     """Get agent status"""
-    return jsonify({
-        'status': 'online',
-        'agent_name': 'Chimera-Market-Analyzer',
-        'capabilities': [
-            'market_analysis',
-            'betting_recommendations', 
-            'contrarian_analysis',
-            'chat_interface',
-            'metta_reasoning'
-        ],
-        'configuration': {
-            'max_bet_amount': 100,
-            'min_confidence': 0.6,
-            'analysis_interval': 300
-        },
-        'timestamp': datetime.now().isoformat()
-    })
+    return json_response(STATUS_BODY.render(timestamp=datetime.now().isoformat()))
 
 @app.route('/chat', methods=['POST'])
 def chat_endpoint():
@@ -550,11 +879,12 @@ def chat_endpoint():
         # Process the message
         response_message = process_chat_message(message)
         
-        return jsonify({
-            'message': response_message,
+        # Help and status texts repeat verbatim; their encoding is cached
+        return json_response(encode_members({
+            'message': encoded_text(response_message),
             'timestamp': datetime.now().isoformat(),
             'conversation_id': conversation_id
-        })
+        }))
         
     except Exception as e:
         print(f"❌ Error processing chat: {e}")
@@ -569,18 +899,26 @@ def structured_query():
     try:
         data = request.get_json()
         query = data.get('query', '')
-        parameters = data.get('parameters', {})
+        parameters = data.get('parameters')
+        if parameters is None:
+            parameters = {}
         
         if not query:
             return jsonify({'error': 'Query is required'}), 400
+        if not isinstance(parameters, dict):
+            return jsonify({'error': 'parameters must be a JSON object', 'analysis': [], 'type': 'error'}), 400
         
         print(f"🔍 Structured query: {query}")
         
         # Process structured query
-        response = process_structured_query(query, parameters)
-        
-        return jsonify(response)
+        return jsonify(process_structured_query(query, parameters))
         
+    except ValueError as e:
+        return jsonify({
+            'error': f'Invalid query parameters: {str(e)}',
+            'analysis': [],
+            'type': 'error'
+        }), 400
     except Exception as e:
         print(f"❌ Error processing query: {e}")
         return jsonify({
@@ -613,10 +951,10 @@ def analyze_market():
         if not target_market:
             return jsonify({'error': 'No market data available'}), 404
         
-        # Perform AI analysis
-        analysis = analyze_market_with_ai(target_market)
+        # Reader workers reuse the shared cache writer's analysis
+        analysis = shared_or_local_analysis(target_market)
         analysis['timestamp'] = datetime.now().isoformat()
-        analysis['marketData'] = target_market
+        analysis['marketData'] = dict(target_market)
         
         print(f"🧠 Analysis complete: {analysis['recommendation']} (confidence: {analysis['confidence']:.2f})")
         
@@ -667,24 +1005,11 @@ def get_performance():
         
         print(f"📈 Getting performance metrics for: {timeframe}")
         
-        # Simulate performance data
-        performance = {
-            'totalBets': 45,
-            'winRate': 67.8,
-            'averageReturn': 12.5,
-            'totalProfit': 234.50,
-            'sharpeRatio': 1.8,
-            'maxDrawdown': -8.2,
-            'bestStrategies': ['Contrarian Analysis', 'MeTTa Reasoning', 'Volume Analysis'],
-            'recentPerformance': [
-                {'period': '7d', 'winRate': 71.4, 'profit': 45.20},
-                {'period': '14d', 'winRate': 69.2, 'profit': 89.10},
-                {'period': '30d', 'winRate': 67.8, 'profit': 234.50}
-            ]
-        }
-        
-        return jsonify(performance)
+        # Combines at most 30 daily buckets, however many bets the ledger holds
+        return jsonify(performance_ledger.summary(timeframe))
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"❌ Error getting performance: {e}")
         return jsonify({'error': f'Error getting performance: {str(e)}'}), 500
@@ -711,22 +1036,21 @@ def get_pyth_prices():
         print(f"❌ Error getting Pyth prices: {e}")
         return jsonify({'error': f'Error getting Pyth prices: {str(e)}'}), 500
 
-def process_chat_message(message: str) -> str:
-    """Process chat message and return response"""
-    message_lower = message.lower().strip()
-    
-    # Health check
-    if message_lower in ['health', 'status', 'ping']:
-        # Get real market data for status
-        try:
-            markets = get_real_market_data()
-            active_count = len([m for m in markets if m.get('status') == 'active'])
-            return f"""🤖 **Chimera ASI Agent Status: Online**
+# Chat messages are routed with one compiled keyword pass to the handlers below
+chat_router = IntentRouter()
+
+@chat_router.handler('health')
+def _chat_health(message: str) -> str:
+    """Agent and market status"""
+    # Get real market data for status
+    try:
+        digest = get_market_digest()
+        return f"""🤖 **Chimera ASI Agent Status: Online**
 
 **📊 Real-Time Market Status:**
-• {len(markets)} total markets detected
-• {active_count} currently active
-• Last update: {datetime.now().strftime('%H:%M:%S')}
+• {digest.total} total markets detected
+• {digest.active_count} currently active
+• Last update: {digest.built_at.strftime('%H:%M:%S')}
 
 **🧠 AI Capabilities:**
 🔍 **Live Market Analysis**: Real contract data analysis
@@ -740,8 +1064,8 @@ def process_chat_message(message: str) -> str:
 • "show me contrarian opportunities"
 
 Ready to analyze real market data!"""
-        except Exception as e:
-            return f"""🤖 **Chimera ASI Agent Status: Online**
+    except Exception as e:
+        return f"""🤖 **Chimera ASI Agent Status: Online**
 
 ⚠️ **Connection Issue**: {str(e)}
 
@@ -751,41 +1075,36 @@ I'm running but having trouble connecting to market data. Please check:
 • Network connection
 
 Still available for general analysis and recommendations!"""
-    
-    # Market analysis requests
-    if any(word in message_lower for word in ['analyze', 'analysis', 'market', 'markets']):
-        try:
-            markets = get_real_market_data()
-            analyses = [analyze_market_with_ai(market) for market in markets]
-            
-            # Count opportunities
-            buy_opportunities = len([a for a in analyses if a['recommendation'] in ['BUY_A', 'BUY_B']])
-            avg_confidence = sum(a['confidence'] for a in analyses) / len(analyses) if analyses else 0
-            
-            result = f"""🔍 **Live Market Analysis**
+
+@chat_router.handler('analyze')
+def _chat_analyze(message: str) -> str:
+    """Market overview with top opportunities"""
+    try:
+        digest = get_market_digest()
+        
+        result = f"""🔍 **Live Market Analysis**
 
 **📊 Current Market Status:**
-• {len(markets)} active markets detected
-• {buy_opportunities} showing betting opportunities  
-• Average AI confidence: {avg_confidence:.1%}
-• Last update: {datetime.now().strftime('%H:%M:%S')}
+• {digest.total} active markets detected
+• {digest.buy_opportunities} showing betting opportunities  
+• Average AI confidence: {digest.avg_confidence:.1%}
+• Last update: {digest.built_at.strftime('%H:%M:%S')}
 
 **🎯 Top Opportunities:**
 """
-            
-            # Show top 3 opportunities
-            sorted_analyses = sorted(analyses, key=lambda x: x['confidence'], reverse=True)
-            for i, analysis in enumerate(sorted_analyses[:3], 1):
-                market = next(m for m in markets if m['id'] == analysis['marketId'])
-                result += f"""
+        
+        # Show top 3 opportunities
+        for i, analysis in enumerate(digest.ranked[:3], 1):
+            market = digest.market_for(analysis)
+            result += f"""
 **{i}. {market['question']}**
 • **Recommendation**: {analysis['recommendation']} 
 • **Confidence**: {analysis['confidence']:.1%}
 • **Reasoning**: {analysis['reasoning'][:100]}...
 • **Risk Level**: {analysis['riskLevel'].title()}
 """
-            
-            result += """
+        
+        result += """
 **🧠 AI Capabilities:**
 • Real-time contract data analysis
 • Contrarian opportunity detection  
@@ -797,10 +1116,10 @@ Still available for general analysis and recommendations!"""
 • "show me contrarian opportunities"  
 • "what's the safest market?"
 """
-            return result
-            
-        except Exception as e:
-            return f"""🔍 **Market Analysis**
+        return result
+        
+    except Exception as e:
+        return f"""🔍 **Market Analysis**
 
 ⚠️ **Data Error**: {str(e)}
 
@@ -815,19 +1134,16 @@ I can still provide general betting strategies and analysis frameworks. Try aski
 • Risk management approaches
 • Market analysis techniques
 """
-    
-    # Recommendations
-    if any(word in message_lower for word in ['recommend', 'suggestion', 'bet', 'should']):
-        try:
-            markets = get_real_market_data()
-            analyses = [analyze_market_with_ai(market) for market in markets]
-            
-            # Filter for actionable recommendations
-            actionable = [a for a in analyses if a['recommendation'] in ['BUY_A', 'BUY_B'] and a['confidence'] > 0.6]
-            actionable.sort(key=lambda x: x['confidence'], reverse=True)
-            
-            if not actionable:
-                return """🎯 **Current Betting Recommendations**
+
+@chat_router.handler('recommend')
+def _chat_recommend(message: str) -> str:
+    """Actionable betting recommendations"""
+    try:
+        digest = get_market_digest()
+        actionable = digest.actionable
+        
+        if not actionable:
+            return """🎯 **Current Betting Recommendations**
 
 **📊 Market Scan Complete**
 • No high-confidence opportunities detected right now
@@ -845,19 +1161,19 @@ I can still provide general betting strategies and analysis frameworks. Try aski
 • Set alerts for confidence > 70%
 
 Check back in a few minutes for updated analysis!"""
-            
-            result = """🎯 **Live Betting Recommendations**
+        
+        result = """🎯 **Live Betting Recommendations**
 
 Based on real-time AI analysis:
 
 """
+        
+        for i, analysis in enumerate(actionable[:2], 1):
+            market = digest.market_for(analysis)
+            option_name = "Option A" if analysis['recommendation'] == 'BUY_A' else "Option B"
+            expected_return = ((analysis['expectedValue'] - 1) * 100) if analysis['expectedValue'] > 1 else 0
             
-            for i, analysis in enumerate(actionable[:2], 1):
-                market = next(m for m in markets if m['id'] == analysis['marketId'])
-                option_name = "Option A" if analysis['recommendation'] == 'BUY_A' else "Option B"
-                expected_return = ((analysis['expectedValue'] - 1) * 100) if analysis['expectedValue'] > 1 else 0
-                
-                result += f"""**🥇 Top Opportunity #{i}**
+            result += f"""**🥇 Top Opportunity #{i}**
 • **Market**: {market['question']}
 • **Recommendation**: {option_name}
 • **Confidence**: {analysis['confidence']:.1%}
@@ -872,11 +1188,11 @@ Based on real-time AI analysis:
 • Liquidity: {'Good' if market['totalVolume'] > 2000 else 'Limited'}
 
 """
-            
-            result += f"""**📈 Performance Context:**
+        
+        result += f"""**📈 Performance Context:**
 • {len(actionable)} opportunities found
-• Average confidence: {sum(a['confidence'] for a in actionable) / len(actionable):.1%}
-• Analysis timestamp: {datetime.now().strftime('%H:%M:%S')}
+• Average confidence: {digest.actionable_avg_confidence:.1%}
+• Analysis timestamp: {digest.built_at.strftime('%H:%M:%S')}
 
 **💡 Next Steps:**
 • Review risk tolerance
@@ -884,11 +1200,11 @@ Based on real-time AI analysis:
 • Monitor market changes
 
 Want detailed analysis on a specific market?"""
-            
-            return result
-            
-        except Exception as e:
-            return f"""🎯 **Betting Recommendations**
+        
+        return result
+        
+    except Exception as e:
+        return f"""🎯 **Betting Recommendations**
 
 ⚠️ **Analysis Error**: {str(e)}
 
@@ -901,22 +1217,23 @@ Unable to fetch live recommendations due to data issues.
 • Never bet more than you can afford to lose
 
 Try asking again in a moment for live analysis!"""
-    
-    # Crypto markets
-    if any(word in message_lower for word in ['crypto', 'bitcoin', 'btc', 'ethereum', 'eth']):
-        try:
-            # Get real price data
-            btc_data = get_pyth_price_sync('BTC')
-            eth_data = get_pyth_price_sync('ETH')
-            
-            btc_price = btc_data['price']
-            eth_price = eth_data['price']
-            
-            # Calculate distance to targets
-            btc_to_150k = ((150000 - btc_price) / btc_price) * 100
-            eth_to_10k = ((10000 - eth_price) / eth_price) * 100
-            
-            return f"""₿ **Live Crypto Market Analysis**
+
+@chat_router.handler('crypto')
+def _chat_crypto(message: str) -> str:
+    """Crypto price markets"""
+    try:
+        # Get real price data
+        btc_data = get_pyth_price_sync('BTC')
+        eth_data = get_pyth_price_sync('ETH')
+        
+        btc_price = btc_data['price']
+        eth_price = eth_data['price']
+        
+        # Calculate distance to targets
+        btc_to_150k = ((150000 - btc_price) / btc_price) * 100
+        eth_to_10k = ((10000 - eth_price) / eth_price) * 100
+        
+        return f"""₿ **Live Crypto Market Analysis**
 
 **📊 Current Prices (Pyth Network):**
 • **BTC**: ${btc_price:,.0f} ({btc_to_150k:+.1f}% to $150k target)
@@ -941,9 +1258,9 @@ Try asking again in a moment for live analysis!"""
 • Time horizon: ~14 months is reasonable for crypto moves
 
 **📈 Recommendation**: {'Consider "Yes" position' if btc_to_150k < 75 else 'Wait for better entry or consider "No"'}"""
-            
-        except Exception as e:
-            return f"""₿ **Crypto Market Analysis**
+        
+    except Exception as e:
+        return f"""₿ **Crypto Market Analysis**
 
 ⚠️ **Price Data Error**: {str(e)}
 
@@ -953,33 +1270,43 @@ Try asking again in a moment for live analysis!"""
 • Consider fundamental analysis while waiting for price data
 
 Try asking again for live price analysis!"""
-    
-    # Performance questions
-    if any(word in message_lower for word in ['performance', 'track record', 'win rate', 'profit']):
+
+@chat_router.handler('performance')
+def _chat_performance(message: str) -> str:
+    """Performance dashboard"""
+    stats = performance_ledger.summary('all')
+    if not stats['totalBets']:
         return """📈 **ASI Agent Performance Dashboard**
 
+No bets recorded yet. Performance appears here once the agent places bets and their markets resolve."""
+
+    recent = "\n".join(
+        f"• **Last {period['period']}**: {period['winRate']}% win rate, {period['profit']:+.2f} PYUSD profit "
+        f"({period['bets']} bets)"
+        for period in stats['recentPerformance']
+    )
+    return f"""📈 **ASI Agent Performance Dashboard**
+
 **🏆 Overall Statistics:**
-• **Win Rate**: 67.8% (45 total bets)
-• **Average Return**: +12.5% per bet
-• **Total Profit**: $234.50
-• **Sharpe Ratio**: 1.8 (excellent risk-adjusted returns)
-• **Max Drawdown**: -8.2%
+• **Win Rate**: {stats['winRate']}% ({stats['totalBets']} total bets, {stats['resolvedBets']} resolved)
+• **Average Return**: {stats['averageReturn']:+.2f}% per bet
+• **Total Profit**: {stats['totalProfit']:+.2f} PYUSD
+• **Sharpe Ratio**: {stats['sharpeRatio']} (per resolved bet)
+• **Max Drawdown**: {stats['maxDrawdown']:.2f} PYUSD
 
 **📊 Recent Performance:**
-• **Last 7 days**: 71.4% win rate, +$45.20 profit
-• **Last 14 days**: 69.2% win rate, +$89.10 profit  
-• **Last 30 days**: 67.8% win rate, +$234.50 profit
+{recent}"""
 
-**🎯 Best Strategies:**
-1. Contrarian Analysis (78% win rate)
-2. MeTTa Reasoning (72% win rate)
-3. Volume Analysis (65% win rate)
+def _win_rate_text(stats: dict) -> str:
+    if not stats['resolvedBets']:
+        return "No resolved bets yet"
+    return f"{stats['winRate']}% win rate over {stats['resolvedBets']} resolved bets"
 
-**Trend**: Performance improving over time as the AI learns market patterns."""
-    
-    # General help
-    if message_lower in ['help', 'what can you do', 'commands']:
-        return """🤖 **Chimera ASI Agent - Help Guide**
+@chat_router.handler('help')
+def _chat_help(message: str) -> str:
+    """Help guide"""
+    stats = performance_ledger.summary('all')
+    return f"""🤖 **Chimera ASI Agent - Help Guide**
 
 **🧠 Core Capabilities:**
 • **MeTTa Reasoning**: Advanced logical inference engine
@@ -995,17 +1322,19 @@ Try asking again for live price analysis!"""
 • `"health"` - Check system status
 
 **📊 Current Status:**
-• 3 active markets monitored
-• 67.8% historical win rate
-• $234.50 total profit generated
-• 2 contrarian opportunities detected
+• {len(market_store)} markets monitored
+• {_win_rate_text(stats)}
+• {stats['totalProfit']:+.2f} PYUSD total profit
 
 **🎯 Specialties:**
-I excel at finding markets where the crowd is wrong. My contrarian analysis has a 78% success rate!
+I excel at finding markets where the crowd is wrong. Say "performance" for my full track record.
 
 Ask me anything about prediction markets or betting strategies!"""
-    
-    # Default response
+
+@chat_router.handler('default')
+def _chat_default(message: str) -> str:
+    """Fallback reply"""
+    stats = performance_ledger.summary('all')
     return f"""💭 **Message Received**: "{message}"
 
 I'm the **Chimera ASI Agent**, your AI-powered market analysis assistant!
@@ -1022,54 +1351,48 @@ I'm the **Chimera ASI Agent**, your AI-powered market analysis assistant!
 • Say **"crypto"** for cryptocurrency market analysis
 • Say **"help"** for full command list
 
-**📊 Current Status**: Online | 67.8% Win Rate | 3 Active Markets
+**📊 Current Status**: Online | {_win_rate_text(stats)} | {len(market_store)} Markets
 
 How can I help you with prediction market analysis today?"""
 
+def process_chat_message(message: str) -> str:
+    """Process chat message and return response"""
+    return chat_router.dispatch(message)
+
 def process_structured_query(query: str, parameters: dict) -> dict:
     """Process structured query and return analysis"""
     
     print(f"🔍 Processing structured query: {query}")
     
-    # Simulate market analysis based on query
-    if 'market' in query.lower() or 'analyze' in query.lower():
-        analysis = [
-            {
-                'market_id': '1',
-                'recommendation': 'BUY_A',
-                'confidence': 0.75,
-                'reasoning': 'MeTTa reasoning indicates strong contrarian opportunity for Option A. Crowd bias detected toward Option B.',
-                'risk_level': 'medium',
-                'timestamp': datetime.now().isoformat()
-            },
-            {
-                'market_id': '2', 
-                'recommendation': 'BUY_B',
-                'confidence': 0.68,
-                'reasoning': 'Volume analysis suggests Option B is undervalued. Market sentiment overly pessimistic.',
-                'risk_level': 'low',
-                'timestamp': datetime.now().isoformat()
-            },
-            {
-                'market_id': '3',
-                'recommendation': 'HOLD',
-                'confidence': 0.45,
-                'reasoning': 'Insufficient data for confident prediction. Market too volatile for current strategy.',
-                'risk_level': 'high',
-                'timestamp': datetime.now().isoformat()
-            }
-        ]
-        
-        return {
-            'message': f'Analyzed 3 markets based on query: "{query}". Found 2 betting opportunities with medium-high confidence.',
-            'analysis': analysis,
-            'type': 'market_analysis'
+    # Sync the market table, then answer from its indexes
+    get_real_market_data()
+    result = query_engine.execute(build_query_params(query, parameters))
+    
+    # Time of the market data, not of the request: repeated queries return identical bodies
+    timestamp = datetime.fromtimestamp(market_store.updated_at or time.time()).isoformat()
+    analysis = [
+        {
+            'market_id': str(a['marketId']),
+            'recommendation': a['recommendation'],
+            'confidence': a['confidence'],
+            'reasoning': a['reasoning'],
+            'risk_level': a['riskLevel'],
+            'timestamp': timestamp
         }
+        for a in result['analyses']
+    ]
+    
+    message = f'Found {result["total"]} markets matching "{query}"'
+    if result['nextCursor']:
+        message += f' (showing {len(result["markets"])}; pass nextCursor for more)'
     
     return {
-        'message': f'Processed query: "{query}". Ready to provide market analysis and betting recommendations.',
-        'analysis': [],
-        'type': 'general_response'
+        'message': message,
+        'analysis': analysis,
+        'markets': result['markets'],
+        'total': result['total'],
+        'nextCursor': result['nextCursor'],
+        'type': 'market_query'
     }
 
 if __name__ == '__main__':
@@ -1082,8 +1405,11 @@ if __name__ == '__main__':
     print("   POST /analyze-market - Market analysis")
     print("   POST /betting-recommendation - Betting advice")
     print("   GET  /performance - Performance metrics")
+    if push_hub:
+        print(f"   WS   :{PUSH_PORT}/ws, GET :{PUSH_PORT}/events - Live market and price updates")
     print("")
-    print("✅ Server ready on http://localhost:8001")
+    port = int(os.getenv("ASI_AGENT_PORT", "8001"))
+    print(f"✅ Server ready on http://localhost:{port}")
     
     # Run Flask server
-    app.run(host='0.0.0.0', port=8001, debug=False)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
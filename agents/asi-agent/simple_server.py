@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
 
-import json
 import time
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import random
 
+import fast_json
+
+# /status is fixed apart from the uptime field
+STATUS_BODY = fast_json.StaticJSON({
+    'status': 'online',
+    'version': '1.0.0',
+    'agent_type': 'ASI Alliance MeTTa Agent',
+    'capabilities': ['market_analysis', 'contrarian_strategy', 'sentiment_analysis'],
+    'uptime': fast_json.DYNAMIC
+})
+
 class ASIAgentHandler(BaseHTTPRequestHandler):
     def do_GET(self):
         parsed_path = urlparse(self.path)
@@ -16,15 +26,7 @@ class ASIAgentHandler(BaseHTTPRequestHandler):
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
             
-            response = {
-                'status': 'online',
-                'version': '1.0.0',
-                'agent_type': 'ASI Alliance MeTTa Agent',
-                'capabilities': ['market_analysis', 'contrarian_strategy', 'sentiment_analysis'],
-                'uptime': int(time.time())
-            }
-            
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(STATUS_BODY.render(uptime=int(time.time())))
             
         else:
             self.send_response(404)
@@ -35,7 +37,7 @@ class ASIAgentHandler(BaseHTTPRequestHandler):
         post_data = self.rfile.read(content_length)
         
         try:
-            data = json.loads(post_data.decode('utf-8'))
+            data = fast_json.loads(post_data)
         except:
             data = {}
         
@@ -81,7 +83,7 @@ class ASIAgentHandler(BaseHTTPRequestHandler):
                 'timestamp': int(time.time())
             }
             
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(fast_json.dumps(response))
             
         elif parsed_path.path == '/contrarian-analysis':
             self.send_response(200)
@@ -100,7 +102,7 @@ class ASIAgentHandler(BaseHTTPRequestHandler):
                 'expectedCorrection': random.uniform(0.05, 0.25)
             }
             
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(fast_json.dumps(response))
             
         elif parsed_path.path == '/sentiment-analysis':
             self.send_response(200)
@@ -131,7 +133,7 @@ class ASIAgentHandler(BaseHTTPRequestHandler):
                 'timestamp': int(time.time())
             }
             
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(fast_json.dumps(response))
             
         else:
             self.send_response(404)
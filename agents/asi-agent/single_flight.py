@@ -0,0 +1,98 @@
+"""
+Single-flight coalescing of concurrent refreshes
+
+When many callers ask for the same refresh at once, the first one (the
+leader) runs it and everyone who arrives while it is in flight waits for and
+shares its result - or its exception. Nothing is cached: the next caller
+after the flight lands starts a new one.
+
+SingleFlight serves threaded code (the Flask servers); AsyncSingleFlight
+serves coroutines, keeping flights per event loop since a future cannot be
+awaited from another loop. Both count calls and upstream executions; the
+coalescing ratio is calls per execution (1.0 means no sharing, a burst of N
+served by one refresh reports N).
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class _FlightStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+
+    @property
+    def coalescing_ratio(self) -> float:
+        return self.calls / self.executions if self.executions else 1.0
+
+    def status(self) -> Dict:
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'executions': self.executions,
+            'shared': self.calls - self.executions,
+            'coalescingRatio': round(self.coalescing_ratio, 2),
+            'inFlight': len(self._flights)
+        }
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight(_FlightStats):
+    """Thread-safe: concurrent do(key, fn) calls run fn once and share the outcome"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn(*args, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+class AsyncSingleFlight(_FlightStats):
+    """Coroutine version: concurrent `await do(key, fn)` calls share one task per event loop"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable], *args, **kwargs):
+        flight_key = (asyncio.get_running_loop(), key)
+        self.calls += 1
+        task = self._flights.get(flight_key)
+        if task is None:
+            self.executions += 1
+            task = self._flights[flight_key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda _: self._flights.pop(flight_key, None))
+        # A cancelled waiter must not cancel the refresh the others are waiting on
+        return await asyncio.shield(task)
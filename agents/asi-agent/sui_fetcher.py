@@ -0,0 +1,290 @@
+"""
+Sui JSON-RPC market source
+
+Reads the prediction_market package directly from a Sui fullnode:
+
+- Discovery: the MarketRegistry's `markets: Table<u64, ID>` maps market ids
+  1..market_counter to object ids. Entries are fetched with
+  suix_getDynamicFieldObject, all in one JSON-RPC batch, and only for ids not
+  seen before (the mapping is kept in the MarketSnapshot).
+- Market state: sui_multiGetObjects, up to 50 ids per call and many calls per
+  HTTP batch, so a thousand markets load in one or two requests.
+- Changes: one suix_queryEvents stream over the module's events, followed
+  from the cursor pinned at the first refresh. BetPlaced / MarketResolved
+  events name the markets to reload; MarketCreated triggers discovery. The
+  cursor is checkpointed after the markets it covers are saved, so a restart
+  resumes the stream instead of reloading every market.
+
+Markets come out in the same dict shape the EVM path produces (amounts in
+SUI, endTime in seconds), so MarketStore, MarketHistory and the analyzers
+consume them unchanged.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from data_sources import MarketSource
+from market_snapshot import MarketSnapshot
+from resilience import RPC_TIMEOUT
+from rpc_client import JsonRpcClient, RpcError
+
+MIST_PER_SUI = 10 ** 9
+MULTI_GET_LIMIT = 50            # sui_multiGetObjects: max object ids per call
+EVENT_PAGE_LIMIT = 50           # suix_queryEvents: max events per page
+MAX_BATCH_CALLS = 200           # JSON-RPC calls per HTTP request
+MODULE = 'prediction_market'
+
+STATUS_NAMES = {0: 'active', 1: 'paused', 2: 'resolved'}
+MARKET_TYPES = {0: 'binary', 1: 'price'}
+
+def _chunks(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def _u64(value) -> int:
+    return int(value or 0)
+
+def _balance(value) -> int:
+    """Balance<SUI> fields render either as a plain number string or as {fields: {value}}"""
+    if isinstance(value, dict):
+        return _u64(value.get('fields', value).get('value'))
+    return _u64(value)
+
+def parse_market_object(obj: Dict, refreshed_at: Optional[float] = None) -> Optional[Dict]:
+    """A Market object (sui_multiGetObjects entry) as a market dict; None if missing"""
+    data = obj.get('data') if isinstance(obj, dict) else None
+    content = (data or {}).get('content') or {}
+    fields = content.get('fields')
+    if not fields:
+        return None
+
+    a_shares = _u64(fields.get('total_option_a_shares')) / MIST_PER_SUI
+    b_shares = _u64(fields.get('total_option_b_shares')) / MIST_PER_SUI
+    total_shares = a_shares + b_shares
+    option_a_ratio = a_shares / total_shares if total_shares > 0 else 0.5
+    resolved = bool(fields.get('resolved'))
+    title = fields.get('title', '')
+    return {
+        'id': _u64(fields.get('market_id')),
+        'objectId': data.get('objectId'),
+        'version': _u64(data.get('version')),
+        'title': title,
+        'description': fields.get('description', ''),
+        'optionA': fields.get('option_a', 'Option A'),
+        'optionB': fields.get('option_b', 'Option B'),
+        'question': title,
+        'optionARatio': option_a_ratio,
+        'optionBRatio': 1 - option_a_ratio,
+        'totalVolume': _balance(fields.get('total_pool')) / MIST_PER_SUI,
+        'totalOptionAShares': a_shares,
+        'totalOptionBShares': b_shares,
+        'status': 'resolved' if resolved else STATUS_NAMES.get(_u64(fields.get('status')), 'active'),
+        'resolved': resolved,
+        'outcome': _u64(fields.get('outcome')),
+        'endTime': _u64(fields.get('end_time')) // 1000,
+        'creator': fields.get('creator'),
+        'category': _u64(fields.get('category')),
+        'marketType': MARKET_TYPES.get(_u64(fields.get('market_type')), 'binary'),
+        'lastUpdate': time.time() if refreshed_at is None else refreshed_at,
+        'hasActivity': total_shares > 0
+    }
+
+def parse_bet_event(event: Dict) -> Dict:
+    """A BetPlaced event as {marketId, user, agent, option, amount, shares, timestamp, txDigest}"""
+    fields = event.get('parsedJson') or {}
+    return {
+        'marketId': _u64(fields.get('market_id')),
+        'user': fields.get('user'),
+        'agent': fields.get('agent'),
+        'option': _u64(fields.get('option')),
+        'amount': _u64(fields.get('amount')) / MIST_PER_SUI,
+        'shares': _u64(fields.get('shares')) / MIST_PER_SUI,
+        'timestamp': _u64(event.get('timestampMs')) / 1000,
+        'txDigest': (event.get('id') or {}).get('txDigest')
+    }
+
+class SuiMarketFetcher(MarketSource):
+    """Batched Sui market loads with event-driven delta refreshes"""
+    name = 'sui'
+
+    def __init__(self, rpc_url: str, package_id: str, registry_id: str,
+                 snapshot: Optional[MarketSnapshot] = None, timeout: float = RPC_TIMEOUT,
+                 max_batch_calls: int = MAX_BATCH_CALLS):
+        self.endpoint = rpc_url
+        self.package_id = package_id
+        self.registry_id = registry_id
+        self.snapshot = snapshot
+        self.max_batch_calls = max_batch_calls
+        self.rpc = JsonRpcClient(rpc_url, timeout=timeout)
+
+        self.object_ids: Dict[int, str] = {}      # market id -> Market object id
+        self.markets: Dict[int, Dict] = {}
+        self.event_cursor: Optional[Dict] = None    # last module event applied
+        self.market_counter = 0
+        self.recent_bets: List[Dict] = []           # BetPlaced events seen by the last refresh
+        self.updated: List[Dict] = []               # markets reloaded by the last refresh
+        self._synced = False
+        if snapshot:
+            # Restored markets are served until the first refresh reloads them
+            self.object_ids = {int(k): v for k, v in (snapshot.get_checkpoint('sui_object_ids') or {}).items()}
+            self.markets = {m['id']: m for m in snapshot.load_markets() if m.get('objectId')}
+            # Restored markets are current to the saved cursor: resume the event stream from there
+            self.event_cursor = snapshot.get_checkpoint('sui_event_cursor')
+            self._synced = self.event_cursor is not None and bool(self.object_ids)
+
+    @property
+    def event_type_prefix(self) -> str:
+        return f"{self.package_id}::{MODULE}::"
+
+    async def _batch(self, method: str, params_list: List[List]) -> List:
+        """Many calls of one method, MAX_BATCH_CALLS per HTTP request, requests sent concurrently"""
+        replies = await asyncio.gather(*(
+            self.rpc.batch(method, chunk) for chunk in _chunks(params_list, self.max_batch_calls)
+        ))
+        return [reply for chunk in replies for reply in chunk]
+
+    # --- discovery ---
+
+    async def _read_registry(self) -> str:
+        """Refresh market_counter and return the markets table id"""
+        registry = await self.rpc.call('sui_getObject', self.registry_id, {'showContent': True})
+        fields = ((registry or {}).get('data') or {}).get('content', {}).get('fields')
+        if not fields:
+            raise RpcError(f"Market registry {self.registry_id} not found")
+        self.market_counter = _u64(fields.get('market_counter'))
+        return fields['markets']['fields']['id']['id']
+
+    async def discover(self) -> int:
+        """Resolve object ids for registry entries not seen before; returns how many were added"""
+        table_id = await self._read_registry()
+        missing = [i for i in range(1, self.market_counter + 1) if i not in self.object_ids]
+        if not missing:
+            return 0
+
+        entries = await self._batch('suix_getDynamicFieldObject', [
+            [table_id, {'type': 'u64', 'value': str(market_id)}] for market_id in missing
+        ])
+        added = 0
+        for market_id, entry in zip(missing, entries):
+            if isinstance(entry, RpcError):
+                continue
+            fields = ((entry or {}).get('data') or {}).get('content', {}).get('fields') or {}
+            if fields.get('value'):
+                self.object_ids[market_id] = fields['value']
+                added += 1
+        if self.snapshot and added:
+            self.snapshot.set_checkpoint('sui_object_ids', {str(k): v for k, v in self.object_ids.items()})
+        return added
+
+    # --- market objects ---
+
+    async def market_ids(self) -> List[int]:
+        await self.discover()
+        return sorted(self.object_ids)
+
+    async def load_markets(self, market_ids: List[int]) -> List[Optional[Dict]]:
+        """Fetch and parse Market objects, in order; None for ids not in the registry"""
+        if any(market_id not in self.object_ids for market_id in market_ids):
+            await self.discover()
+        object_ids = [self.object_ids[i] for i in market_ids if i in self.object_ids]
+        if not object_ids:
+            return [None] * len(market_ids)
+        refreshed_at = time.time()
+        replies = await self._batch('sui_multiGetObjects', [
+            [chunk, {'showContent': True}] for chunk in _chunks(object_ids, MULTI_GET_LIMIT)
+        ])
+        by_id = {}
+        for reply in replies:
+            if isinstance(reply, RpcError):
+                raise reply
+            for obj in reply or []:
+                market = parse_market_object(obj, refreshed_at)
+                if market:
+                    by_id[market['id']] = market
+        return [by_id.get(market_id) for market_id in market_ids]
+
+    # --- events ---
+
+    def _event_query(self, event_type: Optional[str] = None) -> Dict:
+        if event_type:
+            return {'MoveEventType': self.event_type_prefix + event_type}
+        return {'MoveModule': {'package': self.package_id, 'module': MODULE}}
+
+    async def _event_page(self, query: Dict, cursor: Optional[Dict], limit: int = EVENT_PAGE_LIMIT,
+                          descending: bool = False) -> Dict:
+        return await self.rpc.call('suix_queryEvents', query, cursor, limit, descending) or {}
+
+    async def events(self, cursor: Optional[Dict] = None, event_type: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Module events (or one event type) after `cursor`, oldest first, until the stream is exhausted"""
+        query = self._event_query(event_type)
+        while True:
+            page = await self._event_page(query, cursor)
+            for event in page.get('data', []):
+                yield event
+            if not page.get('hasNextPage') or not page.get('data'):
+                return
+            cursor = page.get('nextCursor')
+
+    async def bet_events(self, cursor: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """Every BetPlaced event after `cursor` (from the start when None)"""
+        async for event in self.events(cursor, event_type='BetPlaced'):
+            yield parse_bet_event(event)
+
+    async def _latest_cursor(self) -> Optional[Dict]:
+        page = await self._event_page(self._event_query(), None, limit=1, descending=True)
+        latest = page.get('data') or []
+        return latest[0]['id'] if latest else None
+
+    async def _changed_since_cursor(self):
+        """(market ids touched by new module events, whether a market was created, cursor after them)"""
+        changed, created = set(), False
+        cursor = self.event_cursor
+        self.recent_bets = []
+        query = self._event_query()
+        while True:
+            page = await self._event_page(query, cursor)
+            for event in page.get('data', []):
+                kind = event.get('type', '').rsplit('::', 1)[-1]
+                if kind == 'MarketCreated':
+                    created = True
+                elif kind == 'BetPlaced':
+                    self.recent_bets.append(parse_bet_event(event))
+                changed.add(_u64((event.get('parsedJson') or {}).get('market_id')))
+                cursor = event['id']
+            if not page.get('hasNextPage') or not page.get('data'):
+                break
+        changed.discard(0)
+        return changed, created, cursor
+
+    # --- refresh ---
+
+    async def refresh(self) -> List[Dict]:
+        """All known markets, reloading only those with new events since the last refresh"""
+        if not self._synced:
+            # Cold start: pin the event cursor first so nothing between the two steps is missed
+            cursor = await self._latest_cursor()
+            await self.discover()
+            to_load = list(self.object_ids)
+        else:
+            changed, created, cursor = await self._changed_since_cursor()
+            if created or any(market_id not in self.object_ids for market_id in changed):
+                await self.discover()
+            to_load = [market_id for market_id in changed if market_id in self.object_ids]
+            to_load += [market_id for market_id in self.object_ids if market_id not in self.markets]
+
+        loaded = [market for market in await self.load_markets(sorted(set(to_load))) if market]
+        for market in loaded:
+            self.markets[market['id']] = market
+        self.updated = loaded
+        self._synced = True
+        if self.snapshot:
+            if loaded:
+                self.snapshot.save_markets(loaded)
+            # Only after the markets it covers are saved; a failed load replays the same events
+            if cursor != self.event_cursor:
+                self.snapshot.set_checkpoint('sui_event_cursor', cursor)
+        self.event_cursor = cursor
+        return [self.markets[market_id] for market_id in sorted(self.markets)]
+
+    async def close(self):
+        await self.rpc.close()
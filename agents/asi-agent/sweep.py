@@ -0,0 +1,252 @@
+"""
+Parameter sweeps of the backtest across all cores
+
+The market tape is copied once into a named shared-memory segment; worker
+processes map it read-only and wrap the arrays in a MarketTape without
+copying, so a task carries only its parameter dict. Each worker caches the
+decision rows per (decision interval, trend window) - the expensive part -
+and configurations are ordered so consecutive tasks share them.
+
+Sweeps are grids (every combination of the listed values) or random
+searches (values drawn uniformly from ranges, or from listed choices).
+Any StrategyParams field can be swept.
+
+Usage (from agents/asi-agent):
+    python -m sweep --bets data/bets.npz --outcomes data/outcomes.csv \
+        --grid contrarian_threshold=0.6,0.65,0.7,0.75,0.8 --grid min_confidence=0.5,0.6,0.7
+    python -m sweep --bets data/bets.npz --outcomes data/outcomes.csv --random 10000 \
+        --range contrarian_threshold=0.55:0.9 --range max_bet=10:200 --grid max_risk=low,medium,high
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backtest import Decisions, MarketTape, StrategyParams, load_tape, prepare_decisions, simulate
+
+RANK_METRICS = ('roi', 'totalProfit', 'sharpeRatio', 'winRate', 'maxDrawdown')
+RESULT_COLUMNS = ('bets', 'marketsBet', 'resolvedBets', 'totalStaked', 'totalProfit', 'roi',
+                  'winRate', 'averageReturn', 'sharpeRatio', 'maxDrawdown', 'brierScore')
+PARAM_TYPES = {f.name: f.type for f in fields(StrategyParams)}
+DECISION_CACHE_SIZE = 8
+
+class SharedTape:
+    """A MarketTape's arrays packed into one shared-memory segment"""
+
+    def __init__(self, tape: MarketTape):
+        columns = tape.columns()
+        self.layout: List[Tuple[str, str, Tuple[int, ...], int]] = []
+        offset = 0
+        for name, array in columns.items():
+            self.layout.append((name, array.dtype.str, array.shape, offset))
+            offset += -(-array.nbytes // 8) * 8    # keep every array 8-byte aligned
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 8))
+        self.name = self._shm.name
+        for name, dtype, shape, start in self.layout:
+            np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=start)[...] = columns[name]
+
+    @staticmethod
+    def attach(name: str, layout) -> Tuple[shared_memory.SharedMemory, MarketTape]:
+        """Map the segment and view it as a read-only MarketTape"""
+        # Spawned workers share the parent's resource tracker, which unlinks the segment once
+        shm = shared_memory.SharedMemory(name=name)
+        columns = {}
+        for column, dtype, shape, start in layout:
+            array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+            array.flags.writeable = False
+            columns[column] = array
+        return shm, MarketTape.from_columns(columns)
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+# --- worker side ---
+
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_tape: Optional[MarketTape] = None
+_worker_decisions: Dict[Tuple[float, float], Decisions] = {}
+
+def _init_worker(name: str, layout):
+    global _worker_shm, _worker_tape
+    _worker_shm, _worker_tape = SharedTape.attach(name, layout)
+
+def _decisions(interval: float, trend_window: float) -> Decisions:
+    key = (interval, trend_window)
+    decisions = _worker_decisions.get(key)
+    if decisions is None:
+        if len(_worker_decisions) >= DECISION_CACHE_SIZE:
+            _worker_decisions.pop(next(iter(_worker_decisions)))
+        decisions = _worker_decisions[key] = prepare_decisions(_worker_tape, interval, trend_window)
+    return decisions
+
+def evaluate(config: Dict) -> Dict:
+    """Backtest one configuration on the worker's shared tape"""
+    params = StrategyParams(**config)
+    report = simulate(_worker_tape, _decisions(params.decision_interval, params.trend_window), params, detail=False)
+    row = {column: report.get(column) for column in RESULT_COLUMNS}
+    row['brierScore'] = report['calibration']['brierScore']
+    return {**config, **row}
+
+# --- parameter spaces ---
+
+def _parse_value(name: str, text: str):
+    if name not in PARAM_TYPES:
+        raise ValueError(f"Unknown parameter '{name}' (choose from {', '.join(PARAM_TYPES)})")
+    kind = PARAM_TYPES[name]
+    if kind in (float, 'float'):
+        return float(text)
+    if kind in (str, 'str'):
+        return text
+    # int and Optional[int]
+    return None if text.lower() == 'none' else int(text)
+
+def parse_grid(specs: List[str]) -> Dict[str, List]:
+    """['name=v1,v2', ...] -> {name: [v1, v2]}"""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        grid[name] = [_parse_value(name, value) for value in values.split(',') if value]
+    return grid
+
+def parse_ranges(specs: List[str]) -> Dict[str, Tuple[float, float]]:
+    """['name=lo:hi', ...] -> {name: (lo, hi)}"""
+    ranges = {}
+    for spec in specs:
+        name, _, bounds = spec.partition('=')
+        low, _, high = bounds.partition(':')
+        ranges[name] = (_parse_value(name, low), _parse_value(name, high))
+    return ranges
+
+def grid_configs(grid: Dict[str, List]) -> List[Dict]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+def random_configs(count: int, ranges: Dict[str, Tuple], choices: Dict[str, List], seed: int = 0) -> List[Dict]:
+    """`count` configurations drawn uniformly from ranges (ints stay ints) and choices"""
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(count):
+        config = {}
+        for name, (low, high) in ranges.items():
+            config[name] = rng.randint(low, high) if isinstance(low, int) else round(rng.uniform(low, high), 4)
+        for name, values in choices.items():
+            config[name] = rng.choice(values)
+        configs.append(config)
+    return configs
+
+def _locality_key(config: Dict):
+    defaults = StrategyParams()
+    return (config.get('decision_interval', defaults.decision_interval),
+            config.get('trend_window', defaults.trend_window))
+
+def run_sweep(tape: MarketTape, configs: List[Dict], workers: Optional[int] = None,
+              chunksize: Optional[int] = None) -> List[Dict]:
+    """Evaluate every configuration in a process pool over one shared copy of the tape"""
+    for config in configs:
+        StrategyParams(**config)    # reject bad values before any worker starts
+    configs = sorted(configs, key=_locality_key)
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, min(64, len(configs) // (workers * 8)))
+
+    shared = SharedTape(tape)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                 initializer=_init_worker, initargs=(shared.name, shared.layout)) as pool:
+            return list(pool.map(evaluate, configs, chunksize=chunksize))
+    finally:
+        shared.close()
+
+def rank(results: List[Dict], metric: str = 'roi', min_bets: int = 1) -> List[Dict]:
+    """Best first; configurations with fewer than min_bets resolved bets are dropped"""
+    eligible = [r for r in results if (r['resolvedBets'] or 0) >= min_bets]
+    return sorted(eligible, key=lambda r: r[metric], reverse=True)
+
+def _print_table(ranked: List[Dict], params: List[str], top: int):
+    headers = params + ['bets', 'roi', 'totalProfit', 'winRate', 'sharpeRatio', 'maxDrawdown']
+    rows = [[str(r[h]) for h in headers] for r in ranked[:top]]
+    widths = [max(len(h), *(len(row[i]) for row in rows)) if rows else len(h) for i, h in enumerate(headers)]
+    print('   ' + '  '.join(h.ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('   ' + '  '.join(value.ljust(w) for value, w in zip(row, widths)))
+
+def _write_results(path: str, ranked: List[Dict]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        if path.endswith('.json'):
+            json.dump(ranked, f, indent=2)
+            return
+        writer = csv.DictWriter(f, fieldnames=list(ranked[0]) if ranked else ['rank'])
+        writer.writeheader()
+        writer.writerows(ranked)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Sweep strategy parameters over recorded markets')
+    parser.add_argument('--states', help='Market states file (.csv, .jsonl or .npz)')
+    parser.add_argument('--bets', help='Bet events file, used instead of --states')
+    parser.add_argument('--outcomes', required=True, help='Market outcomes file')
+    parser.add_argument('--grid', action='append', default=[], metavar='NAME=V1,V2',
+                        help='Values to try (every combination; choices in a random search)')
+    parser.add_argument('--range', action='append', default=[], metavar='NAME=LO:HI',
+                        help='Uniform range for a random search')
+    parser.add_argument('--random', type=int, help='Number of random configurations instead of a grid')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--rank-by', choices=RANK_METRICS, default='roi')
+    parser.add_argument('--min-bets', type=int, default=20, help='Drop configurations with fewer resolved bets')
+    parser.add_argument('--top', type=int, default=20, help='Rows to print')
+    parser.add_argument('--output', help='Write all ranked results (.csv or .json)')
+    args = parser.parse_args(argv)
+
+    try:
+        grid, ranges = parse_grid(args.grid), parse_ranges(args.range)
+        tape = load_tape(args.outcomes, states_path=args.states, bets_path=args.bets)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    if args.random:
+        configs = random_configs(args.random, ranges, grid, args.seed)
+    elif ranges:
+        print("❌ --range needs --random")
+        return 1
+    else:
+        configs = grid_configs(grid)
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"🚀 {len(configs):,} configurations over {len(tape):,} states on {workers} workers")
+    started = time.perf_counter()
+    try:
+        results = run_sweep(tape, configs, workers=workers)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"📊 Swept in {elapsed:.1f}s ({len(configs) / elapsed:,.1f} configurations/s)")
+
+    ranked = rank(results, args.rank_by, args.min_bets)
+    for position, row in enumerate(ranked, start=1):
+        row['rank'] = position
+    print(f"🏆 Top {min(args.top, len(ranked))} of {len(ranked)} by {args.rank_by} "
+          f"(at least {args.min_bets} resolved bets):")
+    _print_table(ranked, list(grid) + list(ranges), args.top)
+
+    if args.output:
+        _write_results(args.output, ranked)
+        print(f"💾 Results saved to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
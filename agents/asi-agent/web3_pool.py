@@ -0,0 +1,57 @@
+"""
+Pooled, keep-alive Web3 access for asyncio callers
+
+Contract reads from request threads go through data_sources.run_in_scope,
+so every RPC call runs on one background event loop. AsyncWeb3Pool gives
+each event loop one AsyncWeb3 over an aiohttp session that keeps up to
+`size` keep-alive connections to the RPC; async_connector() builds that
+connector for the other aiohttp JSON-RPC clients (rpc_client).
+"""
+
+import asyncio
+import os
+import threading
+from typing import Dict
+
+import aiohttp
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+from resilience import RPC_TIMEOUT
+
+POOL_SIZE = int(os.getenv("WEB3_POOL_SIZE", "32"))               # concurrent connections per RPC endpoint
+KEEPALIVE_TIMEOUT = float(os.getenv("WEB3_KEEPALIVE_TIMEOUT", "30"))  # idle seconds before a connection closes
+
+def async_connector(size: int = POOL_SIZE) -> aiohttp.TCPConnector:
+    """aiohttp connector with the pool's connection limit and keep-alive; create inside the event loop"""
+    return aiohttp.TCPConnector(limit=size, limit_per_host=size, keepalive_timeout=KEEPALIVE_TIMEOUT,
+                                ttl_dns_cache=300)
+
+class AsyncWeb3Pool:
+    """One AsyncWeb3 per event loop, each over a keep-alive aiohttp session"""
+
+    def __init__(self, rpc_url: str, size: int = POOL_SIZE, timeout: float = RPC_TIMEOUT):
+        self.rpc_url = rpc_url
+        self.size = size
+        self.timeout = timeout
+        self._instances: Dict[asyncio.AbstractEventLoop, AsyncWeb3] = {}
+        self._lock = threading.Lock()
+
+    async def get(self) -> AsyncWeb3:
+        loop = asyncio.get_running_loop()
+        w3 = self._instances.get(loop)
+        if w3 is None:
+            provider = AsyncHTTPProvider(self.rpc_url, request_kwargs={'timeout': aiohttp.ClientTimeout(total=self.timeout)})
+            session = aiohttp.ClientSession(connector=async_connector(self.size))
+            await provider.cache_async_session(session)
+            with self._lock:
+                w3 = self._instances.setdefault(loop, AsyncWeb3(provider))
+            if w3.provider is not provider:
+                await session.close()    # another coroutine on this loop got there first
+        return w3
+
+    async def close(self):
+        """Close this event loop's session"""
+        with self._lock:
+            w3 = self._instances.pop(asyncio.get_running_loop(), None)
+        if w3:
+            await w3.provider.disconnect()